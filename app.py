@@ -2,11 +2,14 @@
 تطبيق Flask الرئيسي لأداة RSS للتواصل الاجتماعي
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, abort
+from flask import Flask, Response, render_template, request, jsonify, send_file, abort, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 import os
+import re
 import sys
-from datetime import datetime
+import json
+from datetime import datetime, timezone
 import logging
 
 # إضافة المجلد الحالي إلى مسار Python
@@ -15,6 +18,16 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # استيراد الوحدات المخصصة
 from scrapers.multi_platform_scraper import MultiPlatformScraper
 from rss_generator.feed_manager import FeedManager
+from rss_generator.feed_gc import FeedGarbageCollector
+from rss_generator.feed_scheduler import FeedScheduler
+from rss_generator.lease_store import create_lease_store
+from rss_generator.bulk_create import BulkFeedCreator
+from rss_generator.opml import parse_opml, iter_opml
+from rss_generator.rss_generator import RSSGenerator
+from rss_generator.job_manager import JobManager
+from rss_generator.event_hub import EventHub, FeedEventPublisher
+from rss_generator.websub_hub import WebSubHub
+from rss_generator.url_utils import canonicalize_url
 
 # إعداد التطبيق
 app = Flask(__name__)
@@ -27,19 +40,172 @@ CORS(app)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# إنشاء مجلد الخلاصات
-FEEDS_DIR = os.path.join(os.path.dirname(__file__), 'feeds')
+# إنشاء مجلد الخلاصات (FEEDS_DIR يغيره، مثلاً لتشغيل الاختبارات في مجلد مؤقت)
+FEEDS_DIR = os.environ.get('FEEDS_DIR', os.path.join(os.path.dirname(__file__), 'feeds'))
 os.makedirs(FEEDS_DIR, exist_ok=True)
 
+# موزع WebSub المدمج، ورابطه العام يُعلن في الخلاصات (WEBSUB_ENABLED=false يعطله)
+WEBSUB_ENABLED = os.environ.get('WEBSUB_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+WEBSUB_HUB_URL = os.environ.get('WEBSUB_HUB_URL', f"{RSSGenerator().base_url}/websub")
+
+# بث الأحداث عبر /api/events (EVENTS_ENABLED=true يفعله). كل اتصال يشغل خيطاً أو عاملاً طوال
+# مدته، لذا هو معطل افتراضياً وتعتمد الواجهة على الاستعلام الدوري
+EVENTS_ENABLED = os.environ.get('EVENTS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
 # تهيئة المكونات
 scraper = MultiPlatformScraper()
-feed_manager = FeedManager(FEEDS_DIR)
+feed_manager = FeedManager(
+    FEEDS_DIR,
+    cache_max_bytes=int(os.environ.get('FEED_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    storage=os.environ.get('METADATA_BACKEND', 'journal'),
+    min_update_interval=int(os.environ.get('MIN_UPDATE_INTERVAL', 15)),
+    max_update_interval=int(os.environ.get('MAX_UPDATE_INTERVAL', 24 * 60)),
+    hub_url=WEBSUB_HUB_URL if WEBSUB_ENABLED else None
+)
+
+# تنظيف الخلاصات القديمة دورياً في الخلفية (يعمل أيضاً تحت gunicorn)
+feed_gc = FeedGarbageCollector(
+    feed_manager,
+    interval=float(os.environ.get('GC_INTERVAL_SECONDS', 3600)),
+    max_age_days=int(os.environ.get('FEED_MAX_AGE_DAYS', 30))
+)
+feed_gc.start()
+
+
+# أسماء المنصات كما تحفظها أدوات الاستخراج في الخلاصات، حتى تُجمع إحصائيات
+# الاستخراج وأعداد الخلاصات تحت نفس المفتاح
+PLATFORM_NAMES = {
+    'facebook': 'Facebook',
+    'instagram': 'Instagram',
+    'twitter': 'Twitter',
+    'youtube': 'YouTube',
+    'linkedin': 'LinkedIn',
+    'tiktok': 'TikTok',
+    'generic': 'Website'
+}
+
+
+def scrape_url(url: str, max_posts: int = 10) -> dict:
+    """استخراج المحتوى من الرابط مع تسجيل النتيجة في إحصائيات المنصة"""
+    platform = PLATFORM_NAMES.get(scraper.detect_platform(url), 'Unknown')
+    scraped_data = scraper.scrape_url(url, max_posts)
+    feed_manager.stats.record_scrape(platform, 'error' not in scraped_data)
+    return scraped_data
+
+
+def refresh_scheduled_feed(feed_id: str) -> bool:
+    """تحديث خلاصة مستحقة من مجدول التحديث"""
+    feed_info = feed_manager.get_feed_info(feed_id)
+    if not feed_info:
+        return True
+    
+    scraped_data = scrape_url(feed_info['url'], 10)
+    if 'error' in scraped_data:
+        logger.warning(f"Scheduled scrape failed for {feed_id}: {scraped_data['error']}")
+        return False
+    
+    updated_feed = feed_manager.update_feed(feed_id, scraped_data)
+    if 'error' in updated_feed:
+        logger.warning(f"Scheduled update failed for {feed_id}: {updated_feed['error']}")
+        return False
+    
+    return True
+
+
+# تحديث الخلاصات النشطة تلقائياً حسب فترة تحديث كل منها (0 عمال يعطل المجدول)
+# عقود التحديث في قاعدة مشتركة تمنع تحديث نفس الخلاصة من أكثر من نسخة
+lease_backend = os.environ.get('LEASE_BACKEND', 'sqlite')
+feed_scheduler = FeedScheduler(
+    refresh_scheduled_feed,
+    workers=int(os.environ.get('SCHEDULER_WORKERS', 4)),
+    jitter=float(os.environ.get('SCHEDULER_JITTER', 0.1)),
+    leases=create_lease_store(
+        lease_backend,
+        os.environ.get('LEASE_DB_PATH', os.path.join(FEEDS_DIR, 'leases.db'))
+    ) if lease_backend != 'none' else None,
+    lease_ttl=float(os.environ.get('LEASE_TTL_SECONDS', 300)),
+    sync=feed_manager.sync_changes
+)
+if feed_scheduler.workers > 0:
+    feed_manager.add_listener(feed_scheduler.on_changes)
+    feed_scheduler.start()
+
+
+# مهام الإنشاء والتحديث في الخلفية حتى لا تنتظر خيوط الطلبات الاستخراج
+# حالة المهام في قاعدة مشتركة فيمكن الاستعلام عنها من أي عامل
+job_manager = JobManager(
+    os.environ.get('JOB_DB_PATH', os.path.join(FEEDS_DIR, 'jobs.db')),
+    workers=int(os.environ.get('JOB_WORKERS', 4)),
+    max_pending=int(os.environ.get('MAX_PENDING_JOBS', 1000)),
+    retention=float(os.environ.get('JOB_RETENTION_SECONDS', 3600)),
+    job_timeout=float(os.environ.get('JOB_TIMEOUT_SECONDS', 900))
+)
+
+# بث تغييرات الخلاصات وحالة المهام للعملاء عبر /api/events
+event_hub = EventHub(
+    capacity=int(os.environ.get('EVENT_BUFFER_SIZE', 1000)),
+    heartbeat=float(os.environ.get('EVENT_HEARTBEAT_SECONDS', 15)),
+    max_clients=int(os.environ.get('MAX_EVENT_CLIENTS', 50)),
+    sync=feed_manager.sync_changes
+) if EVENTS_ENABLED else None
+
+
+def publish_job_event(job: dict):
+    """بث تغير حالة مهمة"""
+    event_hub.publish('job', job)
+
+
+if event_hub:
+    feed_manager.add_listener(FeedEventPublisher(event_hub).on_changes)
+    job_manager.add_listener(publish_job_event)
+
+# إرسال محتوى الخلاصات المتغيرة لمشتركي WebSub بدلاً من انتظار فحصهم الدوري
+websub_hub = WebSubHub(
+    os.path.join(FEEDS_DIR, 'websub.db'),
+    WEBSUB_HUB_URL,
+    workers=int(os.environ.get('WEBSUB_WORKERS', 4)),
+    max_attempts=int(os.environ.get('WEBSUB_MAX_ATTEMPTS', 5)),
+    retry_delay=float(os.environ.get('WEBSUB_RETRY_DELAY_SECONDS', 30)),
+    max_pending_verifications=int(os.environ.get('WEBSUB_MAX_PENDING_VERIFICATIONS', 100)),
+    allow_private_callbacks=os.environ.get('WEBSUB_ALLOW_PRIVATE_CALLBACKS', 'false').lower() in ('1', 'true', 'yes')
+) if WEBSUB_ENABLED else None
+
+
+def push_feed_update(feed_info: dict, content: bytes):
+    """إرسال المحتوى الجديد لمشتركي الخلاصة"""
+    websub_hub.publish(feed_manager.get_self_url(feed_info), content)
+
+
+if websub_hub:
+    feed_manager.add_content_listener(push_feed_update)
+
+
+def wants_async() -> bool:
+    """هل طلب العميل تنفيذ العملية كمهمة (async=1 أو Prefer: respond-async)"""
+    if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+
+def submit_job(job_type: str, key: str, func, *args):
+    """إضافة مهمة والرد بـ 202 ورابط حالتها"""
+    job, deduplicated = job_manager.submit(job_type, key, func, *args)
+    if job is None:
+        return jsonify({'error': 'عدد كبير من المهام قيد الانتظار. يرجى المحاولة لاحقاً.'}), 503
+    
+    if deduplicated:
+        logger.info(f"Reusing in-flight job {job['id']} for {key}")
+    
+    response = jsonify(dict(job, deduplicated=deduplicated))
+    response.status_code = 202
+    response.headers['Location'] = job['status_url']
+    return response
 
 
 @app.route('/')
 def index():
     """الصفحة الرئيسية"""
-    return render_template('index.html')
+    return render_template('index.html', events_enabled=EVENTS_ENABLED)
 
 
 @app.route('/api/create-feed', methods=['POST'])
@@ -57,36 +223,185 @@ def create_feed():
         if not url:
             return jsonify({'error': 'يرجى تقديم رابط صحيح'}), 400
         
-        logger.info(f"Creating RSS feed for URL: {url}")
-        
-        # استخراج المحتوى من الرابط
-        scraped_data = scraper.scrape_url(url, max_posts)
-        
-        if 'error' in scraped_data:
-            logger.error(f"Scraping error: {scraped_data['error']}")
-            return jsonify({'error': scraped_data['error']}), 400
+        # المصدر الموجود (بأي شكل من أشكال رابطه) يُعاد دون استخراج جديد
+        existing = feed_manager.find_feed_by_url(url)
+        if existing:
+            logger.info(f"Feed already exists for URL: {url} ({existing['id']})")
+            return jsonify(dict(feed_manager.public_feed_info(existing), existing=True))
         
-        # إنشاء خلاصة RSS
-        feed_info = feed_manager.create_feed(url, scraped_data)
-        
-        if 'error' in feed_info:
-            logger.error(f"Feed creation error: {feed_info['error']}")
-            return jsonify({'error': feed_info['error']}), 500
-        
-        logger.info(f"RSS feed created successfully: {feed_info['id']}")
-        return jsonify(feed_info)
+        if wants_async():
+            return submit_job('create', f"create:{canonicalize_url(url)}", run_create_feed, url, max_posts)
         
+        result, status_code = run_create_feed(url, max_posts)
+        return jsonify(result), status_code
+    
     except Exception as e:
         logger.error(f"Unexpected error in create_feed: {str(e)}")
         return jsonify({'error': 'حدث خطأ غير متوقع. يرجى المحاولة مرة أخرى.'}), 500
 
 
+def run_create_feed(url: str, max_posts: int):
+    """
+    استخراج المحتوى وإنشاء الخلاصة (في خيط الطلب أو كمهمة)
+    
+    Returns:
+        (النتيجة، رمز حالة HTTP)
+    """
+    # مهمة منتظرة قد يسبقها إنشاء نفس المصدر
+    existing = feed_manager.find_feed_by_url(url)
+    if existing:
+        return dict(feed_manager.public_feed_info(existing), existing=True), 200
+    
+    logger.info(f"Creating RSS feed for URL: {url}")
+    
+    # استخراج المحتوى من الرابط
+    scraped_data = scrape_url(url, max_posts)
+    
+    if 'error' in scraped_data:
+        logger.error(f"Scraping error: {scraped_data['error']}")
+        return {'error': scraped_data['error']}, 400
+    
+    # إنشاء خلاصة RSS
+    feed_info = feed_manager.create_feed(url, scraped_data)
+    
+    if 'error' in feed_info:
+        logger.error(f"Feed creation error: {feed_info['error']}")
+        return {'error': feed_info['error']}, 500
+    
+    logger.info(f"RSS feed created successfully: {feed_info['id']}")
+    return feed_manager.public_feed_info(feed_info), 200
+
+
+# إنشاء الخلاصات جماعياً: حد للاستخراجات المتزامنة كلها وحد لكل مضيف
+bulk_creator = BulkFeedCreator(
+    feed_manager,
+    scrape_url,
+    workers=int(os.environ.get('BULK_WORKERS', 8)),
+    per_host=int(os.environ.get('BULK_PER_HOST', 2))
+)
+MAX_BULK_FEEDS = int(os.environ.get('MAX_BULK_FEEDS', 1000))
+MAX_OPML_FEEDS = int(os.environ.get('MAX_OPML_FEEDS', 10000))
+
+# أقصى عدد عناصر في الخلاصة المجمّعة
+MAX_AGGREGATE_ITEMS = 500
+
+
+def stream_bulk_results(items: list, max_posts: int) -> Response:
+    """بث نتائج الإنشاء الجماعي بصيغة NDJSON"""
+    def generate():
+        try:
+            for result in bulk_creator.run(items, max_posts):
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+        except Exception as e:
+            logger.error(f"Unexpected error in bulk feed creation: {str(e)}")
+            yield json.dumps({'error': 'حدث خطأ غير متوقع أثناء إنشاء الخلاصات'}, ensure_ascii=False) + '\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'}
+    )
+
+
+@app.route('/api/feeds/bulk', methods=['POST'])
+def create_feeds_bulk():
+    """إنشاء عدة خلاصات وبث نتيجة كل رابط فور اكتماله بصيغة NDJSON"""
+    data = request.get_json(silent=True)
+    
+    if not data or not isinstance(data.get('feeds'), list) or not data['feeds']:
+        return jsonify({'error': 'يرجى تقديم قائمة روابط في الحقل feeds'}), 400
+    
+    if len(data['feeds']) > MAX_BULK_FEEDS:
+        return jsonify({'error': f'الحد الأقصى {MAX_BULK_FEEDS} رابط في الطلب الواحد'}), 400
+    
+    max_posts = data.get('max_posts', 10)
+    if not isinstance(max_posts, int) or isinstance(max_posts, bool) or max_posts < 1:
+        return jsonify({'error': 'قيمة max_posts غير صالحة'}), 400
+    
+    logger.info(f"Creating {len(data['feeds'])} feeds in bulk")
+    return stream_bulk_results(data['feeds'], max_posts)
+
+
+@app.route('/api/opml/import', methods=['POST'])
+def import_opml():
+    """استيراد الخلاصات من ملف OPML عبر الإنشاء الجماعي"""
+    # الملف إما حقل file في نموذج أو محتوى الطلب مباشرة
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    
+    try:
+        max_posts = int(request.values.get('max_posts', 10))
+    except ValueError:
+        max_posts = 0
+    if max_posts < 1:
+        return jsonify({'error': 'قيمة max_posts غير صالحة'}), 400
+    
+    try:
+        entries = parse_opml(stream, MAX_OPML_FEEDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not entries:
+        return jsonify({'error': 'لا توجد روابط في ملف OPML'}), 400
+    
+    logger.info(f"Importing {len(entries)} feeds from OPML")
+    return stream_bulk_results(entries, max_posts)
+
+
+@app.route('/api/opml/export', methods=['GET'])
+def export_opml():
+    """تصدير الخلاصات (كلها أو حسب المنصة والحالة) كملف OPML يُبث أثناء إنشائه"""
+    feeds = feed_manager.iter_feeds(
+        platform=request.args.get('platform'),
+        status=request.args.get('status')
+    )
+    
+    return Response(
+        stream_with_context(iter_opml(feeds, RSSGenerator().base_url)),
+        mimetype='text/x-opml',
+        headers={'Content-Disposition': 'attachment; filename=feeds.opml'}
+    )
+
+
 @app.route('/api/feeds', methods=['GET'])
 def get_feeds():
-    """الحصول على جميع الخلاصات"""
+    """الحصول على الخلاصات على صفحات مع التصفية والترتيب"""
     try:
-        feeds = feed_manager.get_all_feeds()
-        return jsonify(feeds)
+        limit = request.args.get('limit', 50, type=int)
+        
+        if not 1 <= limit <= 200:
+            return jsonify({'error': 'قيمة limit غير صالحة'}), 400
+        
+        # الخلاصات التي لم تُفحص منذ تاريخ، وتُقارن بتواريخ الفحص المحفوظة بالتوقيت المحلي
+        stale_before = request.args.get('stale_before')
+        if stale_before:
+            try:
+                parsed = datetime.fromisoformat(stale_before.replace('Z', '+00:00'))
+            except ValueError:
+                return jsonify({'error': 'تاريخ stale_before غير صالح'}), 400
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone().replace(tzinfo=None)
+            stale_before = parsed.isoformat()
+        
+        fields = request.args.get('fields')
+        fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+        
+        sort = request.args.get('sort', '-last_checked' if stale_before else '-created_at')
+        
+        try:
+            page = feed_manager.list_feeds(
+                sort=sort,
+                platform=request.args.get('platform'),
+                status=request.args.get('status'),
+                stale_before=stale_before,
+                cursor=request.args.get('cursor'),
+                limit=limit,
+                fields=fields
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(page)
     except Exception as e:
         logger.error(f"Error getting feeds: {str(e)}")
         return jsonify({'error': 'فشل في جلب الخلاصات'}), 500
@@ -101,7 +416,7 @@ def get_feed(feed_id):
         if not feed_info:
             return jsonify({'error': 'الخلاصة غير موجودة'}), 404
         
-        return jsonify(feed_info)
+        return jsonify(feed_manager.public_feed_info(feed_info))
     except Exception as e:
         logger.error(f"Error getting feed {feed_id}: {str(e)}")
         return jsonify({'error': 'فشل في جلب الخلاصة'}), 500
@@ -118,7 +433,7 @@ def delete_feed(feed_id):
             return jsonify({'message': 'تم حذف الخلاصة بنجاح'})
         else:
             return jsonify({'error': 'الخلاصة غير موجودة'}), 404
-            
+    
     except Exception as e:
         logger.error(f"Error deleting feed {feed_id}: {str(e)}")
         return jsonify({'error': 'فشل في حذف الخلاصة'}), 500
@@ -133,62 +448,240 @@ def update_feed(feed_id):
         if not feed_info:
             return jsonify({'error': 'الخلاصة غير موجودة'}), 404
         
-        url = feed_info['url']
-        logger.info(f"Updating RSS feed: {feed_id}")
+        if wants_async():
+            return submit_job('update', f"update:{feed_id}", run_update_feed, feed_id)
         
-        # استخراج المحتوى المحدث
-        scraped_data = scraper.scrape_url(url, 10)
+        result, status_code = run_update_feed(feed_id)
+        return jsonify(result), status_code
+    
+    except Exception as e:
+        logger.error(f"Unexpected error updating feed {feed_id}: {str(e)}")
+        return jsonify({'error': 'حدث خطأ أثناء تحديث الخلاصة'}), 500
+
+
+def run_update_feed(feed_id: str):
+    """
+    استخراج المحتوى المحدث وتحديث الخلاصة (في خيط الطلب أو كمهمة)
+    
+    Returns:
+        (النتيجة، رمز حالة HTTP)
+    """
+    feed_info = feed_manager.get_feed_info(feed_id)
+    
+    if not feed_info:
+        return {'error': 'الخلاصة غير موجودة'}, 404
+    
+    # الخلاصات المجمّعة تُبنى من عناصر أعضائها دون استخراج
+    if feed_info.get('type') == 'aggregate':
+        updated_feed = feed_manager.rebuild_aggregate_feed(feed_id)
+        if 'error' in updated_feed:
+            return {'error': updated_feed['error']}, 500
+        return feed_manager.public_feed_info(updated_feed), 200
+    
+    url = feed_info['url']
+    logger.info(f"Updating RSS feed: {feed_id}")
+    
+    # استخراج المحتوى المحدث
+    scraped_data = scrape_url(url, 10)
+    
+    if 'error' in scraped_data:
+        logger.error(f"Scraping error during update: {scraped_data['error']}")
+        return {'error': scraped_data['error']}, 400
+    
+    # تحديث الخلاصة
+    updated_feed = feed_manager.update_feed(feed_id, scraped_data)
+    
+    if 'error' in updated_feed:
+        logger.error(f"Feed update error: {updated_feed['error']}")
+        return {'error': updated_feed['error']}, 500
+    
+    if updated_feed['changed']:
+        logger.info(f"RSS feed updated successfully: {feed_id}")
+    else:
+        logger.info(f"RSS feed unchanged, skipped rewrite: {feed_id}")
+    return feed_manager.public_feed_info(updated_feed), 200
+
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """بث أحداث الخلاصات والمهام (Server-Sent Events)"""
+    if not event_hub:
+        return jsonify({'error': 'بث الأحداث غير مفعل على هذا الخادم'}), 404
+    
+    if not event_hub.connect():
+        return jsonify({'error': 'عدد كبير من الاتصالات. يرجى المحاولة لاحقاً.'}), 503
+    
+    types = request.args.get('types')
+    types = [event_type.strip() for event_type in types.split(',') if event_type.strip()] if types else None
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    
+    response = Response(
+        event_hub.stream(last_event_id, types),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(event_hub.disconnect)
+    return response
+
+
+@app.route('/websub', methods=['POST'])
+def websub_subscribe():
+    """نقطة موزع WebSub لطلبات الاشتراك وإلغائه في الخلاصات"""
+    if not websub_hub:
+        abort(404)
+    
+    mode = request.form.get('hub.mode', '')
+    topic = request.form.get('hub.topic', '')
+    callback = request.form.get('hub.callback', '')
+    
+    # الموضوع يجب أن يكون رابط خلاصة موجودة على هذا الخادم
+    match = re.fullmatch(re.escape(RSSGenerator().base_url) + r'/feeds/([^/?#]+)\.xml', topic)
+    if not match or (mode == 'subscribe' and not feed_manager.get_feed_info(match.group(1))):
+        return jsonify({'error': 'قيمة hub.topic ليست خلاصة على هذا الخادم'}), 400
+    
+    lease_seconds = request.form.get('hub.lease_seconds')
+    if lease_seconds is not None:
+        if not lease_seconds.isdigit():
+            return jsonify({'error': 'قيمة hub.lease_seconds غير صالحة'}), 400
+        lease_seconds = int(lease_seconds)
+    
+    try:
+        accepted = websub_hub.request_subscription(mode, topic, callback, lease_seconds, request.form.get('hub.secret'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not accepted:
+        return jsonify({'error': 'عدد كبير من طلبات الاشتراك قيد التحقق. يرجى المحاولة لاحقاً.'}), 503
+    
+    logger.info(f"WebSub {mode} request for {topic} from {callback}")
+    return '', 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """الحصول على حالة مهمة ونتيجتها"""
+    job = job_manager.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'المهمة غير موجودة أو انتهت مدة الاحتفاظ بها'}), 404
+    return jsonify(job)
+
+
+@app.route('/api/aggregates', methods=['POST'])
+def create_aggregate_feed():
+    """إنشاء خلاصة مجمّعة من عدة خلاصات موجودة"""
+    try:
+        data = request.get_json()
         
-        if 'error' in scraped_data:
-            logger.error(f"Scraping error during update: {scraped_data['error']}")
-            return jsonify({'error': scraped_data['error']}), 400
+        if not data or not isinstance(data.get('feed_ids'), list):
+            return jsonify({'error': 'يرجى تقديم قائمة معرفات الخلاصات'}), 400
         
-        # تحديث الخلاصة
-        updated_feed = feed_manager.update_feed(feed_id, scraped_data)
+        max_items = data.get('max_items', 50)
+        if (not isinstance(max_items, int) or isinstance(max_items, bool) or
+                not 1 <= max_items <= MAX_AGGREGATE_ITEMS):
+            return jsonify({'error': f'يجب أن تكون قيمة max_items عدداً بين 1 و {MAX_AGGREGATE_ITEMS}'}), 400
         
-        if 'error' in updated_feed:
-            logger.error(f"Feed update error: {updated_feed['error']}")
-            return jsonify({'error': updated_feed['error']}), 500
+        feed_info = feed_manager.create_aggregate_feed(
+            data['feed_ids'],
+            title=data.get('title'),
+            max_items=max_items
+        )
         
-        logger.info(f"RSS feed updated successfully: {feed_id}")
-        return jsonify(updated_feed)
+        if 'error' in feed_info:
+            return jsonify({'error': feed_info['error']}), 400
         
+        logger.info(f"Aggregate feed created successfully: {feed_info['id']}")
+        return jsonify(feed_manager.public_feed_info(feed_info))
+    
     except Exception as e:
-        logger.error(f"Unexpected error updating feed {feed_id}: {str(e)}")
-        return jsonify({'error': 'حدث خطأ أثناء تحديث الخلاصة'}), 500
+        logger.error(f"Unexpected error in create_aggregate_feed: {str(e)}")
+        return jsonify({'error': 'حدث خطأ غير متوقع. يرجى المحاولة مرة أخرى.'}), 500
 
 
 @app.route('/feeds/<feed_id>.xml')
 def serve_rss_feed(feed_id):
     """تقديم ملف RSS XML"""
+    try:
+        variant = 'gzip' if 'gzip' in request.accept_encodings else 'identity'
+        payload = feed_manager.get_feed_payload(feed_id, variant)
+        
+        if not payload:
+            abort(404)
+        
+        validators = payload['validators']
+        
+        # الرد بـ 304 دون قراءة المحتوى أو إرساله إذا كانت نسخة العميل حديثة
+        if is_not_modified(validators):
+            return Response(status=304, headers=payload['validator_headers'])
+        
+        body = feed_manager.load_feed_body(feed_id, payload)
+        if body is None:
+            abort(404)
+        
+        return Response(body, headers=payload['headers'])
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving RSS feed {feed_id}: {str(e)}")
+        abort(500)
+
+
+@app.route('/feeds/<feed_id>/archive/<int:page>.xml')
+def serve_archive_page(feed_id, page):
+    """تقديم صفحة أرشيف ثابتة للخلاصة (RFC 5005)"""
     try:
         feed_info = feed_manager.get_feed_info(feed_id)
         
-        if not feed_info:
+        if not feed_info or not 1 <= page <= feed_info.get('archive_pages', 0):
             abort(404)
         
-        xml_path = feed_info['xml_path']
+        archive_path = feed_manager.get_archive_path(feed_id, page)
         
-        if not os.path.exists(xml_path):
+        if not os.path.exists(archive_path):
             abort(404)
         
-        return send_file(
-            xml_path,
+        # صفحات الأرشيف لا تتغير بعد كتابتها
+        response = send_file(
+            archive_path,
             mimetype='application/rss+xml',
             as_attachment=False,
-            download_name=f'feed_{feed_id}.xml'
+            download_name=f'feed_{feed_id}_archive_{page}.xml',
+            max_age=365 * 24 * 3600
         )
-        
+        response.cache_control.immutable = True
+        return response
+    
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error serving RSS feed {feed_id}: {str(e)}")
+        logger.error(f"Error serving archive page {page} of feed {feed_id}: {str(e)}")
         abort(500)
 
 
+def is_not_modified(validators):
+    """التحقق من ترويسات If-None-Match و If-Modified-Since"""
+    # If-None-Match يُقارن مقارنة ضعيفة (RFC 7232) فتطابق W/"..." التي تضيفها الوسائط عند الضغط
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(validators['etag'])
+    
+    if request.if_modified_since:
+        return int(validators['last_modified'].timestamp()) <= int(request.if_modified_since.timestamp())
+    
+    return False
+
+
 @app.route('/api/stats')
 def get_stats():
     """الحصول على إحصائيات الخلاصات"""
     try:
         stats = feed_manager.get_feed_stats()
+        stats['gc'] = feed_gc.get_stats()
+        stats['scheduler'] = feed_scheduler.get_stats()
+        stats['jobs'] = job_manager.get_stats()
+        if event_hub:
+            stats['events'] = event_hub.get_stats()
+        if websub_hub:
+            stats['websub'] = websub_hub.get_stats()
         return jsonify(stats)
     except Exception as e:
         logger.error(f"Error getting stats: {str(e)}")
@@ -204,14 +697,72 @@ def search_feeds():
         if not query:
             return jsonify({'error': 'يرجى تقديم كلمة بحث'}), 400
         
-        results = feed_manager.search_feeds(query)
-        return jsonify(results)
+        limit = request.args.get('limit', 50, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        
+        if not 1 <= limit <= 200 or offset < 0:
+            return jsonify({'error': 'قيم limit أو offset غير صالحة'}), 400
+        
+        results = feed_manager.search_feeds(query, limit, offset)
         
+        response = jsonify(results['results'])
+        response.headers['X-Total-Count'] = str(results['total'])
+        return response
+    
     except Exception as e:
         logger.error(f"Error searching feeds: {str(e)}")
         return jsonify({'error': 'فشل في البحث'}), 500
 
 
+@app.route('/api/posts/search')
+def search_posts():
+    """البحث في نصوص منشورات جميع الخلاصات"""
+    try:
+        query = request.args.get('q', '').strip()
+        
+        if not query:
+            return jsonify({'error': 'يرجى تقديم كلمة بحث'}), 400
+        
+        limit = request.args.get('limit', 20, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        sort = request.args.get('sort', 'relevance')
+        
+        if not 1 <= limit <= 100 or offset < 0:
+            return jsonify({'error': 'قيم limit أو offset غير صالحة'}), 400
+        
+        if sort not in ('relevance', 'date'):
+            return jsonify({'error': 'قيمة sort يجب أن تكون relevance أو date'}), 400
+        
+        # التواريخ بصيغة ISO 8601 وتُقارن كنصوص مع تواريخ النشر المحفوظة بتوقيت UTC
+        dates = {}
+        for name in ('since', 'until'):
+            value = request.args.get(name)
+            if value:
+                try:
+                    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                except ValueError:
+                    return jsonify({'error': f'تاريخ {name} غير صالح'}), 400
+                if parsed.tzinfo is None:
+                    parsed = parsed.replace(tzinfo=timezone.utc)
+                dates[name] = parsed.astimezone(timezone.utc).isoformat()
+        
+        results = feed_manager.search_posts(
+            query,
+            platform=request.args.get('platform'),
+            feed_id=request.args.get('feed_id'),
+            sort=sort,
+            limit=limit,
+            offset=offset,
+            **dates
+        )
+        results.update(limit=limit, offset=offset)
+        return jsonify(results)
+    
+    except Exception as e:
+        logger.error(f"Error searching posts: {str(e)}")
+        return jsonify({'error': 'فشل في البحث'}), 500
+
+
 @app.route('/api/platforms')
 def get_supported_platforms():
     """الحصول على المنصات المدعومة"""
@@ -260,6 +811,13 @@ def log_request():
         logger.info(f"{request.method} {request.path} - {request.remote_addr}")
 
 
+@app.before_request
+def sync_feed_metadata():
+    """تطبيق تغييرات الخلاصات التي أجراها عمال gunicorn الآخرون"""
+    if not request.path.startswith('/static/'):
+        feed_manager.sync_changes()
+
+
 @app.after_request
 def after_request(response):
     """إضافة headers للاستجابة"""
@@ -268,8 +826,8 @@ def after_request(response):
     response.headers['X-Frame-Options'] = 'DENY'
     response.headers['X-XSS-Protection'] = '1; mode=block'
     
-    # إضافة headers للـ RSS
-    if request.path.endswith('.xml'):
+    # إضافة headers للـ RSS (الخلاصات تضبط مدة التخزين حسب فترة تحديثها)
+    if request.path.endswith('.xml') and 'Cache-Control' not in response.headers:
         response.headers['Cache-Control'] = 'public, max-age=3600'  # تخزين مؤقت لساعة واحدة
     
     return response
@@ -278,7 +836,7 @@ def after_request(response):
 def cleanup_old_feeds():
     """تنظيف الخلاصات القديمة"""
     try:
-        deleted_count = feed_manager.cleanup_old_feeds(max_age_days=30)
+        deleted_count = feed_gc.collect()
         if deleted_count > 0:
             logger.info(f"Cleaned up {deleted_count} old feeds")
     except Exception as e:
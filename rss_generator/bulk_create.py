@@ -0,0 +1,240 @@
+"""
+إنشاء عدة خلاصات دفعة واحدة باستخراج متزامن وحدود لكل مضيف
+"""
+
+import time
+import threading
+from collections import deque
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from .url_utils import canonicalize_url
+
+
+class BulkFeedCreator:
+    """
+    إنشاء خلاصات لقائمة روابط وإعادة نتيجة كل رابط فور اكتماله
+    
+    الروابط تُوحَّد ويُحذف المكرر منها، والمصادر الموجودة تُعاد دون استخراج.
+    الباقي يُوزع على مجموعة عمال محدودة، ولا يُرسل رابط إلى العمال إلا إذا
+    كان لمضيفه مكان ضمن حد المضيف، فلا ينتظر عامل دور مضيف مشغول بينما
+    روابط مضيفات أخرى تنتظر. الخلاصات المُنشأة تُنشر في البيانات الوصفية
+    على دفعات، ونتيجة كل خلاصة لا تُعاد إلا بعد حفظ دفعتها.
+    
+    الحدان مشتركان بين كل الطلبات التي تستخدم نفس المنشئ: العامل يحجز مكاناً
+    في الحد الكلي وحد المضيف معاً قبل الاستخراج، فلا تتجاوز الطلبات المتزامنة
+    (مثل عدة استيرادات OPML) عدد الاستخراجات المحدد لكل مضيف.
+    """
+    
+    def __init__(self, feed_manager, scrape: Callable[[str, int], Dict], workers: int = 8,
+                 per_host: int = 2, batch_size: int = 50, flush_interval: float = 1.0):
+        """
+        تهيئة المنشئ
+        
+        Args:
+            feed_manager: مدير الخلاصات
+            scrape: دالة الاستخراج التي تستقبل الرابط وعدد المنشورات
+            workers: الحد الأقصى للاستخراجات المتزامنة
+            per_host: الحد الأقصى للاستخراجات المتزامنة من نفس المضيف
+            batch_size: عدد الخلاصات في كل دفعة حفظ
+            flush_interval: أقصى مدة بالثواني تنتظرها خلاصة جاهزة قبل حفظ دفعتها
+        """
+        self.feed_manager = feed_manager
+        self.scrape = scrape
+        self.workers = workers
+        self.per_host = per_host
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        
+        # الاستخراجات الجارية في كل الطلبات، كلياً ولكل مضيف
+        self.condition = threading.Condition()
+        self.active = 0
+        self.active_hosts: Dict[str, int] = {}
+    
+    def plan(self, items: List[Dict], default_max_posts: int = 10) -> Tuple[List[Dict], List[Dict]]:
+        """
+        التحقق من العناصر وحذف المكرر
+        
+        Returns:
+            (المهام المطلوب استخراجها، النتائج الجاهزة دون استخراج)
+        """
+        jobs = []
+        results = []
+        seen = {}
+        
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                item = {'url': item}
+            
+            url = item.get('url').strip() if isinstance(item, dict) and isinstance(item.get('url'), str) else ''
+            if not url:
+                results.append({'index': index, 'status': 'error', 'error': 'يرجى تقديم رابط صحيح'})
+                continue
+            
+            max_posts = item.get('max_posts', default_max_posts)
+            if not isinstance(max_posts, int) or isinstance(max_posts, bool) or max_posts < 1:
+                results.append({'index': index, 'url': url, 'status': 'error', 'error': 'قيمة max_posts غير صالحة'})
+                continue
+            
+            canonical = canonicalize_url(url)
+            if canonical in seen:
+                results.append({'index': index, 'url': url, 'status': 'duplicate', 'duplicate_of': seen[canonical]})
+                continue
+            seen[canonical] = index
+            
+            existing = self.feed_manager.find_feed_by_url(url)
+            if existing:
+                results.append({
+                    'index': index, 'url': url, 'status': 'existing',
+                    'feed': self.feed_manager.public_feed_info(existing)
+                })
+                continue
+            
+            jobs.append({
+                'index': index,
+                'url': url,
+                'max_posts': max_posts,
+                'host': urlparse(canonical).hostname or ''
+            })
+        
+        return jobs, results
+    
+    def acquire(self, host: str, stop: threading.Event) -> bool:
+        """انتظار مكان في الحد الكلي وحد المضيف معاً، ويعيد False إذا أُوقف الطلب"""
+        with self.condition:
+            while self.active >= self.workers or self.active_hosts.get(host, 0) >= self.per_host:
+                if stop.is_set():
+                    return False
+                self.condition.wait()
+            if stop.is_set():
+                return False
+            
+            self.active += 1
+            self.active_hosts[host] = self.active_hosts.get(host, 0) + 1
+            return True
+    
+    def release(self, host: str):
+        """تحرير مكان الاستخراج وإيقاظ العمال المنتظرين"""
+        with self.condition:
+            self.active -= 1
+            self.active_hosts[host] -= 1
+            if not self.active_hosts[host]:
+                del self.active_hosts[host]
+            self.condition.notify_all()
+    
+    def create_one(self, job: Dict, stop: threading.Event) -> Dict:
+        """استخراج رابط وإنشاء ملفات خلاصته دون نشرها (يُنفذ في أحد العمال)"""
+        if not self.acquire(job['host'], stop):
+            return {'error': 'تم إلغاء الطلب'}
+        
+        try:
+            scraped_data = self.scrape(job['url'], job['max_posts'])
+        finally:
+            self.release(job['host'])
+        
+        if 'error' in scraped_data:
+            return {'error': scraped_data['error']}
+        
+        return self.feed_manager.build_new_feed(job['url'], scraped_data)
+    
+    def run(self, items: List[Dict], default_max_posts: int = 10) -> Iterator[Dict]:
+        """
+        إنشاء الخلاصات وإعادة نتيجة كل عنصر عند اكتماله ثم ملخص النتائج
+        
+        إيقاف المولد (مثلاً عند انقطاع اتصال العميل) يلغي الروابط التي لم تبدأ
+        ويحفظ الخلاصات التي اكتمل إنشاؤها
+        """
+        jobs, results = self.plan(items, default_max_posts)
+        summary = {'total': len(items), 'created': 0, 'existing': 0, 'duplicate': 0, 'error': 0}
+        
+        for result in results:
+            summary[result['status']] += 1
+            yield result
+        
+        queues: Dict[str, deque] = {}
+        for job in jobs:
+            queues.setdefault(job['host'], deque()).append(job)
+        active_hosts: Dict[str, int] = {}
+        
+        batch: List[Tuple[Dict, Dict]] = []
+        batch_started = None
+        pending = {}
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix='bulk-create')
+        
+        def submit_ready():
+            # المضيفات بالترتيب حتى تتقدم روابط كل المضيفات معاً
+            for host in list(queues):
+                while (queues[host] and len(pending) < self.workers and
+                       active_hosts.get(host, 0) < self.per_host):
+                    job = queues[host].popleft()
+                    active_hosts[host] = active_hosts.get(host, 0) + 1
+                    pending[executor.submit(self.create_one, job, stop)] = job
+                if not queues[host]:
+                    del queues[host]
+        
+        def flush():
+            feed_infos = [feed_info for _, feed_info in batch]
+            self.feed_manager.publish_feeds(feed_infos)
+            flushed = [
+                {'index': job['index'], 'url': job['url'], 'status': 'created',
+                 'feed': self.feed_manager.public_feed_info(feed_info)}
+                for job, feed_info in batch
+            ]
+            batch.clear()
+            return flushed
+        
+        try:
+            submit_ready()
+            
+            while pending or batch:
+                timeout = None
+                if batch:
+                    timeout = max(0.0, batch_started + self.flush_interval - time.time())
+                
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED) if pending else (set(), set())
+                
+                for future in done:
+                    job = pending.pop(future)
+                    active_hosts[job['host']] -= 1
+                    
+                    try:
+                        feed_info = future.result()
+                    except Exception as e:
+                        feed_info = {'error': f'خطأ في إنشاء الخلاصة: {str(e)}'}
+                    
+                    if 'error' in feed_info:
+                        summary['error'] += 1
+                        yield {'index': job['index'], 'url': job['url'], 'status': 'error', 'error': feed_info['error']}
+                        continue
+                    
+                    if not batch:
+                        batch_started = time.time()
+                    batch.append((job, feed_info))
+                
+                submit_ready()
+                
+                if batch and (len(batch) >= self.batch_size or not pending or
+                              time.time() - batch_started >= self.flush_interval):
+                    for result in flush():
+                        summary['created'] += 1
+                        yield result
+            
+            yield {'summary': summary}
+        
+        finally:
+            # الاستخراجات الجارية تكتمل وتُحفظ خلاصاتها حتى لا تبقى ملفات غير منشورة
+            for future in pending:
+                future.cancel()
+            with self.condition:
+                stop.set()
+                self.condition.notify_all()
+            executor.shutdown(wait=True)
+            for future, job in pending.items():
+                if future.cancelled() or future.exception():
+                    continue
+                if 'error' not in future.result():
+                    batch.append((job, future.result()))
+            if batch:
+                self.feed_manager.publish_feeds([feed_info for _, feed_info in batch])
@@ -0,0 +1,212 @@
+"""
+بث أحداث الخلاصات والمهام للعملاء عبر Server-Sent Events
+"""
+
+import json
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class EventHub:
+    """
+    موزع أحداث لاتصالات Server-Sent Events
+    
+    الأحداث محفوظة في مخزن دائري واحد مشترك (آخر capacity حدث) ولكل حدث رقم
+    تسلسلي، وكل عميل يحتفظ فقط برقم آخر حدث استلمه. نشر حدث لا يمر على
+    العملاء بل يوقظ المنتظرين على شرط واحد، فتكلفة العميل الخامل ذاكرة
+    ثابتة صغيرة. العميل الذي ينقطع ويعود بـ Last-Event-ID يستلم ما فاته إن
+    كان لا يزال في المخزن، وإلا يستلم حدث reset ليعيد تحميل القائمة.
+    
+    كل اتصال مولد يعمل في خيط الطلب طوال مدته، فعدد الاتصالات محدود بعدد
+    خيوط الخادم أو عماله (max_clients يحدده لكل عملية). لا يخدم الموزع آلاف
+    الاتصالات الخاملة لأن التطبيق لا يُشغل بعمال غير متزامنة.
+    """
+    
+    def __init__(self, capacity: int = 1000, heartbeat: float = 15.0, max_clients: int = 50,
+                 sync: Optional[Callable[[], int]] = None, sync_interval: float = 2.0):
+        """
+        تهيئة الموزع
+        
+        Args:
+            capacity: عدد الأحداث المحفوظة لإعادة إرسالها للعملاء العائدين
+            heartbeat: الفترة بالثواني بين رسائل إبقاء الاتصال
+            max_clients: أقصى عدد اتصالات متزامنة
+            sync: دالة تطبيق تغييرات العمليات الأخرى حتى تصل أحداثها للعملاء
+            sync_interval: الفترة بالثواني بين استدعاءات sync أثناء وجود عملاء
+        """
+        self.capacity = capacity
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+        self.sync = sync
+        self.sync_interval = sync_interval
+        
+        self.events = deque(maxlen=capacity)
+        self.sequence = 0
+        self.clients = 0
+        self.published = 0
+        self.condition = threading.Condition()
+        
+        self.poller = None
+        self.stop_event = threading.Event()
+    
+    def publish(self, event_type: str, data: Dict) -> int:
+        """
+        نشر حدث لكل العملاء
+        
+        Returns:
+            رقم الحدث
+        """
+        payload = json.dumps(data, ensure_ascii=False)
+        with self.condition:
+            self.sequence += 1
+            self.published += 1
+            self.events.append((self.sequence, event_type, payload))
+            self.condition.notify_all()
+            return self.sequence
+    
+    def events_after(self, cursor: int, timeout: float):
+        """
+        انتظار الأحداث التالية لرقم معين
+        
+        Returns:
+            (الأحداث الجديدة، True إذا خرجت أحداث فائتة من المخزن)
+        """
+        with self.condition:
+            if self.sequence <= cursor:
+                self.condition.wait(timeout)
+            
+            if self.sequence <= cursor:
+                return [], False
+            
+            missed = not self.events or self.events[0][0] > cursor + 1
+            return [event for event in self.events if event[0] > cursor], missed
+    
+    def connect(self) -> bool:
+        """تسجيل عميل جديد، ويعيد False عند بلوغ الحد الأقصى"""
+        with self.condition:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+        
+        if self.sync and not self.poller:
+            self.start_poller()
+        return True
+    
+    def disconnect(self):
+        """إلغاء تسجيل عميل عند إغلاق اتصاله"""
+        with self.condition:
+            self.clients -= 1
+    
+    def stream(self, last_event_id: Optional[str] = None, types: Optional[List[str]] = None) -> Iterator[str]:
+        """
+        رسائل SSE لعميل مسجل عبر connect حتى انقطاع اتصاله (ثم يُستدعى disconnect)
+        
+        Args:
+            last_event_id: رقم آخر حدث استلمه العميل قبل انقطاعه
+            types: أنواع الأحداث المطلوبة فقط (مثل feed.created أو job)
+        """
+        with self.condition:
+            cursor = self.sequence
+        if last_event_id and last_event_id.isdigit():
+            cursor = min(int(last_event_id), cursor)
+        
+        yield "retry: 5000\n\n"
+        
+        while not self.stop_event.is_set():
+            events, missed = self.events_after(cursor, self.heartbeat)
+            
+            if missed:
+                yield "event: reset\ndata: {}\n\n"
+            
+            if not events:
+                # رسالة إبقاء الاتصال تكشف أيضاً العملاء المنقطعين
+                yield ": ping\n\n"
+                continue
+            
+            for sequence, event_type, payload in events:
+                if not types or event_type in types:
+                    yield f"id: {sequence}\nevent: {event_type}\ndata: {payload}\n\n"
+            cursor = events[-1][0]
+    
+    def start_poller(self):
+        """تشغيل خيط تطبيق تغييرات العمليات الأخرى أثناء وجود عملاء"""
+        with self.condition:
+            if self.poller:
+                return
+            self.poller = threading.Thread(target=self.run_poller, daemon=True)
+        self.poller.start()
+    
+    def run_poller(self):
+        """استدعاء sync دورياً ما دام هناك عملاء متصلون"""
+        while not self.stop_event.wait(self.sync_interval):
+            if not self.clients:
+                continue
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"خطأ في مزامنة البيانات الوصفية لبث الأحداث: {e}")
+    
+    def close(self):
+        """إنهاء كل الاتصالات"""
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+    
+    def get_stats(self) -> Dict:
+        """الحصول على إحصائيات الموزع"""
+        with self.condition:
+            return {
+                'clients': self.clients,
+                'published': self.published,
+                'buffered': len(self.events),
+                'last_event_id': self.sequence
+            }
+
+
+class FeedEventPublisher:
+    """
+    تحويل تغييرات البيانات الوصفية إلى أحداث feed.created و feed.updated و feed.deleted
+    
+    يُسجل كمستمع في FeedManager. الخلاصة تُعتبر محدثة فقط عند تغير محتواها
+    (بصمة ملف XML)، فالفحوص التي لا تجد جديداً لا تُرسل أحداثاً.
+    """
+    
+    # حقول الخلاصة المرسلة مع الأحداث (تكفي لعرضها في قائمة الخلاصات)
+    EVENT_FIELDS = ('id', 'title', 'description', 'platform', 'post_count',
+                    'last_updated', 'status', 'rss_url', 'type')
+    
+    def __init__(self, hub: EventHub):
+        self.hub = hub
+        self.content_hashes: Dict[str, Optional[str]] = {}
+        self.primed = False
+    
+    def feed_event(self, feed_info: Dict) -> Dict:
+        """بيانات الخلاصة المرسلة مع الحدث"""
+        return {field: feed_info[field] for field in self.EVENT_FIELDS if field in feed_info}
+    
+    def on_changes(self, upserts: Dict, deletes: List[str]):
+        """مستمع تغييرات البيانات الوصفية"""
+        # الاستدعاء الأول عند التسجيل يحتوي على كل الخلاصات الحالية ولا يُبث
+        if not self.primed:
+            self.primed = True
+            self.content_hashes = {
+                feed_id: feed_info.get('content_hash') for feed_id, feed_info in upserts.items()
+            }
+            return
+        
+        for feed_id, feed_info in upserts.items():
+            content_hash = feed_info.get('content_hash')
+            
+            if feed_id not in self.content_hashes:
+                self.hub.publish('feed.created', self.feed_event(feed_info))
+            elif self.content_hashes[feed_id] != content_hash:
+                self.hub.publish('feed.updated', dict(
+                    self.feed_event(feed_info), new_items=feed_info.get('last_new_posts', 0)
+                ))
+            
+            self.content_hashes[feed_id] = content_hash
+        
+        for feed_id in deletes:
+            if self.content_hashes.pop(feed_id, False) is not False:
+                self.hub.publish('feed.deleted', {'id': feed_id})
@@ -0,0 +1,95 @@
+"""
+ذاكرة تخزين مؤقت في الذاكرة لأكثر الخلاصات طلباً
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class FeedCache:
+    """
+    ذاكرة LRU محدودة الحجم لبايتات الخلاصات الجاهزة للإرسال
+    
+    كل مدخل مرتبط بخلاصة ونوع ترميز (identity أو gzip) ويحتوي على
+    جسم الاستجابة والترويسات المحسوبة مسبقاً.
+    """
+    
+    VARIANTS = ('identity', 'gzip')
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        تهيئة الذاكرة المؤقتة
+        
+        Args:
+            max_bytes: الحد الأقصى لحجم البايتات المخزنة
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.entries: 'OrderedDict[Tuple[str, str], Dict]' = OrderedDict()
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, feed_id: str, variant: str) -> Optional[Dict]:
+        """الحصول على مدخل من الذاكرة وتحديث ترتيب الاستخدام"""
+        key = (feed_id, variant)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    def put(self, feed_id: str, variant: str, entry: Dict):
+        """إضافة مدخل مع إخراج الأقدم استخداماً عند تجاوز الحد"""
+        size = len(entry['body'])
+        if size > self.max_bytes:
+            return
+        
+        key = (feed_id, variant)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old['body'])
+            
+            self.entries[key] = entry
+            self.current_bytes += size
+            
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.current_bytes -= len(evicted['body'])
+                self.evictions += 1
+    
+    def invalidate(self, feed_id: str):
+        """حذف جميع أنواع الترميز المخزنة لخلاصة"""
+        with self.lock:
+            for variant in self.VARIANTS:
+                entry = self.entries.pop((feed_id, variant), None)
+                if entry is not None:
+                    self.current_bytes -= len(entry['body'])
+    
+    def clear(self):
+        """تفريغ الذاكرة المؤقتة"""
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+    
+    def get_stats(self) -> Dict:
+        """الحصول على إحصائيات الذاكرة المؤقتة"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
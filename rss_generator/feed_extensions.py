@@ -0,0 +1,45 @@
+"""
+امتدادات FeedGenerator لإضافة روابط Atom وعناصر أرشيف الخلاصات (RFC 5005)
+"""
+
+from feedgen.ext.base import BaseExtension
+from lxml import etree
+
+
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+FEED_HISTORY_NS = 'http://purl.org/syndication/history/1.0'
+
+
+class FeedLinksExtension(BaseExtension):
+    """
+    امتداد يضيف روابط atom:link إضافية إلى قناة RSS
+    
+    FeedGenerator لا يكتب في RSS إلا رابط self، لذلك تُضاف روابط مثل
+    prev-archive و current يدوياً، مع علامة fh:archive لصفحات الأرشيف.
+    """
+    
+    def __init__(self):
+        self.links = []
+        self.is_archive = False
+    
+    def add_link(self, rel: str, href: str):
+        """إضافة رابط بعلاقة محددة"""
+        self.links.append((rel, href))
+    
+    def set_archive(self, is_archive: bool = True):
+        """تحديد الخلاصة كصفحة أرشيف ثابتة"""
+        self.is_archive = is_archive
+    
+    def extend_ns(self):
+        return {'fh': FEED_HISTORY_NS}
+    
+    def extend_rss(self, feed):
+        channel = feed[0]
+        
+        for rel, href in self.links:
+            etree.SubElement(channel, f'{{{ATOM_NS}}}link', href=href, rel=rel)
+        
+        if self.is_archive:
+            etree.SubElement(channel, f'{{{FEED_HISTORY_NS}}}archive')
+        
+        return feed
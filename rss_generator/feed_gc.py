@@ -0,0 +1,107 @@
+"""
+تنظيف دوري في الخلفية للخلاصات التي توقف فحصها
+"""
+
+import os
+import atexit
+import threading
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows لا يدعم flock
+    fcntl = None
+
+
+class FeedGarbageCollector:
+    """
+    خيط خلفي يحذف الخلاصات القديمة على دفعات بميزانية زمنية لكل دورة
+    
+    عند تشغيل عدة عمال gunicorn يأخذ عامل واحد فقط قفل gc.lock في كل دورة،
+    ويتخطاها الآخرون دون انتظار. ما يتبقى بعد انتهاء الميزانية يُكمل في
+    الدورة التالية، فلا يحجز التنظيف قفل الكتابة لفترة طويلة.
+    """
+    
+    def __init__(self, feed_manager, interval: float = 3600, max_age_days: int = 30,
+                 batch_size: int = 100, time_budget: float = 2.0):
+        """
+        تهيئة المنظف
+        
+        Args:
+            feed_manager: مدير الخلاصات
+            interval: الفترة بين الدورات بالثواني
+            max_age_days: عمر آخر فحص الذي تُحذف بعده الخلاصة
+            batch_size: عدد الخلاصات المحذوفة في كل دفعة
+            time_budget: الحد الأقصى لمدة الدورة بالثواني
+        """
+        self.feed_manager = feed_manager
+        self.interval = interval
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        self.lock_file = os.path.join(feed_manager.feeds_dir, 'gc.lock')
+        
+        self.last_deleted = 0
+        self.total_deleted = 0
+        
+        self.stop_event = threading.Event()
+        self.worker = None
+    
+    def start(self):
+        """تشغيل الخيط الخلفي"""
+        if self.worker:
+            return
+        
+        self.worker = threading.Thread(target=self.run_background, daemon=True)
+        self.worker.start()
+        atexit.register(self.close)
+    
+    def collect(self) -> int:
+        """
+        تنفيذ دورة تنظيف واحدة إذا لم تكن عملية أخرى تنفذها
+        
+        Returns:
+            عدد الخلاصات المحذوفة
+        """
+        with open(self.lock_file, 'a+') as handle:
+            if fcntl:
+                try:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return 0
+            
+            # تطبيق حذف وتحديثات العمليات الأخرى قبل اختيار الخلاصات القديمة
+            self.feed_manager.sync_changes()
+            
+            deleted = self.feed_manager.cleanup_old_feeds(
+                self.max_age_days, batch_size=self.batch_size, time_budget=self.time_budget
+            )
+        
+        self.last_deleted = deleted
+        self.total_deleted += deleted
+        return deleted
+    
+    def run_background(self):
+        """خيط التنظيف الدوري"""
+        while not self.stop_event.wait(self.interval):
+            try:
+                deleted = self.collect()
+                if deleted:
+                    print(f"تم حذف {deleted} من الخلاصات القديمة")
+            except Exception as e:
+                print(f"خطأ في تنظيف الخلاصات القديمة: {e}")
+    
+    def close(self):
+        """إيقاف الخيط الخلفي"""
+        self.stop_event.set()
+        if self.worker:
+            self.worker.join()
+    
+    def get_stats(self) -> Dict:
+        """الحصول على إحصائيات التنظيف"""
+        return {
+            'interval': self.interval,
+            'max_age_days': self.max_age_days,
+            'last_deleted': self.last_deleted,
+            'total_deleted': self.total_deleted
+        }
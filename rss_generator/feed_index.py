@@ -0,0 +1,192 @@
+"""
+فهارس مرتبة لعرض الخلاصات على صفحات مع التصفية والترتيب
+"""
+
+import json
+import base64
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class FeedListIndex:
+    """
+    قوائم مرتبة من (قيمة الترتيب، معرف الخلاصة) لكل حقل ترتيب ولكل تقسيم
+    
+    التقسيمات هي جميع الخلاصات، وكل منصة، وكل حالة، وكل منصة مع حالة، لذلك
+    تُخدم التصفية والترتيب والصفحات بالبحث الثنائي ثم قراءة الصفحة المطلوبة
+    فقط، دون المرور على كل الخلاصات. المؤشر (cursor) يحتوي على قيمة الترتيب
+    ومعرف آخر خلاصة في الصفحة، فلا تتأثر الصفحات التالية بالإضافة والحذف.
+    """
+    
+    SORT_FIELDS = ('created_at', 'last_updated', 'last_checked', 'post_count')
+    
+    def __init__(self):
+        self.lists: Dict[Tuple[str, Optional[str], Optional[str]], List[tuple]] = {}
+        self.entries: Dict[str, List[tuple]] = {}
+        self.lock = threading.Lock()
+    
+    def sort_value(self, feed_info: Dict, field: str):
+        """قيمة حقل الترتيب بنوع ثابت لكل حقل"""
+        if field == 'post_count':
+            return int(feed_info.get('post_count') or 0)
+        if field == 'last_checked':
+            return feed_info.get('last_checked') or feed_info.get('last_updated') or ''
+        return feed_info.get(field) or ''
+    
+    def list_keys(self, feed_info: Dict, field: str) -> List[tuple]:
+        """مفاتيح القوائم التي تنتمي إليها الخلاصة لحقل ترتيب"""
+        platform = feed_info.get('platform')
+        status = feed_info.get('status')
+        return [
+            (field, None, None),
+            (field, platform, None),
+            (field, None, status),
+            (field, platform, status)
+        ]
+    
+    def entries_for(self, feed_info: Dict) -> List[tuple]:
+        """مدخلات الخلاصة في كل القوائم: (مفتاح القائمة، (قيمة الترتيب، المعرف))"""
+        feed_id = feed_info['id']
+        return [
+            (key, (self.sort_value(feed_info, field), feed_id))
+            for field in self.SORT_FIELDS
+            for key in self.list_keys(feed_info, field)
+        ]
+    
+    def add(self, feed_info: Dict):
+        """إضافة خلاصة أو تحديث موضعها في القوائم"""
+        self.add_many([feed_info])
+    
+    def add_many(self, feed_infos):
+        """
+        إضافة عدة خلاصات أو تحديث مواضعها
+        
+        الإضافة التزايدية تُدرج كل مدخل بالبحث الثنائي، وكل إدراج يزيح باقي
+        القائمة. لذلك عند تغير جزء كبير من الخلاصات (مثل التحميل عند بدء
+        التشغيل) تُبنى القوائم من جديد بإلحاق المدخلات ثم ترتيب كل قائمة مرة
+        واحدة، فيبقى البناء O(n log n) بدلاً من O(n²).
+        """
+        changes = {}
+        for feed_info in feed_infos:
+            changes[feed_info['id']] = self.entries_for(feed_info)
+        
+        with self.lock:
+            changes = {
+                feed_id: entries for feed_id, entries in changes.items()
+                if self.entries.get(feed_id) != entries
+            }
+            if not changes:
+                return
+            
+            if len(changes) * 4 > len(self.entries):
+                self.entries.update(changes)
+                self.rebuild()
+                return
+            
+            for feed_id, entries in changes.items():
+                previous = self.entries.get(feed_id)
+                if previous:
+                    self.unlink(previous)
+                
+                for key, entry in entries:
+                    bisect.insort(self.lists.setdefault(key, []), entry)
+                self.entries[feed_id] = entries
+    
+    def rebuild(self):
+        """بناء كل القوائم من مدخلات الخلاصات (يُستدعى والقفل محجوز)"""
+        lists: Dict[Tuple[str, Optional[str], Optional[str]], List[tuple]] = {}
+        for entries in self.entries.values():
+            for key, entry in entries:
+                lists.setdefault(key, []).append(entry)
+        
+        for items in lists.values():
+            items.sort()
+        self.lists = lists
+    
+    def remove(self, feed_id: str):
+        """حذف خلاصة من القوائم"""
+        with self.lock:
+            previous = self.entries.pop(feed_id, None)
+            if previous:
+                self.unlink(previous)
+    
+    def unlink(self, entries: List[tuple]):
+        """حذف مدخلات خلاصة من قوائمها (يُستدعى والقفل محجوز)"""
+        for key, entry in entries:
+            items = self.lists.get(key)
+            if not items:
+                continue
+            
+            index = bisect.bisect_left(items, entry)
+            if index < len(items) and items[index] == entry:
+                del items[index]
+            if not items:
+                del self.lists[key]
+    
+    def encode_cursor(self, entry: tuple) -> str:
+        """ترميز موضع آخر خلاصة في الصفحة كمؤشر معتم"""
+        return base64.urlsafe_b64encode(json.dumps(list(entry)).encode('utf-8')).decode('ascii')
+    
+    def decode_cursor(self, cursor: str, sort: str) -> tuple:
+        """فك ترميز المؤشر، ويرفع ValueError إذا كان غير صالح أو لا يناسب حقل الترتيب"""
+        try:
+            value, feed_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except Exception:
+            raise ValueError('مؤشر غير صالح')
+        
+        value_type = int if sort == 'post_count' else str
+        if type(value) is not value_type or not isinstance(feed_id, str):
+            raise ValueError('مؤشر غير صالح')
+        
+        return (value, feed_id)
+    
+    def query(self, sort: str = 'created_at', descending: bool = True,
+              platform: Optional[str] = None, status: Optional[str] = None,
+              before: Optional[str] = None, cursor: Optional[str] = None,
+              limit: int = 50) -> Dict:
+        """
+        قراءة صفحة من معرفات الخلاصات
+        
+        Args:
+            sort: حقل الترتيب
+            descending: الترتيب التنازلي
+            platform: تصفية حسب المنصة
+            status: تصفية حسب الحالة
+            before: حد أعلى (غير شامل) لقيمة حقل الترتيب، مثل الخلاصات التي لم تُفحص منذ تاريخ
+            cursor: مؤشر الصفحة السابقة
+            limit: عدد الخلاصات في الصفحة
+        
+        Returns:
+            قاموس يحتوي على ids و total و next_cursor
+        """
+        if sort not in self.SORT_FIELDS:
+            raise ValueError(f'حقل ترتيب غير مدعوم: {sort}')
+        if before is not None and sort == 'post_count':
+            raise ValueError('الحد before يتطلب حقل ترتيب زمني')
+        
+        position = self.decode_cursor(cursor, sort) if cursor else None
+        
+        with self.lock:
+            items = self.lists.get((sort, platform, status), [])
+            
+            # نهاية النطاق: كل القيم الأصغر من before
+            end = bisect.bisect_left(items, (before,)) if before is not None else len(items)
+            total = end
+            
+            if descending:
+                stop = bisect.bisect_left(items, position, 0, end) if position else end
+                start = max(0, stop - limit)
+                page = items[start:stop][::-1]
+                has_more = start > 0
+            else:
+                start = bisect.bisect_right(items, position, 0, end) if position else 0
+                stop = min(end, start + limit)
+                page = items[start:stop]
+                has_more = stop < end
+        
+        return {
+            'ids': [feed_id for _, feed_id in page],
+            'total': total,
+            'next_cursor': self.encode_cursor(page[-1]) if page and has_more else None
+        }
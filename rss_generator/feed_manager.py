@@ -4,52 +4,572 @@
 
 import os
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import gzip
+import heapq
+import hashlib
+import threading
+import time
+from itertools import islice
+from types import MappingProxyType
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, Iterator, List, Optional
 from .rss_generator import RSSGenerator
+from .feed_cache import FeedCache
+from .render_cache import RenderCache
+from .metadata_store import create_metadata_store, FileLock
+from .search_index import SearchIndex
+from .posts_index import PostsIndex
+from .feed_stats import FeedStats
+from .feed_index import FeedListIndex
+from .url_utils import canonicalize_url, feed_id_from_url
+from .feed_storage import FeedStorage
+from .refresh_policy import AdaptiveRefreshPolicy
 
 
 class FeedManager:
-    """فئة إدارة خلاصات RSS"""
+    """
+    فئة إدارة خلاصات RSS
     
-    def __init__(self, feeds_dir: str = "feeds"):
+    البيانات الوصفية تُنشر كلقطة غير قابلة للتعديل: القراءة لا تأخذ أي قفل،
+    والكتابة تنسخ القاموس تحت قفل قصير ثم تستبدل المرجع دفعة واحدة. لذلك لا
+    تُعدَّل معلومات خلاصة منشورة أبداً، بل تُنسخ وتُعدل النسخة ثم تُنشر.
+    """
+    
+    # حقول خاصة بالخادم لا تُعرض عبر API
+    PRIVATE_FIELDS = ('xml_path', 'xml_file')
+    
+    def __init__(self, feeds_dir: str = "feeds", cache_max_bytes: int = 64 * 1024 * 1024,
+                 render_cache_max_bytes: int = 32 * 1024 * 1024,
+                 archive_window: int = 50, archive_page_size: int = 25,
+                 storage: str = 'json', min_update_interval: int = 15,
+                 max_update_interval: int = 24 * 60, hub_url: Optional[str] = None):
         """
         تهيئة مدير الخلاصات
         
         Args:
             feeds_dir: مجلد حفظ الخلاصات
+            cache_max_bytes: الحد الأقصى لذاكرة الخلاصات المؤقتة بالبايت
+            render_cache_max_bytes: الحد الأقصى لذاكرة تحويل المنشورات بالبايت
+            archive_window: الحد الأقصى لعدد العناصر في الخلاصة الحالية
+            archive_page_size: عدد العناصر في كل صفحة أرشيف
+            storage: نوع مخزن البيانات الوصفية (json أو journal أو sqlite)
+            min_update_interval: أقل فترة تحديث تلقائية بالدقائق
+            max_update_interval: أكبر فترة تحديث تلقائية بالدقائق
+            hub_url: رابط موزع WebSub المعلن في الخلاصات (None لعدم الإعلان)
         """
         self.feeds_dir = feeds_dir
-        self.metadata_file = os.path.join(feeds_dir, "feeds_metadata.json")
+        self.hub_url = hub_url
+        self.archive_window = archive_window
+        self.archive_page_size = archive_page_size
+        self.feed_cache = FeedCache(cache_max_bytes)
+        self.render_cache = RenderCache(render_cache_max_bytes)
+        
+        # فترة تحديث كل خلاصة تتكيف مع معدل نشرها
+        self.refresh_policy = AdaptiveRefreshPolicy(min_update_interval, max_update_interval)
         
         # إنشاء المجلد إذا لم يكن موجوداً
         os.makedirs(feeds_dir, exist_ok=True)
         
+        self.store = create_metadata_store(storage, feeds_dir)
+        
+        # ملفات الخلاصات في مجلدات مقسمة حسب المعرف
+        self.storage = FeedStorage(feeds_dir)
+        
+        # قفل الكتابة (متداخل لأن تحديث خلاصة يعيد بناء الخلاصات المجمّعة التي تحتويها)
+        self.write_lock = threading.RLock()
+        
+        # فهرس الخلاصات المجمّعة حسب الخلاصات الأعضاء
+        self.aggregates_by_member = {}
+        
+        # فهرس البحث يُحدّث مع كل نشر للبيانات الوصفية
+        self.search_index = SearchIndex()
+        
+        # فهرس نصي كامل لمنشورات جميع الخلاصات
+        self.posts_index = PostsIndex(feeds_dir)
+        
+        # إحصائيات تُحدّث مع كل نشر بدلاً من المرور على كل الخلاصات
+        self.stats = FeedStats()
+        
+        # قوائم مرتبة لعرض الخلاصات على صفحات
+        self.feed_index = FeedListIndex()
+        
+        # فهرس الخلاصات حسب الرابط الموحد لمصدرها لاكتشاف المصادر المكررة
+        self.feeds_by_url = {}
+        
+        # دوال تُستدعى بعد كل نشر بالخلاصات المعدلة والمحذوفة (مثل مجدول التحديث)
+        self.listeners = []
+        
+        # دوال تُستدعى بمحتوى الخلاصة الجديد عند تغيره (مثل موزع WebSub)
+        self.content_listeners = []
+        
         # تحميل البيانات الوصفية
-        self.metadata = self.load_metadata()
+        self.metadata = MappingProxyType({})
+        self.publish_changes(self.load_metadata(), [])
+        
+        self.migrate_flat_layout()
     
     def load_metadata(self) -> Dict:
         """تحميل البيانات الوصفية للخلاصات"""
+        return self.store.load_all()
+    
+    def migrate_flat_layout(self) -> int:
+        """
+        نقل ملفات الخلاصات من التخطيط المسطح القديم إلى المجلدات المقسمة
+        
+        يُنفذ عند بدء التشغيل تحت قفل بين العمليات، وبعد اكتمال النقل لا يكلف
+        إلا قراءة محتوى مجلد الخلاصات الرئيسي.
+        
+        Returns:
+            عدد الخلاصات التي تحدثت مساراتها
+        """
+        with FileLock(os.path.join(self.feeds_dir, 'feeds_layout.lock')).hold():
+            # تطبيق النقل الذي أجرته عملية أخرى قبل الحصول على القفل
+            self.sync_changes()
+            
+            with self.write_lock:
+                upserts = self.storage.migrate_flat_layout(self.metadata)
+                if upserts:
+                    self.publish_changes(upserts, [])
+                    self.store.apply_changes(upserts, [])
+        
+        return len(upserts)
+    
+    def get_xml_path(self, feed_info: Dict) -> str:
+        """المسار الكامل لملف XML للخلاصة"""
+        return self.storage.resolve(feed_info['xml_file'])
+    
+    def publish_changes(self, upserts: Dict, deletes: List[str]):
+        """
+        نشر لقطة جديدة من البيانات الوصفية تتضمن الخلاصات المعدلة والمحذوفة
+        
+        القراء الذين يملكون اللقطة السابقة يكملون عليها دون تأثر
+        """
+        with self.write_lock:
+            records = dict(self.metadata)
+            
+            for feed_id, feed_info in upserts.items():
+                old_info = records.get(feed_id)
+                if old_info and old_info.get('type') == 'aggregate':
+                    self.unindex_aggregate(old_info)
+                
+                records[feed_id] = feed_info
+                if feed_info.get('type') == 'aggregate':
+                    self.index_aggregate(feed_info)
+                
+                self.unindex_source(old_info)
+                self.index_source(feed_info)
+                
+                self.stats.apply(old_info, feed_info)
+                self.search_index.add(feed_info)
+                self.feed_cache.invalidate(feed_id)
+            
+            self.feed_index.add_many(upserts.values())
+            
+            for feed_id in deletes:
+                old_info = records.pop(feed_id, None)
+                if old_info and old_info.get('type') == 'aggregate':
+                    self.unindex_aggregate(old_info)
+                
+                self.unindex_source(old_info)
+                self.stats.apply(old_info, None)
+                self.search_index.remove(feed_id)
+                self.feed_index.remove(feed_id)
+                self.feed_cache.invalidate(feed_id)
+            
+            self.metadata = MappingProxyType(records)
+            
+            for listener in self.listeners:
+                try:
+                    listener(upserts, deletes)
+                except Exception as e:
+                    print(f"خطأ في إشعار مستمع البيانات الوصفية: {e}")
+    
+    def add_listener(self, listener):
+        """
+        تسجيل دالة تُستدعى بعد كل نشر بـ (الخلاصات المعدلة، المعرفات المحذوفة)
+        
+        تُستدعى فوراً بجميع الخلاصات الحالية، وتُستدعى وقفل الكتابة محجوز لذا
+        يجب أن تكون سريعة
+        """
+        with self.write_lock:
+            self.listeners.append(listener)
+            listener(dict(self.metadata), [])
+    
+    def add_content_listener(self, listener):
+        """تسجيل دالة تُستدعى بـ (معلومات الخلاصة، بايتات XML) عند تغير محتوى خلاصة موجودة"""
+        self.content_listeners.append(listener)
+    
+    def notify_content_changed(self, feed_info: Dict, content: bytes):
+        """إبلاغ مستمعي المحتوى بتغير خلاصة"""
+        for listener in self.content_listeners:
+            try:
+                listener(feed_info, content)
+            except Exception as e:
+                print(f"خطأ في مستمع محتوى الخلاصة {feed_info['id']}: {e}")
+    
+    def get_self_url(self, feed_info: Dict) -> str:
+        """الرابط العام للخلاصة (موضوع الاشتراك في WebSub)"""
+        return f"{RSSGenerator().base_url}{feed_info['rss_url']}"
+    
+    def publish_feed(self, feed_info: Dict):
+        """نشر معلومات خلاصة (نسخة جديدة وليست المنشورة) وحفظها في المخزن"""
+        with self.write_lock:
+            self.publish_changes({feed_info['id']: feed_info}, [])
+            self.store.save_feed(feed_info['id'], feed_info)
+    
+    def sync_changes(self) -> int:
+        """
+        تطبيق تغييرات البيانات الوصفية التي أجرتها عمليات أخرى
+        
+        يُستدعى قبل كل طلب، وتكلفته عند عدم وجود تغييرات stat واحد أو
+        استعلام PRAGMA واحد حسب نوع المخزن.
+        
+        Returns:
+            عدد الخلاصات التي تغيرت
+        """
+        changes = self.store.poll_changes()
+        if not changes:
+            return 0
+        
+        upserts, deletes = changes
+        self.publish_changes(upserts, deletes)
+        
+        return len(upserts) + len(deletes)
+    
+    def get_render_cache_path(self, feed_id: str) -> str:
+        """مسار ملف نتائج تحويل منشورات الخلاصة المحفوظة"""
+        return self.storage.path(feed_id, '.render.json')
+    
+    def build_feed_xml(self, feed_info: Dict, scraped_data: Dict) -> str:
+        """
+        إنشاء XML للخلاصة مع إعادة استخدام نتائج تحويل المنشورات غير المتغيرة
+        
+        تُحمّل النتائج المحفوظة مع الخلاصة قبل الإنشاء ثم تُحفظ نتائج المنشورات
+        الحالية فقط بعده. تُدمج العناصر الجديدة مع سجل الخلاصة وتُنقل العناصر
+        الأقدم من نافذة الخلاصة الحالية إلى صفحات أرشيف ثابتة (RFC 5005).
+        """
+        feed_id = feed_info['id']
+        render_path = self.get_render_cache_path(feed_id)
+        
         try:
-            if os.path.exists(self.metadata_file):
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            if os.path.exists(render_path):
+                with open(render_path, 'r', encoding='utf-8') as f:
+                    self.render_cache.load(json.load(f))
         except Exception as e:
-            print(f"خطأ في تحميل البيانات الوصفية: {e}")
+            print(f"خطأ في تحميل نتائج التحويل المحفوظة: {e}")
+        
+        rss_generator = RSSGenerator(self.render_cache)
+        details = rss_generator.get_feed_details(scraped_data)
+        
+        new_items = []
+        for post in scraped_data.get('posts', []):
+            try:
+                new_items.append(rss_generator.build_item(post))
+            except Exception as e:
+                print(f"خطأ في تحويل المنشور: {e}")
+        
+        try:
+            self.storage.write_atomic(
+                render_path, json.dumps(rss_generator.rendered_posts, ensure_ascii=False).encode('utf-8')
+            )
+        except Exception as e:
+            print(f"خطأ في حفظ نتائج التحويل: {e}")
+        
+        history = self.load_feed_items(feed_id)
+        items = self.merge_item_history(history, new_items)
+        
+        # فهرسة المنشورات الحالية فقط بعد دمجها مع السجل للاحتفاظ بتواريخ نشرها الأصلية
+        new_guids = {item['guid'] for item in new_items}
+        
+        # عدد المنشورات التي لم تظهر في أي فحص سابق، ويُستخدم لضبط فترة التحديث
+        feed_info['last_new_posts'] = len(new_guids - {item['guid'] for item in history})
+        if feed_info.get('posting_interval') is None:
+            estimate = self.refresh_policy.estimate_from_items(items)
+            if estimate:
+                feed_info['posting_interval'] = round(estimate, 2)
+        self.posts_index.index_items(feed_info, [item for item in items if item['guid'] in new_guids])
+        
+        items = self.roll_archive_pages(feed_info, items, details)
+        
+        links = []
+        if feed_info.get('archive_pages'):
+            links.append(('prev-archive', self.get_archive_url(feed_id, feed_info['archive_pages'])))
+        
+        rss_xml = RSSGenerator().create_feed_from_items(
+            details['title'], details['description'], details['link'], items, links=links,
+            self_url=self.get_self_url(feed_info), hub_url=self.hub_url
+        )
+        
+        if rss_xml:
+            self.save_feed_items(feed_id, items)
+            feed_info['post_count'] = len(items)
+        
+        return rss_xml
+    
+    def merge_item_history(self, history: List[Dict], new_items: List[Dict]) -> List[Dict]:
+        """
+        دمج العناصر الجديدة مع سجل الخلاصة حسب GUID
+        
+        العنصر المحدث يحتفظ بتاريخ نشره الأصلي
+        """
+        items_by_guid = {item['guid']: item for item in history}
+        
+        for item in new_items:
+            previous = items_by_guid.get(item['guid'])
+            if previous:
+                item = dict(item, pub_date=previous['pub_date'])
+            items_by_guid[item['guid']] = item
+        
+        return sorted(items_by_guid.values(), key=lambda item: item['pub_date'], reverse=True)
+    
+    def get_archive_path(self, feed_id: str, page: int) -> str:
+        """مسار صفحة أرشيف الخلاصة"""
+        return self.storage.path(feed_id, f'.archive-{page}.xml')
+    
+    def get_archive_url(self, feed_id: str, page: int) -> str:
+        """الرابط العام لصفحة أرشيف الخلاصة"""
+        return f"{RSSGenerator().base_url}/feeds/{feed_id}/archive/{page}.xml"
+    
+    def roll_archive_pages(self, feed_info: Dict, items: List[Dict], details: Dict) -> List[Dict]:
+        """
+        نقل أقدم العناصر إلى صفحات أرشيف عند تجاوز نافذة الخلاصة الحالية
+        
+        كل صفحة تُكتب مرة واحدة ولا تتغير بعدها، وترتبط بالصفحة السابقة
+        برابط prev-archive وبالخلاصة الحالية برابط current
+        
+        Returns:
+            العناصر المتبقية في الخلاصة الحالية
+        """
+        feed_id = feed_info['id']
+        page_size = min(self.archive_page_size, self.archive_window)
+        
+        while len(items) > self.archive_window:
+            page_items = items[-page_size:]
+            items = items[:-page_size]
+            page = feed_info.get('archive_pages', 0) + 1
+            
+            links = [('current', f"{RSSGenerator().base_url}{feed_info['rss_url']}")]
+            if page > 1:
+                links.append(('prev-archive', self.get_archive_url(feed_id, page - 1)))
+            
+            rss_xml = RSSGenerator().create_feed_from_items(
+                f"{details['title']} - الأرشيف {page}",
+                details['description'],
+                details['link'],
+                page_items,
+                links=links,
+                archive=True,
+                self_url=self.get_archive_url(feed_id, page)
+            )
+            
+            if not rss_xml:
+                raise ValueError('فشل في إنشاء صفحة الأرشيف')
+            
+            self.storage.write_atomic(self.get_archive_path(feed_id, page), rss_xml.encode('utf-8'))
+            
+            feed_info['archive_pages'] = page
         
-        return {}
+        return items
+    
+    def get_items_path(self, feed_id: str) -> str:
+        """مسار ملف عناصر الخلاصة المرتبة"""
+        return self.storage.path(feed_id, '.items.json')
     
-    def save_metadata(self):
-        """حفظ البيانات الوصفية"""
+    def save_feed_items(self, feed_id: str, items: List[Dict]):
+        """حفظ عناصر الخلاصة مرتبة من الأحدث إلى الأقدم"""
         try:
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+            items = sorted(items, key=lambda item: item['pub_date'], reverse=True)
+            self.storage.write_atomic(
+                self.get_items_path(feed_id), json.dumps(items, ensure_ascii=False).encode('utf-8')
+            )
         except Exception as e:
-            print(f"خطأ في حفظ البيانات الوصفية: {e}")
+            print(f"خطأ في حفظ عناصر الخلاصة: {e}")
+    
+    def load_feed_items(self, feed_id: str) -> List[Dict]:
+        """تحميل عناصر الخلاصة المرتبة"""
+        try:
+            items_path = self.get_items_path(feed_id)
+            if os.path.exists(items_path):
+                with open(items_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"خطأ في تحميل عناصر الخلاصة: {e}")
+        
+        return []
+    
+    def write_feed_xml(self, feed_info: Dict, rss_xml: str):
+        """
+        كتابة ملف XML للخلاصة وتسجيل بصمة المحتوى ووقت تعديله
+        
+        تُستخدم البصمة كـ ETag ووقت التعديل كـ Last-Modified عند تقديم الخلاصة
+        
+        Returns:
+            بايتات الملف المكتوب
+        """
+        content = rss_xml.encode('utf-8')
+        
+        self.storage.write_atomic(self.get_xml_path(feed_info), content)
+        
+        feed_info['content_hash'] = hashlib.sha256(content).hexdigest()
+        feed_info['content_modified'] = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+        
+        self.feed_cache.invalidate(feed_info['id'])
+        
+        return content
+    
+    def get_feed_validators(self, feed_id: str) -> Optional[Dict]:
+        """
+        الحصول على محددات التحقق (ETag و Last-Modified) لخلاصة
+        
+        الخلاصات القديمة التي لا تملك بصمة تُحسب بصمتها مرة واحدة من الملف وتُحفظ
+        
+        Returns:
+            قاموس يحتوي على etag و last_modified و max_age أو None
+        """
+        feed_info = self.metadata.get(feed_id)
+        if not feed_info:
+            return None
+        
+        if not feed_info.get('content_hash'):
+            xml_path = self.get_xml_path(feed_info)
+            if not os.path.exists(xml_path):
+                return None
+            
+            feed_info = dict(feed_info)
+            with open(xml_path, 'rb') as f:
+                feed_info['content_hash'] = hashlib.sha256(f.read()).hexdigest()
+            modified = datetime.fromtimestamp(int(os.path.getmtime(xml_path)), timezone.utc)
+            feed_info['content_modified'] = modified.isoformat()
+            self.publish_feed(feed_info)
+        
+        return {
+            'etag': feed_info['content_hash'],
+            'last_modified': datetime.fromisoformat(feed_info['content_modified']),
+            'max_age': int(feed_info.get('update_interval', 60)) * 60
+        }
+    
+    def get_feed_payload(self, feed_id: str, variant: str = 'identity') -> Optional[Dict]:
+        """
+        الحصول على ترويسات الخلاصة ومحددات التحقق وبايتاتها إن كانت في الذاكرة
+        
+        تُقدَّم الخلاصات الأكثر طلباً من الذاكرة دون أي وصول لنظام الملفات.
+        عند عدم وجودها في الذاكرة تُحسب المحددات من البيانات الوصفية فقط ويكون
+        body فارغاً (None)، فيُرد على الطلب الشرطي بـ 304 دون قراءة الملف أو
+        ضغطه، ولا تُقرأ البايتات عبر load_feed_body إلا عند الحاجة لإرسالها.
+        
+        Args:
+            feed_id: معرف الخلاصة
+            variant: نوع الترميز (identity أو gzip)
+        
+        Returns:
+            قاموس يحتوي على body و headers و validator_headers و validators أو None
+        """
+        entry = self.feed_cache.get(feed_id, variant)
+        if entry is not None:
+            return entry
+        
+        validators = self.get_feed_validators(feed_id)
+        if not validators:
+            return None
+        
+        feed_info = self.metadata.get(feed_id)
+        if not feed_info:
+            return None
+        current = feed_info.get('content_hash') == validators['etag']
+        
+        if variant == 'gzip':
+            validators = dict(validators, etag=f"{validators['etag']}-gzip")
+        
+        # ترويسات التحقق تُرسل أيضاً مع استجابات 304
+        validator_headers = {
+            'ETag': f'"{validators["etag"]}"',
+            'Last-Modified': format_datetime(validators['last_modified'], usegmt=True),
+            'Cache-Control': f"public, max-age={validators['max_age']}",
+            'Vary': 'Accept-Encoding'
+        }
+        
+        headers = dict(
+            validator_headers,
+            **{
+                'Content-Type': 'application/rss+xml; charset=utf-8',
+                'Content-Disposition': f'inline; filename=feed_{feed_id}.xml'
+            }
+        )
+        if self.hub_url:
+            headers['Link'] = f'<{self.hub_url}>; rel="hub", <{self.get_self_url(feed_info)}>; rel="self"'
+        if variant == 'gzip':
+            headers['Content-Encoding'] = 'gzip'
+        
+        return {
+            'body': None,
+            'headers': headers,
+            'validator_headers': validator_headers,
+            'validators': validators,
+            'variant': variant,
+            'feed_info': feed_info,
+            'current': current
+        }
+    
+    def load_feed_body(self, feed_id: str, payload: Dict) -> Optional[bytes]:
+        """
+        قراءة بايتات خلاصة أعادها get_feed_payload دون body وتخزينها في الذاكرة
+        
+        Returns:
+            بايتات الخلاصة (مضغوطة حسب نوع الترميز) أو None إذا حُذف الملف
+        """
+        if payload['body'] is not None:
+            return payload['body']
+        
+        feed_info = payload['feed_info']
+        try:
+            with open(self.get_xml_path(feed_info), 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        
+        if payload['variant'] == 'gzip':
+            body = gzip.compress(body, mtime=0)
+        
+        entry = {
+            'body': body,
+            'headers': payload['headers'],
+            'validator_headers': payload['validator_headers'],
+            'validators': payload['validators']
+        }
+        
+        # لا يُخزن المدخل إذا نُشرت نسخة أحدث من الخلاصة أثناء قراءة الملف
+        if payload['current'] and self.metadata.get(feed_id) is feed_info:
+            self.feed_cache.put(feed_id, payload['variant'], entry)
+        
+        return body
+    
+    def compute_content_fingerprint(self, scraped_data: Dict) -> str:
+        """
+        حساب بصمة مجموعة المنشورات بعد توحيدها
+        
+        البصمة لا تتأثر بترتيب المنشورات ولا بوقت الاستخراج
+        """
+        rss_generator = RSSGenerator()
+        scraped_at = scraped_data.get('scraped_at')
+        
+        post_fingerprints = sorted(
+            rss_generator.fingerprint_post(post, scraped_at)
+            for post in scraped_data.get('posts', [])
+        )
+        
+        feed_fields = [
+            scraped_data.get('platform', ''),
+            scraped_data.get('username', scraped_data.get('page_name', '')),
+            scraped_data.get('url', '')
+        ]
+        
+        encoded = json.dumps([feed_fields, post_fingerprints], ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
     
     def generate_feed_id(self, url: str) -> str:
-        """إنشاء معرف فريد للخلاصة"""
-        return str(abs(hash(url)))[:10]
+        """إنشاء معرف ثابت للخلاصة من الرابط الموحد"""
+        return feed_id_from_url(url)
     
     def create_feed(self, url: str, scraped_data: Dict, update_interval: int = 60) -> Dict:
         """
@@ -59,54 +579,83 @@ class FeedManager:
             url: رابط المصدر
             scraped_data: البيانات المستخرجة
             update_interval: فترة التحديث بالدقائق
-            
+        
         Returns:
             معلومات الخلاصة المُنشأة
         """
+        feed_info = self.build_new_feed(url, scraped_data, update_interval)
+        if 'error' not in feed_info:
+            self.publish_feeds([feed_info])
+        return feed_info
+    
+    def build_new_feed(self, url: str, scraped_data: Dict, update_interval: int = 60) -> Dict:
+        """
+        إنشاء ملفات خلاصة جديدة ومعلوماتها دون نشرها في البيانات الوصفية
+        
+        Returns:
+            معلومات الخلاصة الجاهزة للنشر عبر publish_feeds
+        """
         try:
-            # إنشاء معرف الخلاصة
-            feed_id = self.generate_feed_id(url)
-            
-            # إنشاء مولد RSS
-            rss_generator = RSSGenerator()
-            rss_xml = rss_generator.create_feed_from_scraped_data(scraped_data)
-            
-            if not rss_xml:
-                return {'error': 'فشل في إنشاء خلاصة RSS'}
-            
-            # حفظ ملف XML
-            xml_filename = f"{feed_id}.xml"
-            xml_path = os.path.join(self.feeds_dir, xml_filename)
-            
-            with open(xml_path, 'w', encoding='utf-8') as f:
-                f.write(rss_xml)
+            # إنشاء معرف الخلاصة، والمصدر الموجود يحتفظ بمعرفه (ومنه المعرفات القديمة)
+            existing = self.find_feed_by_url(url)
+            feed_id = existing['id'] if existing else self.generate_feed_id(url)
             
             # إعداد معلومات الخلاصة
             feed_info = {
                 'id': feed_id,
                 'url': url,
+                'canonical_url': canonicalize_url(url),
                 'platform': scraped_data.get('platform', 'Unknown'),
                 'title': f"خلاصة {scraped_data.get('username', scraped_data.get('page_name', 'مستخدم'))} على {scraped_data.get('platform', 'منصة التواصل الاجتماعي')}",
                 'description': f"آخر المنشورات من {scraped_data.get('username', scraped_data.get('page_name', 'مستخدم'))}",
-                'xml_file': xml_filename,
-                'xml_path': xml_path,
+                'xml_file': self.storage.relative_path(feed_id, '.xml'),
                 'created_at': datetime.now().isoformat(),
                 'last_updated': datetime.now().isoformat(),
+                'last_checked': datetime.now().isoformat(),
+                'content_fingerprint': self.compute_content_fingerprint(scraped_data),
                 'update_interval': update_interval,
                 'post_count': len(scraped_data.get('posts', [])),
-                'rss_url': f"/feeds/{xml_filename}",
+                'archive_pages': self.metadata.get(feed_id, {}).get('archive_pages', 0),
+                'rss_url': f"/feeds/{feed_id}.xml",
                 'status': 'active'
             }
             
-            # حفظ في البيانات الوصفية
-            self.metadata[feed_id] = feed_info
-            self.save_metadata()
+            # إنشاء خلاصة RSS
+            rss_xml = self.build_feed_xml(feed_info, scraped_data)
             
-            return feed_info
+            if not rss_xml:
+                return {'error': 'فشل في إنشاء خلاصة RSS'}
+            
+            # الفترة الأولية من تواريخ نشر المنشورات الحالية إن أمكن تقديرها
+            if feed_info.get('posting_interval'):
+                feed_info['update_interval'] = self.refresh_policy.interval_for(feed_info['posting_interval'])
+            feed_info['last_new_post_at'] = feed_info['created_at']
+            feed_info['empty_refreshes'] = 0
             
+            self.write_feed_xml(feed_info, rss_xml)
+            
+            return feed_info
+        
         except Exception as e:
             return {'error': f'خطأ في إنشاء الخلاصة: {str(e)}'}
     
+    def publish_feeds(self, feed_infos: List[Dict]):
+        """
+        نشر وحفظ عدة خلاصات جديدة بكتابة واحدة في المخزن
+        
+        يُستخدم عند الإنشاء الجماعي حتى لا تُكتب البيانات الوصفية مرة لكل خلاصة
+        """
+        if not feed_infos:
+            return
+        
+        upserts = {feed_info['id']: feed_info for feed_info in feed_infos}
+        with self.write_lock:
+            self.publish_changes(upserts, [])
+            self.store.apply_changes(upserts, [])
+        
+        for feed_id in upserts:
+            self.refresh_aggregates_for(feed_id)
+    
     def update_feed(self, feed_id: str, scraped_data: Dict) -> Dict:
         """
         تحديث خلاصة موجودة
@@ -114,39 +663,303 @@ class FeedManager:
         Args:
             feed_id: معرف الخلاصة
             scraped_data: البيانات الجديدة
-            
+        
         Returns:
-            معلومات الخلاصة المحدثة
+            معلومات الخلاصة المحدثة مع الحقل changed الذي يوضح تغير المحتوى
         """
         try:
-            if feed_id not in self.metadata:
+            feed_info = self.metadata.get(feed_id)
+            if not feed_info:
                 return {'error': 'الخلاصة غير موجودة'}
             
-            feed_info = self.metadata[feed_id]
+            feed_info = dict(feed_info)
             
-            # إنشاء مولد RSS
-            rss_generator = RSSGenerator()
-            rss_xml = rss_generator.create_feed_from_scraped_data(scraped_data)
+            # تخطي إعادة الإنشاء والكتابة إذا لم يتغير المحتوى
+            fingerprint = self.compute_content_fingerprint(scraped_data)
+            feed_info['last_checked'] = datetime.now().isoformat()
+            
+            if (fingerprint == feed_info.get('content_fingerprint') and
+                    os.path.exists(self.get_xml_path(feed_info))):
+                feed_info['last_new_posts'] = 0
+                feed_info.update(self.refresh_policy.observe(feed_info, 0))
+                if not self.publish_existing(feed_info):
+                    return {'error': 'الخلاصة غير موجودة'}
+                return dict(feed_info, changed=False)
+            
+            # إنشاء خلاصة RSS
+            rss_xml = self.build_feed_xml(feed_info, scraped_data)
             
             if not rss_xml:
                 return {'error': 'فشل في تحديث خلاصة RSS'}
             
             # حفظ ملف XML المحدث
-            xml_path = feed_info['xml_path']
-            with open(xml_path, 'w', encoding='utf-8') as f:
-                f.write(rss_xml)
+            content = self.write_feed_xml(feed_info, rss_xml)
             
             # تحديث معلومات الخلاصة
             feed_info['last_updated'] = datetime.now().isoformat()
-            feed_info['post_count'] = len(scraped_data.get('posts', []))
+            feed_info['content_fingerprint'] = fingerprint
+            feed_info.update(self.refresh_policy.observe(feed_info, feed_info['last_new_posts']))
+            
+            if not self.publish_existing(feed_info):
+                return {'error': 'الخلاصة غير موجودة'}
             
-            self.save_metadata()
+            # المحتوى تغير فعلاً (الفحص الذي لا يجد جديداً لا يصل إلى هنا)
+            self.notify_content_changed(feed_info, content)
             
-            return feed_info
+            self.refresh_aggregates_for(feed_id)
             
+            return dict(feed_info, changed=True)
+        
         except Exception as e:
             return {'error': f'خطأ في تحديث الخلاصة: {str(e)}'}
     
+    def publish_existing(self, feed_info: Dict) -> bool:
+        """
+        نشر معلومات خلاصة فقط إذا لم تُحذف أثناء تحديثها
+        
+        Returns:
+            True إذا نُشرت المعلومات
+        """
+        with self.write_lock:
+            if feed_info['id'] not in self.metadata:
+                return False
+            
+            self.publish_feed(feed_info)
+            return True
+    
+    def source_key(self, feed_info: Dict) -> Optional[str]:
+        """الرابط الموحد لمصدر الخلاصة (الخلاصات المجمّعة ليس لها مصدر)"""
+        if feed_info.get('canonical_url'):
+            return feed_info['canonical_url']
+        if feed_info.get('url'):
+            return canonicalize_url(feed_info['url'])
+        return None
+    
+    def index_source(self, feed_info: Dict):
+        """تسجيل الخلاصة في فهرس المصادر (يُستدعى وقفل الكتابة محجوز)"""
+        key = self.source_key(feed_info)
+        if key:
+            self.feeds_by_url[key] = feed_info['id']
+    
+    def unindex_source(self, feed_info: Optional[Dict]):
+        """إزالة الخلاصة من فهرس المصادر (يُستدعى وقفل الكتابة محجوز)"""
+        key = self.source_key(feed_info) if feed_info else None
+        if key and self.feeds_by_url.get(key) == feed_info['id']:
+            del self.feeds_by_url[key]
+    
+    def find_feed_by_url(self, url: str) -> Optional[Dict]:
+        """
+        البحث عن خلاصة موجودة لنفس المصدر
+        
+        Args:
+            url: رابط المصدر بأي شكل من أشكاله (www أو الجوال أو معاملات التتبع)
+        
+        Returns:
+            معلومات الخلاصة أو None
+        """
+        feed_id = self.feeds_by_url.get(canonicalize_url(url))
+        return self.metadata.get(feed_id) if feed_id else None
+    
+    def index_aggregate(self, feed_info: Dict):
+        """تسجيل خلاصة مجمّعة في فهرس الأعضاء (يُستدعى وقفل الكتابة محجوز)"""
+        index = dict(self.aggregates_by_member)
+        for member_id in feed_info['members']:
+            index[member_id] = index.get(member_id, frozenset()) | {feed_info['id']}
+        self.aggregates_by_member = index
+    
+    def unindex_aggregate(self, feed_info: Dict):
+        """إزالة خلاصة مجمّعة من فهرس الأعضاء (يُستدعى وقفل الكتابة محجوز)"""
+        index = dict(self.aggregates_by_member)
+        for member_id in feed_info['members']:
+            aggregates = index.get(member_id, frozenset()) - {feed_info['id']}
+            if aggregates:
+                index[member_id] = aggregates
+            else:
+                index.pop(member_id, None)
+        self.aggregates_by_member = index
+    
+    def create_aggregate_feed(self, feed_ids: List[str], title: Optional[str] = None,
+                              max_items: int = 50) -> Dict:
+        """
+        إنشاء خلاصة مجمّعة من عدة خلاصات موجودة
+        
+        تُبنى الخلاصة بدمج العناصر المحفوظة للأعضاء حسب التاريخ دون إعادة
+        استخراج أو تحويل أي منشور
+        
+        Args:
+            feed_ids: معرفات الخلاصات الأعضاء
+            title: عنوان الخلاصة المجمّعة
+            max_items: الحد الأقصى لعدد العناصر
+        
+        Returns:
+            معلومات الخلاصة المجمّعة
+        """
+        try:
+            members = sorted(set(feed_ids))
+            
+            if len(members) < 2:
+                return {'error': 'يجب اختيار خلاصتين على الأقل'}
+            
+            if max_items < 1:
+                return {'error': 'قيمة max_items غير صالحة'}
+            
+            metadata = self.metadata
+            missing = [feed_id for feed_id in members if feed_id not in metadata]
+            if missing:
+                return {'error': f"خلاصات غير موجودة: {', '.join(missing)}"}
+            
+            feed_id = 'agg' + hashlib.sha256('|'.join(members).encode('utf-8')).hexdigest()[:10]
+            
+            # نفس مجموعة الأعضاء تعيد الخلاصة الموجودة
+            if feed_id in metadata:
+                return dict(metadata[feed_id])
+            
+            member_infos = [metadata[member_id] for member_id in members]
+            feed_info = {
+                'id': feed_id,
+                'type': 'aggregate',
+                'url': '',
+                'members': members,
+                'max_items': max_items,
+                'platform': 'Aggregate',
+                'title': title or f"خلاصة مجمّعة من {len(members)} مصادر",
+                'description': 'آخر المنشورات من: ' + '، '.join(info['title'] for info in member_infos),
+                'xml_file': self.storage.relative_path(feed_id, '.xml'),
+                'created_at': datetime.now().isoformat(),
+                'last_updated': datetime.now().isoformat(),
+                'last_checked': datetime.now().isoformat(),
+                'update_interval': min(info.get('update_interval', 60) for info in member_infos),
+                'post_count': 0,
+                'rss_url': f"/feeds/{feed_id}.xml",
+                'status': 'active'
+            }
+            
+            # تُنشر قبل البناء لأن إعادة البناء تقرأ معلوماتها من اللقطة المنشورة
+            self.publish_changes({feed_id: feed_info}, [])
+            
+            result = self.rebuild_aggregate_feed(feed_id)
+            if 'error' in result:
+                self.publish_changes({}, [feed_id])
+            
+            return result
+        
+        except Exception as e:
+            return {'error': f'خطأ في إنشاء الخلاصة المجمّعة: {str(e)}'}
+    
+    def merge_member_items(self, members: List[str], max_items: int) -> List[Dict]:
+        """دمج عناصر الأعضاء المرتبة مسبقاً مع الاكتفاء بأحدث max_items عنصر"""
+        streams = [self.tag_items(self.load_feed_items(member_id), member_id) for member_id in members]
+        merged = heapq.merge(*streams, key=lambda item: item['pub_date'], reverse=True)
+        return list(islice(merged, max_items))
+    
+    def merge_changed_member(self, aggregate_id: str, member_id: str, max_items: int) -> Optional[List[Dict]]:
+        """
+        دمج تزايدي: استبدال عناصر العضو المحدث فقط في نتيجة الدمج السابقة
+        
+        Returns:
+            العناصر المدمجة أو None إذا لزم إعادة الدمج الكامل
+        """
+        previous = self.load_feed_items(aggregate_id)
+        if not previous:
+            return None
+        
+        others = [item for item in previous if item.get('source_id') != member_id]
+        fresh = self.tag_items(self.load_feed_items(member_id), member_id)
+        merged = list(islice(
+            heapq.merge(others, fresh, key=lambda item: item['pub_date'], reverse=True),
+            max_items
+        ))
+        
+        # النتيجة السابقة كانت تحتوي على كل العناصر، فلا شيء مفقود
+        if len(previous) < max_items:
+            return merged
+        
+        # عناصر الأعضاء الآخرين خارج الحد السابق أقدم من cutoff
+        cutoff = previous[-1]['pub_date']
+        if len(merged) == max_items and merged[-1]['pub_date'] >= cutoff:
+            return merged
+        
+        return None
+    
+    def tag_items(self, items: List[Dict], member_id: str):
+        """إضافة معرف الخلاصة المصدر لكل عنصر"""
+        return (dict(item, source_id=member_id) for item in items)
+    
+    def rebuild_aggregate_feed(self, aggregate_id: str, changed_member: Optional[str] = None) -> Dict:
+        """
+        إعادة بناء خلاصة مجمّعة
+        
+        Args:
+            aggregate_id: معرف الخلاصة المجمّعة
+            changed_member: العضو الذي تغير محتواه للدمج التزايدي
+        
+        Returns:
+            معلومات الخلاصة المجمّعة مع الحقل changed
+        """
+        try:
+            feed_info = self.metadata.get(aggregate_id)
+            if not feed_info or feed_info.get('type') != 'aggregate':
+                return {'error': 'الخلاصة المجمّعة غير موجودة'}
+            
+            feed_info = dict(feed_info)
+            members = [member_id for member_id in feed_info['members'] if member_id in self.metadata]
+            max_items = feed_info.get('max_items', 50)
+            
+            items = None
+            if changed_member in members:
+                items = self.merge_changed_member(aggregate_id, changed_member, max_items)
+            if items is None:
+                items = self.merge_member_items(members, max_items)
+            
+            feed_info['last_checked'] = datetime.now().isoformat()
+            
+            encoded = json.dumps(items, sort_keys=True, ensure_ascii=False)
+            fingerprint = hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+            
+            if (fingerprint == feed_info.get('content_fingerprint') and
+                    os.path.exists(self.get_xml_path(feed_info))):
+                self.publish_existing(feed_info)
+                return dict(feed_info, changed=False)
+            
+            rss_xml = RSSGenerator().create_feed_from_items(
+                feed_info['title'],
+                feed_info['description'],
+                self.get_self_url(feed_info),
+                items,
+                self_url=self.get_self_url(feed_info),
+                hub_url=self.hub_url
+            )
+            
+            if not rss_xml:
+                return {'error': 'فشل في إنشاء الخلاصة المجمّعة'}
+            
+            content = self.write_feed_xml(feed_info, rss_xml)
+            self.save_feed_items(aggregate_id, items)
+            
+            feed_info['last_updated'] = datetime.now().isoformat()
+            feed_info['content_fingerprint'] = fingerprint
+            feed_info['post_count'] = len(items)
+            
+            if not self.publish_existing(feed_info):
+                return {'error': 'الخلاصة المجمّعة غير موجودة'}
+            
+            self.notify_content_changed(feed_info, content)
+            
+            # الخلاصات المجمّعة يمكن أن تكون أعضاء في خلاصات مجمّعة أخرى
+            self.refresh_aggregates_for(aggregate_id)
+            
+            return dict(feed_info, changed=True)
+        
+        except Exception as e:
+            return {'error': f'خطأ في تحديث الخلاصة المجمّعة: {str(e)}'}
+    
+    def refresh_aggregates_for(self, feed_id: str):
+        """إعادة بناء الخلاصات المجمّعة التي تحتوي على الخلاصة بشكل تزايدي"""
+        for aggregate_id in self.aggregates_by_member.get(feed_id, ()):
+            result = self.rebuild_aggregate_feed(aggregate_id, changed_member=feed_id)
+            if 'error' in result:
+                print(f"خطأ في تحديث الخلاصة المجمّعة {aggregate_id}: {result['error']}")
+    
     def get_feed_info(self, feed_id: str) -> Optional[Dict]:
         """الحصول على معلومات خلاصة"""
         return self.metadata.get(feed_id)
@@ -155,36 +968,154 @@ class FeedManager:
         """الحصول على جميع الخلاصات"""
         return list(self.metadata.values())
     
+    def public_feed_info(self, feed_info: Dict, fields: Optional[List[str]] = None) -> Dict:
+        """
+        معلومات الخلاصة القابلة للعرض عبر API
+        
+        Args:
+            feed_info: معلومات الخلاصة
+            fields: الحقول المطلوبة فقط (المعرف يُضاف دائماً)
+        """
+        if fields:
+            return {
+                field: feed_info[field] for field in ['id'] + fields
+                if field in feed_info and field not in self.PRIVATE_FIELDS
+            }
+        
+        return {key: value for key, value in feed_info.items() if key not in self.PRIVATE_FIELDS}
+    
+    def list_feeds(self, sort: str = '-created_at', platform: Optional[str] = None,
+                   status: Optional[str] = None, stale_before: Optional[str] = None,
+                   cursor: Optional[str] = None, limit: int = 50,
+                   fields: Optional[List[str]] = None) -> Dict:
+        """
+        عرض الخلاصات على صفحات من الفهارس المرتبة
+        
+        Args:
+            sort: حقل الترتيب، وبادئة - للترتيب التنازلي
+            platform: تصفية حسب المنصة
+            status: تصفية حسب الحالة
+            stale_before: الخلاصات التي لم تُفحص منذ هذا التاريخ (يتطلب الترتيب حسب last_checked)
+            cursor: مؤشر الصفحة التالية من الاستجابة السابقة
+            limit: عدد الخلاصات في الصفحة
+            fields: الحقول المطلوبة فقط
+        
+        Returns:
+            قاموس يحتوي على feeds و total و next_cursor
+        
+        Raises:
+            ValueError: إذا كان الترتيب أو المؤشر غير صالح
+        """
+        descending = sort.startswith('-')
+        sort_field = sort.lstrip('-')
+        
+        if stale_before is not None and sort_field != 'last_checked':
+            raise ValueError('التصفية حسب stale_before تتطلب الترتيب حسب last_checked')
+        
+        page = self.feed_index.query(
+            sort_field, descending, platform=platform, status=status,
+            before=stale_before, cursor=cursor, limit=limit
+        )
+        
+        metadata = self.metadata
+        feeds = [
+            self.public_feed_info(metadata[feed_id], fields)
+            for feed_id in page['ids'] if feed_id in metadata
+        ]
+        
+        return {'feeds': feeds, 'total': page['total'], 'next_cursor': page['next_cursor']}
+    
+    def iter_feeds(self, sort: str = 'created_at', platform: Optional[str] = None,
+                   status: Optional[str] = None, page_size: int = 500) -> Iterator[Dict]:
+        """
+        المرور على الخلاصات المطابقة صفحة بعد صفحة دون نسخها كلها في الذاكرة
+        
+        Raises:
+            ValueError: إذا كان الترتيب غير صالح (عند طلب أول خلاصة)
+        """
+        cursor = None
+        while True:
+            page = self.list_feeds(sort, platform=platform, status=status, cursor=cursor, limit=page_size)
+            yield from page['feeds']
+            
+            cursor = page['next_cursor']
+            if not cursor:
+                return
+    
     def delete_feed(self, feed_id: str) -> bool:
         """
         حذف خلاصة
         
         Args:
             feed_id: معرف الخلاصة
-            
+        
         Returns:
             True إذا تم الحذف بنجاح
         """
+        return self.delete_feeds([feed_id]) == 1
+    
+    def delete_feeds(self, feed_ids: List[str]) -> int:
+        """
+        حذف مجموعة من الخلاصات دفعة واحدة
+        
+        تُنشر البيانات الوصفية وتُحفظ في المخزن مرة واحدة للدفعة كلها، ثم
+        تُحذف ملفات الخلاصات وتُعاد بناء الخلاصات المجمّعة المتأثرة.
+        
+        Args:
+            feed_ids: معرفات الخلاصات
+        
+        Returns:
+            عدد الخلاصات المحذوفة
+        """
         try:
-            if feed_id not in self.metadata:
-                return False
+            with self.write_lock:
+                metadata = self.metadata
+                deleted = {feed_id: metadata[feed_id] for feed_id in dict.fromkeys(feed_ids) if feed_id in metadata}
+                if not deleted:
+                    return 0
+                
+                # إزالة الخلاصات من الخلاصات المجمّعة التي تحتويها
+                affected = {}
+                for feed_id in deleted:
+                    for aggregate_id in self.aggregates_by_member.get(feed_id, ()):
+                        if aggregate_id not in deleted:
+                            affected.setdefault(aggregate_id, dict(metadata[aggregate_id]))
+                
+                for aggregate_info in affected.values():
+                    aggregate_info['members'] = [m for m in aggregate_info['members'] if m not in deleted]
+                
+                # حذف من البيانات الوصفية
+                self.publish_changes(affected, list(deleted))
+                self.store.apply_changes(affected, list(deleted))
             
-            feed_info = self.metadata[feed_id]
+            self.posts_index.delete_feeds(list(deleted))
             
-            # حذف ملف XML
-            xml_path = feed_info.get('xml_path')
-            if xml_path and os.path.exists(xml_path):
-                os.remove(xml_path)
+            for feed_info in deleted.values():
+                self.remove_feed_files(feed_info)
             
-            # حذف من البيانات الوصفية
-            del self.metadata[feed_id]
-            self.save_metadata()
-            
-            return True
+            for aggregate_id in affected:
+                self.rebuild_aggregate_feed(aggregate_id)
             
+            return len(deleted)
+        
         except Exception as e:
             print(f"خطأ في حذف الخلاصة: {e}")
-            return False
+            return 0
+    
+    def remove_feed_files(self, feed_info: Dict):
+        """حذف ملف XML للخلاصة وملفات سجلها وصفحات أرشيفها"""
+        feed_id = feed_info['id']
+        
+        paths = [self.get_xml_path(feed_info), self.get_render_cache_path(feed_id), self.get_items_path(feed_id)]
+        paths += [self.get_archive_path(feed_id, page)
+                  for page in range(1, feed_info.get('archive_pages', 0) + 1)]
+        
+        for path in paths:
+            try:
+                if path and os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                print(f"خطأ في حذف ملف الخلاصة {path}: {e}")
     
     def get_feeds_needing_update(self) -> List[Dict]:
         """الحصول على الخلاصات التي تحتاج تحديث"""
@@ -192,60 +1123,112 @@ class FeedManager:
         current_time = datetime.now()
         
         for feed_info in self.metadata.values():
-            if feed_info.get('status') != 'active':
+            if feed_info.get('status') != 'active' or feed_info.get('type') == 'aggregate':
                 continue
             
-            last_updated = datetime.fromisoformat(feed_info['last_updated'])
+            last_checked = datetime.fromisoformat(feed_info.get('last_checked', feed_info['last_updated']))
             update_interval = feed_info.get('update_interval', 60)
             
-            if current_time - last_updated > timedelta(minutes=update_interval):
+            if current_time - last_checked > timedelta(minutes=update_interval):
                 feeds_to_update.append(feed_info)
         
         return feeds_to_update
     
-    def cleanup_old_feeds(self, max_age_days: int = 30):
-        """تنظيف الخلاصات القديمة"""
-        current_time = datetime.now()
-        feeds_to_delete = []
+    def cleanup_old_feeds(self, max_age_days: int = 30, batch_size: int = 100,
+                          time_budget: Optional[float] = None) -> int:
+        """
+        تنظيف الخلاصات القديمة على دفعات
         
-        for feed_id, feed_info in self.metadata.items():
-            last_updated = datetime.fromisoformat(feed_info['last_updated'])
-            
-            if current_time - last_updated > timedelta(days=max_age_days):
-                feeds_to_delete.append(feed_id)
+        تُحذف خلاصة المصدر التي لم يُفحص مصدرها بنجاح منذ max_age_days يوماً
+        أياً كانت حالتها، ومنها المصادر التي تفشل كل محاولات استخراجها طوال
+        هذه المدة (لأن الفحص الفاشل لا يحدّث last_checked). الخلاصات التي لا
+        يتغير محتواها تبقى طالما يتم فحصها. الخلاصات المجمّعة لا تُفحص بنفسها
+        فتبقى ما دام لها أعضاء، وتُحذف إذا فرغت من الأعضاء ومضت المدة.
+        
+        الخلاصات الأقدم فحصاً تُقرأ من فهرس last_checked المرتب دون المرور على
+        كل الخلاصات، وكل خلاصة محذوفة تُسجل معرفها.
+        
+        Args:
+            max_age_days: عمر آخر فحص الذي تُحذف بعده الخلاصة
+            batch_size: عدد الخلاصات المقروءة من الفهرس في كل دفعة
+            time_budget: الحد الأقصى للوقت بالثواني (تكمل الدفعات المتبقية في المرة التالية)
+        
+        Returns:
+            عدد الخلاصات المحذوفة
+        """
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+        deleted = 0
+        cursor = None
         
-        for feed_id in feeds_to_delete:
-            self.delete_feed(feed_id)
+        while deadline is None or time.monotonic() < deadline:
+            page = self.feed_index.query('last_checked', descending=False, before=cutoff,
+                                         cursor=cursor, limit=batch_size)
+            
+            metadata = self.metadata
+            feed_ids = [
+                feed_id for feed_id in page['ids']
+                if feed_id in metadata and (metadata[feed_id].get('type') != 'aggregate' or
+                                            not metadata[feed_id].get('members'))
+            ]
+            
+            if feed_ids:
+                count = self.delete_feeds(feed_ids)
+                if count:
+                    print(f"تم حذف {count} من الخلاصات التي لم تُفحص منذ {max_age_days} يوماً: {', '.join(feed_ids)}")
+                deleted += count
+            
+            cursor = page['next_cursor']
+            if not cursor:
+                break
         
-        return len(feeds_to_delete)
+        return deleted
     
     def get_feed_stats(self) -> Dict:
-        """الحصول على إحصائيات الخلاصات"""
-        total_feeds = len(self.metadata)
-        active_feeds = len([f for f in self.metadata.values() if f.get('status') == 'active'])
+        """الحصول على إحصائيات الخلاصات من العدادات المحدثة تزايدياً"""
+        return dict(
+            self.stats.get_stats(),
+            feeds_dir=self.feeds_dir,
+            feed_cache=self.feed_cache.get_stats(),
+            render_cache=self.render_cache.get_stats(),
+            search_index=self.search_index.get_stats()
+        )
+    
+    def search_feeds(self, query: str, limit: int = 50, offset: int = 0) -> Dict:
+        """
+        البحث في الخلاصات باستخدام الفهرس المعكوس
         
-        platforms = {}
-        for feed_info in self.metadata.values():
-            platform = feed_info.get('platform', 'Unknown')
-            platforms[platform] = platforms.get(platform, 0) + 1
+        Args:
+            query: نص البحث
+            limit: الحد الأقصى لعدد النتائج
+            offset: عدد النتائج المتخطاة
         
-        return {
-            'total_feeds': total_feeds,
-            'active_feeds': active_feeds,
-            'platforms': platforms,
-            'feeds_dir': self.feeds_dir
-        }
+        Returns:
+            قاموس يحتوي على total و results مرتبة حسب الصلة
+        """
+        total, feed_ids = self.search_index.search(query, limit, offset)
+        
+        metadata = self.metadata
+        results = [self.public_feed_info(metadata[feed_id]) for feed_id in feed_ids if feed_id in metadata]
+        
+        return {'total': total, 'results': results}
     
-    def search_feeds(self, query: str) -> List[Dict]:
-        """البحث في الخلاصات"""
-        results = []
-        query_lower = query.lower()
+    def search_posts(self, query: str, **filters) -> Dict:
+        """
+        البحث في نصوص منشورات جميع الخلاصات
         
-        for feed_info in self.metadata.values():
-            if (query_lower in feed_info.get('title', '').lower() or
-                query_lower in feed_info.get('description', '').lower() or
-                query_lower in feed_info.get('platform', '').lower()):
-                results.append(feed_info)
+        Args:
+            query: نص البحث
+            **filters: platform و feed_id و since و until و sort و limit و offset
         
-        return results
-
+        Returns:
+            قاموس يحتوي على results و has_more
+        """
+        result = self.posts_index.search(query, **filters)
+        
+        metadata = self.metadata
+        for post in result['results']:
+            feed_info = metadata.get(post['feed_id'])
+            post['feed_title'] = feed_info['title'] if feed_info else None
+        
+        return result
@@ -0,0 +1,291 @@
+"""
+جدولة تحديث الخلاصات تلقائياً باستخدام كومة أوقات الاستحقاق ومجموعة عمال محدودة
+"""
+
+import time
+import heapq
+import random
+import atexit
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+
+class FeedScheduler:
+    """
+    مجدول تحديث الخلاصات النشطة
+    
+    يحتفظ بكومة صغرى من (وقت الاستحقاق، الخلاصة) تُحدّث من تغييرات البيانات
+    الوصفية، فتكلفة جدولة كل خلاصة O(log n) ولا يمر المجدول على كل الخلاصات.
+    المدخلات القديمة في الكومة لا تُحذف بل تُتجاهل عند سحبها إذا لم تطابق
+    وقت الاستحقاق الحالي للخلاصة.
+    
+    خيط التوزيع يسحب الخلاصات المستحقة ويرسلها إلى مجموعة عمال محدودة، ولا
+    يرسل خلاصة جديدة إلا عند وجود عامل متاح، فيبقى التراكم مرتباً في الكومة
+    حسب الأقدم استحقاقاً. فترة كل خلاصة تُضاف إليها نسبة عشوائية (jitter)
+    حتى لا تتحدث الخلاصات التي أُنشئت معاً في نفس اللحظة.
+    
+    عند تشغيل عدة نسخ من التطبيق يحجز العامل عقداً على الخلاصة في مخزن عقود
+    مشترك قبل تحديثها، ثم يطبق تغييرات البيانات الوصفية من النسخ الأخرى ويتخطى
+    الخلاصة إذا كانت نسخة أخرى قد حدّثتها للتو. العقد يُمدد دورياً أثناء
+    التحديث ويُنهى بعده، وعقد النسخة المتوقفة ينتهي بعد مدته فتتولاها نسخة
+    أخرى. كل نسخة تحدّث خلاصات مختلفة، فتزيد سعة التحديث مع عدد النسخ.
+    """
+    
+    def __init__(self, refresh: Callable[[str], bool], workers: int = 4, jitter: float = 0.1,
+                 leases=None, lease_ttl: float = 300, sync: Optional[Callable[[], int]] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        تهيئة المجدول
+        
+        Args:
+            refresh: دالة تحديث خلاصة تستقبل معرفها وتعيد True عند النجاح
+            workers: عدد العمال
+            jitter: النسبة العشوائية القصوى من فترة التحديث (0.1 = ±10%)
+            leases: مخزن عقود مشترك بين النسخ (None لنسخة واحدة)
+            lease_ttl: مدة العقد بالثواني
+            sync: دالة تطبيق تغييرات البيانات الوصفية من النسخ الأخرى
+            clock: مصدر الوقت الحالي بالثواني (يُستبدل في الاختبارات)
+        """
+        self.refresh = refresh
+        self.workers = workers
+        self.jitter = jitter
+        self.leases = leases
+        self.lease_ttl = lease_ttl
+        self.sync = sync
+        self.clock = clock
+        
+        self.heap: List[tuple] = []
+        self.due: Dict[str, float] = {}
+        self.schedules: Dict[str, tuple] = {}
+        self.running = set()
+        self.sequence = 0
+        self.condition = threading.Condition()
+        
+        self.dispatched = 0
+        self.failures = 0
+        self.lease_skips = 0
+        self.lost_leases = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        
+        self.executor = None
+        self.dispatcher = None
+        self.renewer = None
+        self.stop_event = threading.Event()
+    
+    def is_schedulable(self, feed_info: Dict) -> bool:
+        """الخلاصات النشطة غير المجمّعة فقط تُحدّث تلقائياً"""
+        return feed_info.get('status') == 'active' and feed_info.get('type') != 'aggregate'
+    
+    def jittered(self, interval: float) -> float:
+        """الفترة مع نسبة عشوائية"""
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+    
+    def push(self, feed_id: str, due: float):
+        """إضافة وقت استحقاق خلاصة إلى الكومة (يُستدعى والقفل محجوز)"""
+        self.due[feed_id] = due
+        self.sequence += 1
+        heapq.heappush(self.heap, (due, self.sequence, feed_id))
+    
+    def on_changes(self, upserts: Dict, deletes: List[str]):
+        """
+        تحديث الجدول من تغييرات البيانات الوصفية
+        
+        يُسجّل كمستمع في FeedManager، فكل فحص ناجح يحدّث last_checked ويعيد
+        جدولة الخلاصة تلقائياً
+        """
+        with self.condition:
+            earliest = self.heap[0][0] if self.heap else None
+            
+            for feed_id, feed_info in upserts.items():
+                if not self.is_schedulable(feed_info):
+                    self.due.pop(feed_id, None)
+                    self.schedules.pop(feed_id, None)
+                    continue
+                
+                interval = float(feed_info.get('update_interval', 60)) * 60
+                last_checked = feed_info.get('last_checked', feed_info.get('last_updated'))
+                
+                # التعديلات التي لا تغير وقت الفحص أو الفترة (مثل العنوان) لا تعيد الجدولة
+                schedule = (interval, last_checked)
+                if feed_id in self.due and self.schedules.get(feed_id) == schedule:
+                    continue
+                self.schedules[feed_id] = schedule
+                
+                try:
+                    checked_at = datetime.fromisoformat(last_checked).timestamp()
+                except (TypeError, ValueError):
+                    checked_at = self.clock() - interval
+                
+                self.push(feed_id, checked_at + self.jittered(interval))
+            
+            for feed_id in deletes:
+                self.due.pop(feed_id, None)
+                self.schedules.pop(feed_id, None)
+            
+            if self.heap and (earliest is None or self.heap[0][0] < earliest):
+                self.condition.notify()
+    
+    def start(self):
+        """تشغيل خيط التوزيع ومجموعة العمال"""
+        if self.dispatcher:
+            return
+        
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='feed-refresh')
+        self.dispatcher = threading.Thread(target=self.run_dispatcher, daemon=True)
+        self.dispatcher.start()
+        
+        if self.leases:
+            self.renewer = threading.Thread(target=self.run_renewer, daemon=True)
+            self.renewer.start()
+        
+        atexit.register(self.close)
+    
+    def run_dispatcher(self):
+        """سحب الخلاصات المستحقة وإرسالها إلى العمال"""
+        with self.condition:
+            while not self.stop_event.is_set():
+                # تجاهل المدخلات التي تغير استحقاقها أو حُذفت خلاصتها
+                while self.heap and self.due.get(self.heap[0][2]) != self.heap[0][0]:
+                    heapq.heappop(self.heap)
+                
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                
+                due, _, feed_id = self.heap[0]
+                now = self.clock()
+                
+                if due > now:
+                    self.condition.wait(due - now)
+                    continue
+                
+                if len(self.running) >= self.workers:
+                    self.condition.wait()
+                    continue
+                
+                heapq.heappop(self.heap)
+                del self.due[feed_id]
+                
+                # الخلاصة قيد التحديث تُعاد جدولتها بعد انتهاء تحديثها الحالي
+                if feed_id in self.running:
+                    continue
+                
+                self.running.add(feed_id)
+                self.dispatched += 1
+                self.last_lag = now - due
+                self.max_lag = max(self.max_lag, self.last_lag)
+                self.executor.submit(self.run_refresh, feed_id)
+    
+    def claim(self, feed_id: str) -> bool:
+        """
+        حجز الخلاصة قبل تحديثها عند وجود مخزن عقود
+        
+        Returns:
+            False إذا كانت نسخة أخرى تحدّثها الآن أو حدّثتها منذ استحقاقها هنا
+        """
+        if not self.leases:
+            return True
+        
+        if not self.leases.acquire(feed_id, self.lease_ttl):
+            return False
+        
+        # تحديث نسخة أخرى يغير last_checked فيعيد on_changes جدولة الخلاصة لوقت لاحق
+        if self.sync:
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"خطأ في مزامنة البيانات الوصفية قبل تحديث الخلاصة {feed_id}: {e}")
+        
+        with self.condition:
+            refreshed_elsewhere = self.due.get(feed_id, 0) > self.clock()
+        
+        if refreshed_elsewhere:
+            self.leases.release(feed_id)
+            return False
+        
+        return True
+    
+    def run_refresh(self, feed_id: str):
+        """تحديث خلاصة في أحد العمال"""
+        claimed = False
+        try:
+            claimed = self.claim(feed_id)
+            success = self.refresh(feed_id) if claimed else True
+        except Exception as e:
+            print(f"خطأ في التحديث المجدول للخلاصة {feed_id}: {e}")
+            success = False
+        finally:
+            if claimed and self.leases:
+                try:
+                    self.leases.release(feed_id)
+                except Exception as e:
+                    print(f"خطأ في إنهاء عقد الخلاصة {feed_id}: {e}")
+        
+        with self.condition:
+            self.running.discard(feed_id)
+            
+            if not claimed:
+                self.lease_skips += 1
+            elif not success:
+                self.failures += 1
+            
+            # الفشل لا يغير last_checked، فتُعاد المحاولة بعد فترة كاملة
+            if feed_id not in self.due and feed_id in self.schedules:
+                self.push(feed_id, self.clock() + self.jittered(self.schedules[feed_id][0]))
+            
+            self.condition.notify()
+    
+    def run_renewer(self):
+        """تمديد عقود الخلاصات قيد التحديث كل ثلث مدة العقد"""
+        while not self.stop_event.wait(self.lease_ttl / 3):
+            with self.condition:
+                feed_ids = list(self.running)
+            
+            try:
+                lost = self.leases.renew(feed_ids, self.lease_ttl)
+            except Exception as e:
+                print(f"خطأ في تمديد عقود الخلاصات: {e}")
+                continue
+            
+            # العقد المفقود يعني أن التحديث تجاوز مدة العقد وقد تتولاه نسخة أخرى
+            running = set(feed_ids)
+            with self.condition:
+                running &= self.running
+                lost = [feed_id for feed_id in lost if feed_id in running]
+                self.lost_leases += len(lost)
+            for feed_id in lost:
+                print(f"فُقد عقد الخلاصة {feed_id} أثناء تحديثها")
+    
+    def close(self):
+        """إيقاف خيط التوزيع وانتظار التحديثات الجارية"""
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        if self.dispatcher:
+            self.dispatcher.join()
+        if self.renewer:
+            self.renewer.join()
+        if self.executor:
+            self.executor.shutdown(wait=True)
+    
+    def get_stats(self) -> Dict:
+        """الحصول على إحصائيات المجدول"""
+        with self.condition:
+            next_due = self.heap[0][0] if self.heap else None
+            now = self.clock()
+            return {
+                'workers': self.workers,
+                'scheduled': len(self.due),
+                'running': len(self.running),
+                'dispatched': self.dispatched,
+                'failures': self.failures,
+                'lease_owner': getattr(self.leases, 'owner', None),
+                'lease_skips': self.lease_skips,
+                'lost_leases': self.lost_leases,
+                'lag_seconds': round(max(0.0, now - next_due), 3) if next_due else 0.0,
+                'last_lag_seconds': round(self.last_lag, 3),
+                'max_lag_seconds': round(self.max_lag, 3)
+            }
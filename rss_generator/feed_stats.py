@@ -0,0 +1,140 @@
+"""
+إحصائيات الخلاصات المحدثة تزايدياً مع عدادات زمنية متحركة
+"""
+
+import time
+import threading
+from typing import Dict, Optional
+
+
+class RollingCounter:
+    """
+    عداد أحداث لكل مفتاح على نافذة زمنية متحركة
+    
+    الأحداث تُجمع في دلاء بالدقيقة داخل حلقة ثابتة الحجم، لذلك تكلفة التسجيل
+    والقراءة ثابتة ولا تعتمد على عدد الأحداث.
+    """
+    
+    def __init__(self, window_minutes: int = 60):
+        """
+        تهيئة العداد
+        
+        Args:
+            window_minutes: طول النافذة بالدقائق
+        """
+        self.window_minutes = window_minutes
+        self.buckets = [{} for _ in range(window_minutes)]
+        self.bucket_minutes = [None] * window_minutes
+        self.lock = threading.Lock()
+    
+    def add(self, key: str, count: int = 1, now: Optional[float] = None):
+        """تسجيل أحداث لمفتاح في الدقيقة الحالية"""
+        minute = int((now if now is not None else time.time()) // 60)
+        slot = minute % self.window_minutes
+        
+        with self.lock:
+            # الدلو يحتوي على دقيقة قديمة خارج النافذة فيُعاد استخدامه
+            if self.bucket_minutes[slot] != minute:
+                self.buckets[slot] = {}
+                self.bucket_minutes[slot] = minute
+            
+            bucket = self.buckets[slot]
+            bucket[key] = bucket.get(key, 0) + count
+    
+    def totals(self, now: Optional[float] = None) -> Dict[str, int]:
+        """مجموع الأحداث لكل مفتاح خلال النافذة"""
+        minute = int((now if now is not None else time.time()) // 60)
+        oldest = minute - self.window_minutes
+        
+        totals = {}
+        with self.lock:
+            for bucket_minute, bucket in zip(self.bucket_minutes, self.buckets):
+                if bucket_minute is None or bucket_minute <= oldest:
+                    continue
+                for key, count in bucket.items():
+                    totals[key] = totals.get(key, 0) + count
+        
+        return totals
+
+
+class FeedStats:
+    """
+    عدادات الخلاصات (الإجمالي والحالة والمنصة وعدد المنشورات)
+    
+    تُحدّث من الفرق بين النسخة القديمة والجديدة لكل خلاصة عند نشرها، فلا
+    تحتاج قراءة الإحصائيات إلى المرور على البيانات الوصفية. عدادات الاستخراج
+    الزمنية خاصة بكل عملية.
+    """
+    
+    def __init__(self, window_minutes: int = 60):
+        """
+        تهيئة الإحصائيات
+        
+        Args:
+            window_minutes: طول نافذة عدادات الاستخراج بالدقائق
+        """
+        self.total_feeds = 0
+        self.total_posts = 0
+        self.statuses: Dict[str, int] = {}
+        self.platforms: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        
+        self.window_minutes = window_minutes
+        self.scrapes = RollingCounter(window_minutes)
+        self.failures = RollingCounter(window_minutes)
+    
+    def increment(self, counts: Dict[str, int], key: str, delta: int):
+        """تعديل عداد مع حذف المفاتيح الصفرية (يُستدعى والقفل محجوز)"""
+        value = counts.get(key, 0) + delta
+        if value:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
+    
+    def apply(self, old_info: Optional[Dict], new_info: Optional[Dict]):
+        """
+        تحديث العدادات عند إضافة خلاصة أو تعديلها أو حذفها
+        
+        Args:
+            old_info: النسخة السابقة من الخلاصة أو None عند الإضافة
+            new_info: النسخة الجديدة من الخلاصة أو None عند الحذف
+        """
+        with self.lock:
+            for feed_info, sign in ((old_info, -1), (new_info, 1)):
+                if not feed_info:
+                    continue
+                
+                self.total_feeds += sign
+                
+                # منشورات الخلاصات المجمّعة محسوبة في خلاصاتها الأعضاء
+                if feed_info.get('type') != 'aggregate':
+                    self.total_posts += sign * int(feed_info.get('post_count') or 0)
+                
+                self.increment(self.statuses, feed_info.get('status', 'unknown'), sign)
+                self.increment(self.platforms, feed_info.get('platform', 'Unknown'), sign)
+    
+    def record_scrape(self, platform: str, success: bool):
+        """تسجيل عملية استخراج ونتيجتها"""
+        self.scrapes.add(platform)
+        if not success:
+            self.failures.add(platform)
+    
+    def get_stats(self) -> Dict:
+        """الحصول على الإحصائيات الحالية"""
+        with self.lock:
+            stats = {
+                'total_feeds': self.total_feeds,
+                'active_feeds': self.statuses.get('active', 0),
+                'inactive_feeds': self.total_feeds - self.statuses.get('active', 0),
+                'statuses': dict(self.statuses),
+                'platforms': dict(self.platforms),
+                'total_posts': self.total_posts
+            }
+        
+        stats['recent_activity'] = {
+            'window_minutes': self.window_minutes,
+            'scrapes': self.scrapes.totals(),
+            'failures': self.failures.totals()
+        }
+        
+        return stats
@@ -0,0 +1,112 @@
+"""
+تخزين ملفات الخلاصات في شجرة مجلدات مقسمة حسب معرف الخلاصة
+"""
+
+import os
+import re
+import hashlib
+import threading
+from typing import Dict
+
+
+# ملفات الخلاصة في التخطيط المسطح القديم: <id>.xml و <id>.items.json و <id>.render.json و <id>.archive-N.xml
+FLAT_ARTIFACT_PATTERN = re.compile(r'^(?P<id>[^.]+)(?P<suffix>\.xml|\.items\.json|\.render\.json|\.archive-\d+\.xml)$')
+
+
+class FeedStorage:
+    """
+    مسارات ملفات الخلاصات وكتابتها الذرية
+    
+    ملفات كل خلاصة في المجلد ab/cd/ حيث ab و cd أول أربعة أحرف من SHA-256
+    لمعرفها، فيبقى عدد الملفات في كل مجلد صغيراً مهما زاد عدد الخلاصات،
+    وتتوزع المعرفات القديمة (الرقمية) والخلاصات المجمّعة (agg...) بالتساوي.
+    المسارات المحفوظة في البيانات الوصفية نسبية لمجلد الخلاصات.
+    """
+    
+    def __init__(self, feeds_dir: str):
+        """
+        تهيئة التخزين
+        
+        Args:
+            feeds_dir: مجلد حفظ الخلاصات
+        """
+        self.feeds_dir = feeds_dir
+    
+    def shard_dir(self, feed_id: str) -> str:
+        """المجلد النسبي لملفات الخلاصة"""
+        digest = hashlib.sha256(feed_id.encode('utf-8')).hexdigest()
+        return os.path.join(digest[:2], digest[2:4])
+    
+    def relative_path(self, feed_id: str, suffix: str) -> str:
+        """المسار النسبي لملف من ملفات الخلاصة مثل .xml أو .items.json"""
+        return os.path.join(self.shard_dir(feed_id), f"{feed_id}{suffix}")
+    
+    def path(self, feed_id: str, suffix: str) -> str:
+        """المسار الكامل لملف من ملفات الخلاصة"""
+        return os.path.join(self.feeds_dir, self.relative_path(feed_id, suffix))
+    
+    def resolve(self, relative_path: str) -> str:
+        """المسار الكامل لمسار نسبي محفوظ في البيانات الوصفية"""
+        return os.path.join(self.feeds_dir, relative_path)
+    
+    def write_atomic(self, path: str, data: bytes):
+        """
+        كتابة ملف عبر ملف مؤقت في نفس المجلد ثم استبداله ذرياً
+        
+        القراء يرون دائماً النسخة القديمة كاملة أو الجديدة كاملة
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(data)
+            os.replace(temp_file, path)
+        except Exception:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+    
+    def migrate_flat_layout(self, metadata: Dict) -> Dict:
+        """
+        نقل ملفات التخطيط المسطح القديم إلى المجلدات المقسمة
+        
+        يمكن تكرار التشغيل بأمان: الملفات المنقولة لا تُنقل مرة أخرى، وملف
+        موجود في المجلد المقسم لا يُستبدل بالنسخة المسطحة الأقدم.
+        
+        Args:
+            metadata: البيانات الوصفية الحالية للخلاصات
+        
+        Returns:
+            الخلاصات التي تغير مسار ملف XML الخاص بها أو حُذف منها المسار الكامل
+        """
+        moved = 0
+        with os.scandir(self.feeds_dir) as entries:
+            for entry in entries:
+                match = FLAT_ARTIFACT_PATTERN.match(entry.name)
+                if not match or not entry.is_file():
+                    continue
+                
+                target = self.path(match.group('id'), match.group('suffix'))
+                try:
+                    if os.path.exists(target):
+                        os.remove(entry.path)
+                    else:
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        os.replace(entry.path, target)
+                        moved += 1
+                except OSError as e:
+                    print(f"خطأ في نقل ملف الخلاصة {entry.name}: {e}")
+        
+        if moved:
+            print(f"تم نقل {moved} من ملفات الخلاصات إلى المجلدات المقسمة")
+        
+        upserts = {}
+        for feed_id, feed_info in metadata.items():
+            xml_file = self.relative_path(feed_id, '.xml')
+            if feed_info.get('xml_file') != xml_file or 'xml_path' in feed_info:
+                feed_info = dict(feed_info, xml_file=xml_file)
+                feed_info.pop('xml_path', None)
+                upserts[feed_id] = feed_info
+        
+        return upserts
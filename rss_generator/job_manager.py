@@ -0,0 +1,240 @@
+"""
+تنفيذ العمليات الطويلة (الاستخراج وإنشاء الخلاصات) كمهام في الخلفية
+"""
+
+import json
+import time
+import uuid
+import atexit
+import sqlite3
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+
+class JobManager:
+    """
+    مهام في الخلفية على مجموعة عمال محدودة
+    
+    كل مهمة دالة تعيد (النتيجة، رمز حالة HTTP). المهام التي لها نفس المفتاح
+    (مثلاً إنشاء خلاصة لنفس الرابط الموحد) لا تُنفذ مرتين ما دامت الأولى
+    منتظرة أو قيد التنفيذ، بل يُعاد للطلب الثاني نفس المهمة. المهام المنتهية
+    تبقى متاحة للاستعلام لمدة محددة ثم تُحذف.
+    
+    حالة المهام في قاعدة SQLite مشتركة، فالاستعلام عن المهمة ومنع التكرار
+    يعملان من أي عملية تشترك في القاعدة (مثل عمال gunicorn)، أما التنفيذ
+    وإبلاغ المستمعين فيتمان في العملية التي أنشأت المهمة. المهمة التي تتوقف
+    عمليتها قبل إنهائها تُعد فاشلة بعد job_timeout.
+    """
+    
+    # الحقول المعروضة عبر API بالإضافة إلى النتيجة ورمز الحالة بعد الانتهاء
+    PUBLIC_FIELDS = ('id', 'type', 'status', 'created_at', 'started_at', 'finished_at')
+    
+    def __init__(self, db_path: str = ':memory:', workers: int = 4, max_pending: int = 1000,
+                 retention: float = 3600, max_finished: int = 10000, job_timeout: float = 900):
+        """
+        تهيئة مدير المهام
+        
+        Args:
+            db_path: مسار قاعدة المهام المشتركة (:memory: لعملية واحدة)
+            workers: عدد العمال
+            max_pending: أقصى عدد مهام منتظرة أو قيد التنفيذ
+            retention: مدة بقاء المهام المنتهية بالثواني
+            max_finished: أقصى عدد مهام منتهية محفوظة
+            job_timeout: المدة التي تُعد بعدها المهمة غير المنتهية متوقفة بالثواني
+        """
+        self.db_path = db_path
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self.max_finished = max_finished
+        self.job_timeout = job_timeout
+        
+        self.lock = threading.Lock()
+        self.listeners = []
+        
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA busy_timeout=5000')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created REAL NOT NULL,
+                finished REAL,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                status_code INTEGER,
+                result TEXT
+            )
+        """)
+        # مهمة جارية واحدة على الأكثر لكل مفتاح
+        self.conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key ON jobs (key) "
+            "WHERE status IN ('queued', 'running')"
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished)')
+        
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        atexit.register(self.close)
+    
+    def submit(self, job_type: str, key: str, func: Callable[..., Tuple[Dict, int]],
+               *args) -> Tuple[Optional[Dict], bool]:
+        """
+        إضافة مهمة أو إعادة المهمة الجارية التي لها نفس المفتاح
+        
+        Args:
+            job_type: نوع المهمة (create أو update)
+            key: مفتاح منع التكرار
+            func: الدالة المنفذة، وتعيد (النتيجة، رمز حالة HTTP)
+            args: معاملات الدالة
+        
+        Returns:
+            (معلومات المهمة، True إذا كانت مهمة جارية مكررة)، أو (None، False) إذا امتلأت قائمة الانتظار
+        """
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                self.prune()
+                
+                row = self.conn.execute(
+                    "SELECT * FROM jobs WHERE key = ? AND status IN ('queued', 'running')", (key,)
+                ).fetchone()
+                if row:
+                    self.conn.execute('COMMIT')
+                    self.deduplicated += 1
+                    return self.public_job(row), True
+                
+                pending = self.conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+                ).fetchone()[0]
+                if pending >= self.max_pending:
+                    self.conn.execute('COMMIT')
+                    self.rejected += 1
+                    return None, False
+                
+                job_id = uuid.uuid4().hex
+                self.conn.execute(
+                    "INSERT INTO jobs (id, type, key, status, created, created_at) "
+                    "VALUES (?, ?, ?, 'queued', ?, ?)",
+                    (job_id, job_type, key, time.time(), datetime.now().isoformat())
+                )
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            
+            self.submitted += 1
+            public = self.load_job(job_id)
+        
+        # الإبلاغ قبل الإرسال للعمال حتى يسبق حدث الانتظار حدث التنفيذ
+        self.notify(public)
+        self.executor.submit(self.run_job, job_id, func, args)
+        return public, False
+    
+    def add_listener(self, listener: Callable[[Dict], None]):
+        """تسجيل دالة تُستدعى بمعلومات المهمة عند كل تغير في حالتها"""
+        self.listeners.append(listener)
+    
+    def notify(self, job: Dict):
+        """إبلاغ المستمعين بتغير حالة مهمة (يُستدعى دون حجز القفل)"""
+        for listener in self.listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"خطأ في مستمع المهام: {e}")
+    
+    def run_job(self, job_id: str, func: Callable, args: tuple):
+        """تنفيذ مهمة في أحد العمال"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued'",
+                (datetime.now().isoformat(), job_id)
+            )
+            public = self.load_job(job_id)
+        self.notify(public)
+        
+        try:
+            result, status_code = func(*args)
+        except Exception as e:
+            print(f"خطأ في تنفيذ المهمة {job_id}: {e}")
+            result, status_code = {'error': 'حدث خطأ غير متوقع أثناء تنفيذ المهمة'}, 500
+        
+        with self.lock:
+            self.finish(job_id, result, status_code)
+            public = self.load_job(job_id)
+        self.notify(public)
+    
+    def finish(self, job_id: str, result: Dict, status_code: int):
+        """حفظ نتيجة المهمة (يُستدعى والقفل محجوز)"""
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, status_code = ?, result = ?, finished = ?, finished_at = ? "
+            "WHERE id = ? AND status IN ('queued', 'running')",
+            ('succeeded' if status_code < 400 else 'failed', status_code,
+             json.dumps(result, ensure_ascii=False), time.time(), datetime.now().isoformat(), job_id)
+        )
+    
+    def prune(self):
+        """إنهاء المهام المتوقفة وحذف المهام المنتهية القديمة (يُستدعى والقفل محجوز)"""
+        now = time.time()
+        
+        stalled = self.conn.execute(
+            "SELECT id FROM jobs WHERE status IN ('queued', 'running') AND created < ?",
+            (now - self.job_timeout,)
+        ).fetchall()
+        for row in stalled:
+            self.finish(row['id'], {'error': 'توقفت المهمة قبل انتهائها'}, 500)
+        
+        self.conn.execute('DELETE FROM jobs WHERE finished < ?', (now - self.retention,))
+        self.conn.execute(
+            'DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE finished IS NOT NULL '
+            'ORDER BY finished DESC LIMIT -1 OFFSET ?)',
+            (self.max_finished,)
+        )
+    
+    def public_job(self, row: sqlite3.Row) -> Dict:
+        """نسخة من معلومات المهمة للعرض عبر API"""
+        public = {field: row[field] for field in self.PUBLIC_FIELDS}
+        if row['finished'] is not None:
+            public['status_code'] = row['status_code']
+            public['result'] = json.loads(row['result'])
+        public['status_url'] = f"/api/jobs/{row['id']}"
+        return public
+    
+    def load_job(self, job_id: str) -> Optional[Dict]:
+        """قراءة معلومات مهمة من القاعدة (يُستدعى والقفل محجوز)"""
+        row = self.conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self.public_job(row) if row else None
+    
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """الحصول على معلومات مهمة ونتيجتها إن انتهت"""
+        with self.lock:
+            return self.load_job(job_id)
+    
+    def close(self):
+        """انتظار المهام الجارية وإيقاف العمال"""
+        self.executor.shutdown(wait=True)
+    
+    def get_stats(self) -> Dict:
+        """الحصول على إحصائيات المهام (الأعداد الحالية لكل العمليات والمجاميع لهذه العملية)"""
+        with self.lock:
+            counts = dict(self.conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+            return {
+                'workers': self.workers,
+                'queued': counts.get('queued', 0),
+                'running': counts.get('running', 0),
+                'finished': counts.get('succeeded', 0) + counts.get('failed', 0),
+                'submitted': self.submitted,
+                'deduplicated': self.deduplicated,
+                'rejected': self.rejected
+            }
@@ -0,0 +1,157 @@
+"""
+عقود إيجار (leases) لتنسيق تحديث الخلاصات بين عدة عمليات أو عدة خوادم
+"""
+
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+from typing import List
+
+
+class MemoryLeaseStore:
+    """
+    عقود داخل العملية فقط، لتشغيل عملية واحدة دون ملف مشترك
+    
+    يحدد الواجهة التي يجب أن يطبقها أي مخزن عقود: acquire و renew و release
+    """
+    
+    def __init__(self, owner: str = None):
+        self.owner = owner or default_owner()
+        self.leases = {}
+        self.lock = threading.Lock()
+    
+    def acquire(self, feed_id: str, ttl: float) -> bool:
+        """حجز خلاصة إذا لم يكن لها عقد ساري لمالك آخر"""
+        now = time.time()
+        with self.lock:
+            owner, expires_at = self.leases.get(feed_id, (None, 0))
+            if owner not in (None, self.owner) and expires_at > now:
+                return False
+            self.leases[feed_id] = (self.owner, now + ttl)
+            return True
+    
+    def renew(self, feed_ids: List[str], ttl: float) -> List[str]:
+        """تمديد عقود المالك، ويعيد المعرفات التي فقد عقدها"""
+        now = time.time()
+        lost = []
+        with self.lock:
+            for feed_id in feed_ids:
+                if self.leases.get(feed_id, (None,))[0] == self.owner:
+                    self.leases[feed_id] = (self.owner, now + ttl)
+                else:
+                    lost.append(feed_id)
+        return lost
+    
+    def release(self, feed_id: str):
+        """إنهاء عقد المالك"""
+        with self.lock:
+            if self.leases.get(feed_id, (None,))[0] == self.owner:
+                del self.leases[feed_id]
+
+
+class SQLiteLeaseStore:
+    """
+    عقود في قاعدة SQLite مشتركة (نفس الجهاز أو قرص مشترك)
+    
+    الحجز عبارة INSERT ... ON CONFLICT واحدة لا تنجح إلا إذا لم يوجد عقد أو
+    انتهت مدته أو كان لنفس المالك، وSQLite ينفذ الكتابات بالتتابع، لذا
+    لا يمكن أن يحجز مالكان نفس الخلاصة في نفس الوقت. المالك الذي يتوقف
+    دون إنهاء عقوده تنتقل خلاصاته لغيره بعد انتهاء المدة.
+    """
+    
+    # عدد عمليات الحجز بين كل حذف للعقود المنتهية
+    PRUNE_EVERY = 1000
+    
+    def __init__(self, db_path: str, owner: str = None):
+        """
+        تهيئة المخزن
+        
+        Args:
+            db_path: مسار قاعدة البيانات المشتركة
+            owner: معرف هذه العملية (يُنشأ تلقائياً)
+        """
+        self.db_path = db_path
+        self.owner = owner or default_owner()
+        self.lock = threading.Lock()
+        self.acquisitions = 0
+        
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA busy_timeout=5000')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                feed_id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+    
+    def acquire(self, feed_id: str, ttl: float) -> bool:
+        """حجز خلاصة إذا لم يكن لها عقد ساري لمالك آخر"""
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                'INSERT INTO leases (feed_id, owner, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (feed_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+                'WHERE leases.expires_at <= ? OR leases.owner = excluded.owner',
+                (feed_id, self.owner, now + ttl, now)
+            )
+            
+            self.acquisitions += 1
+            if self.acquisitions % self.PRUNE_EVERY == 0:
+                self.conn.execute('DELETE FROM leases WHERE expires_at <= ?', (now,))
+            
+            return cursor.rowcount == 1
+    
+    def renew(self, feed_ids: List[str], ttl: float) -> List[str]:
+        """تمديد عقود المالك في معاملة واحدة، ويعيد المعرفات التي فقد عقدها"""
+        if not feed_ids:
+            return []
+        
+        expires_at = time.time() + ttl
+        lost = []
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                for feed_id in feed_ids:
+                    cursor = self.conn.execute(
+                        'UPDATE leases SET expires_at = ? WHERE feed_id = ? AND owner = ?',
+                        (expires_at, feed_id, self.owner)
+                    )
+                    if cursor.rowcount != 1:
+                        lost.append(feed_id)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return lost
+    
+    def release(self, feed_id: str):
+        """إنهاء عقد المالك"""
+        with self.lock:
+            self.conn.execute('DELETE FROM leases WHERE feed_id = ? AND owner = ?', (feed_id, self.owner))
+
+
+def default_owner() -> str:
+    """معرف فريد للعملية الحالية على هذا الجهاز"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def create_lease_store(backend: str, db_path: str):
+    """
+    إنشاء مخزن العقود حسب النوع
+    
+    Args:
+        backend: نوع المخزن (sqlite أو memory)
+        db_path: مسار قاعدة البيانات المشتركة لنوع sqlite
+    """
+    if backend == 'sqlite':
+        return SQLiteLeaseStore(db_path)
+    if backend == 'memory':
+        return MemoryLeaseStore()
+    
+    raise ValueError(f"نوع مخزن عقود غير مدعوم: {backend}")
@@ -0,0 +1,736 @@
+"""
+مخازن البيانات الوصفية للخلاصات (ملف JSON أو سجل تغييرات أو قاعدة بيانات SQLite)
+
+جميع المخازن آمنة للاستخدام من عدة عمليات في نفس الوقت (مثل عمال gunicorn)،
+وتكتشف التغييرات التي أجرتها العمليات الأخرى بتكلفة زهيدة عبر poll_changes.
+"""
+
+import os
+import json
+import uuid
+import atexit
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows لا يدعم flock
+    fcntl = None
+
+
+class FileLock:
+    """قفل بين العمليات باستخدام flock مع قفل داخلي بين الخيوط"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.handle = open(path, 'a+')
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+    
+    @contextmanager
+    def hold(self, exclusive: bool = True):
+        """الاحتفاظ بالقفل (حصري للكتابة أو مشترك للقراءة)"""
+        with self.thread_lock:
+            # القفل المتداخل من نفس الخيط يبقى على نوع القفل الخارجي
+            if fcntl and self.depth == 0:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+                if fcntl and self.depth == 0:
+                    fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+
+
+def diff_records(old: Dict, new: Dict) -> Tuple[Dict, List[str]]:
+    """حساب الخلاصات المضافة أو المعدلة والمحذوفة بين حالتين"""
+    upserts = {feed_id: info for feed_id, info in new.items() if old.get(feed_id) != info}
+    deletes = [feed_id for feed_id in old if feed_id not in new]
+    return upserts, deletes
+
+
+class BaseMetadataStore:
+    """أساس مشترك للمخازن: السجلات المحملة والتغييرات الخارجية المعلقة"""
+    
+    def __init__(self):
+        self.records = {}
+        self.pending_upserts = {}
+        self.pending_deletes = set()
+    
+    def queue_changes(self, upserts: Dict, deletes: List[str]):
+        """تسجيل تغييرات أجرتها عمليات أخرى لتسليمها عبر poll_changes"""
+        for feed_id, feed_info in upserts.items():
+            self.pending_upserts[feed_id] = feed_info
+            self.pending_deletes.discard(feed_id)
+        
+        for feed_id in deletes:
+            self.pending_upserts.pop(feed_id, None)
+            self.pending_deletes.add(feed_id)
+    
+    def take_pending(self) -> Optional[Tuple[Dict, List[str]]]:
+        """تسليم التغييرات المعلقة وتفريغها"""
+        if not self.pending_upserts and not self.pending_deletes:
+            return None
+        
+        changes = (self.pending_upserts, list(self.pending_deletes))
+        self.pending_upserts = {}
+        self.pending_deletes = set()
+        return changes
+
+
+class JSONMetadataStore(BaseMetadataStore):
+    """
+    تخزين البيانات الوصفية في ملف JSON واحد يُعاد كتابته عند كل تغيير
+    
+    الكتابة تتم تحت قفل ملف بعد دمج تغييرات العمليات الأخرى حتى لا تضيع،
+    ويُعاد تحميل الملف فقط إذا تغيرت بصمته (الـ inode ووقت التعديل والحجم).
+    """
+    
+    def __init__(self, feeds_dir: str):
+        """
+        تهيئة المخزن
+        
+        Args:
+            feeds_dir: مجلد حفظ الخلاصات
+        """
+        super().__init__()
+        self.metadata_file = os.path.join(feeds_dir, "feeds_metadata.json")
+        self.lock = FileLock(os.path.join(feeds_dir, "feeds_metadata.lock"))
+        self.stamp = None
+    
+    def file_stamp(self) -> Optional[tuple]:
+        """بصمة رخيصة لحالة الملف"""
+        try:
+            st = os.stat(self.metadata_file)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+    
+    def read_file(self) -> Dict:
+        """قراءة الملف بالكامل"""
+        try:
+            if os.path.exists(self.metadata_file):
+                with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"خطأ في تحميل البيانات الوصفية: {e}")
+        
+        return {}
+    
+    def reload_if_changed(self):
+        """إعادة تحميل الملف إذا عدّلته عملية أخرى (يُستدعى والقفل محجوز)"""
+        stamp = self.file_stamp()
+        if stamp == self.stamp:
+            return
+        
+        records = self.read_file()
+        self.queue_changes(*diff_records(self.records, records))
+        self.records = records
+        self.stamp = stamp
+    
+    def load_all(self) -> Dict:
+        """تحميل جميع البيانات الوصفية"""
+        with self.lock.hold(exclusive=False):
+            self.records = self.read_file()
+            self.stamp = self.file_stamp()
+        
+        return dict(self.records)
+    
+    def poll_changes(self) -> Optional[Tuple[Dict, List[str]]]:
+        """الحصول على تغييرات العمليات الأخرى منذ آخر استدعاء"""
+        with self.lock.thread_lock:
+            if self.file_stamp() != self.stamp:
+                with self.lock.hold(exclusive=False):
+                    self.reload_if_changed()
+            
+            return self.take_pending()
+    
+    def save_feed(self, feed_id: str, feed_info: Dict):
+        """حفظ البيانات الوصفية لخلاصة واحدة"""
+        with self.lock.hold():
+            self.reload_if_changed()
+            self.records[feed_id] = feed_info
+            self.flush()
+    
+    def apply_changes(self, upserts: Dict, deletes: List[str]):
+        """حفظ عدة خلاصات وحذف أخرى بكتابة واحدة للملف"""
+        with self.lock.hold():
+            self.reload_if_changed()
+            self.records.update(upserts)
+            for feed_id in deletes:
+                self.records.pop(feed_id, None)
+            self.flush()
+    
+    def flush(self):
+        """كتابة الملف بالكامل واستبداله ذرياً (يُستدعى والقفل الحصري محجوز)"""
+        try:
+            temp_file = self.metadata_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.records, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, self.metadata_file)
+            self.stamp = self.file_stamp()
+        except Exception as e:
+            print(f"خطأ في حفظ البيانات الوصفية: {e}")
+
+
+class JournalMetadataStore(BaseMetadataStore):
+    """
+    تخزين البيانات الوصفية في لقطة JSON مع سجل تغييرات قابل للإلحاق فقط
+    
+    كل تعديل يُضاف كسطر واحد إلى السجل بتكلفة ثابتة، ويُنفّذ fsync على دفعات
+    من خيط خلفي يقوم أيضاً بدمج السجل في اللقطة عند تجاوز حجمه الحد المسموح.
+    اللقطة هي نفس ملف feeds_metadata.json لذا تبقى متوافقة مع المخزن القديم.
+    
+    كل عملية تحفظ الـ inode وموضع آخر بايت قرأته من السجل، فيكفي stat واحد
+    لاكتشاف أن عملية أخرى ألحقت سطوراً، ثم تُقرأ السطور الجديدة فقط.
+    """
+    
+    def __init__(self, feeds_dir: str, fsync_interval: float = 1.0,
+                 fsync_batch_size: int = 100, compact_threshold: int = 1000):
+        """
+        تهيئة المخزن
+        
+        Args:
+            feeds_dir: مجلد حفظ الخلاصات
+            fsync_interval: الفترة القصوى بالثواني قبل تنفيذ fsync للتعديلات المعلقة
+            fsync_batch_size: عدد التعديلات المعلقة الذي يستدعي fsync فوراً
+            compact_threshold: عدد سطور السجل الذي يستدعي الدمج في اللقطة
+        """
+        super().__init__()
+        self.snapshot_file = os.path.join(feeds_dir, "feeds_metadata.json")
+        self.journal_file = os.path.join(feeds_dir, "feeds_metadata.journal")
+        self.compacting_file = self.journal_file + '.compacting'
+        self.lock = FileLock(os.path.join(feeds_dir, "feeds_metadata.lock"))
+        
+        self.fsync_interval = fsync_interval
+        self.fsync_batch_size = fsync_batch_size
+        self.compact_threshold = compact_threshold
+        
+        self.encoded = {}
+        self.compact_lock = threading.Lock()
+        self.pending_syncs = 0
+        self.journal_entries = 0
+        
+        # الـ inode الخاص بالسجل المقروء وعدد البايتات المطبقة منه. السجل المقروء
+        # يبقى مفتوحاً حتى لا يُعاد استخدام رقم الـ inode لسجل جديد بعد حذفه،
+        # فتظن العملية أن السجل لم يُستبدل وتفوتها تغييرات
+        self.read_inode = None
+        self.read_offset = 0
+        self.reader = None
+        
+        self.journal = None
+        self.stop_event = threading.Event()
+        self.sync_event = threading.Event()
+        self.worker = None
+    
+    def read_state(self) -> Dict:
+        """قراءة اللقطة ثم تطبيق السجل بالكامل (يُستدعى والقفل محجوز)"""
+        records = {}
+        try:
+            if os.path.exists(self.snapshot_file):
+                with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                    records = json.load(f)
+        except Exception as e:
+            print(f"خطأ في تحميل البيانات الوصفية: {e}")
+        
+        # سجل الدمج المنقطع يسبق السجل الحالي في الترتيب
+        self.replay(self.compacting_file, 0, records)
+        
+        if not os.path.exists(self.journal_file):
+            open(self.journal_file, 'ab').close()
+        
+        if self.reader:
+            self.reader.close()
+        self.reader = open(self.journal_file, 'rb')
+        self.read_inode = os.fstat(self.reader.fileno()).st_ino
+        self.read_offset, self.journal_entries = self.replay(self.journal_file, 0, records)
+        
+        return records
+    
+    def replay(self, path: str, offset: int, records: Dict, changes: Optional[tuple] = None) -> tuple:
+        """
+        تطبيق عمليات السجل على السجلات ابتداءً من موضع محدد
+        
+        Returns:
+            الموضع بعد آخر سطر مكتمل وعدد السطور المطبقة
+        """
+        if not os.path.exists(path):
+            return offset, 0
+        
+        count = 0
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                
+                if entry['op'] == 'put':
+                    records[entry['id']] = entry['data']
+                else:
+                    records.pop(entry['id'], None)
+                
+                if changes is not None:
+                    changes[entry['id']] = entry['op']
+                
+                offset += len(line)
+                count += 1
+        
+        return offset, count
+    
+    def load_all(self) -> Dict:
+        """تحميل أحدث لقطة ثم إعادة تطبيق السجل"""
+        with self.lock.hold():
+            self.records = self.read_state()
+            
+            # حذف السطر الأخير غير المكتمل بسبب توقف مفاجئ حتى لا تُلحق به سطور جديدة
+            if self.read_offset < os.path.getsize(self.journal_file):
+                os.truncate(self.journal_file, self.read_offset)
+            
+            self.journal = open(self.journal_file, 'ab')
+        
+        self.encoded = {
+            feed_id: json.dumps(feed_info, ensure_ascii=False)
+            for feed_id, feed_info in self.records.items()
+        }
+        
+        self.worker = threading.Thread(target=self.run_background, daemon=True)
+        self.worker.start()
+        atexit.register(self.close)
+        
+        return dict(self.records)
+    
+    def read_tail(self):
+        """
+        تطبيق السطور التي ألحقتها عمليات أخرى (يُستدعى والقفل محجوز)
+        
+        إذا تغير الـ inode فقد دمجت عملية أخرى السجل في اللقطة، وعندها فقط
+        تُقرأ الحالة كاملة وتُحسب الفروق
+        """
+        if os.stat(self.journal_file).st_ino != self.read_inode:
+            records = self.read_state()
+            upserts, deletes = diff_records(self.records, records)
+        else:
+            changes = {}
+            records = self.records
+            self.read_offset, count = self.replay(self.journal_file, self.read_offset, records, changes)
+            self.journal_entries += count
+            
+            upserts = {feed_id: records[feed_id] for feed_id, op in changes.items() if op == 'put'}
+            deletes = [feed_id for feed_id, op in changes.items() if op == 'del']
+        
+        for feed_id, feed_info in upserts.items():
+            self.encoded[feed_id] = json.dumps(feed_info, ensure_ascii=False)
+        for feed_id in deletes:
+            self.encoded.pop(feed_id, None)
+        
+        self.records = records
+        self.queue_changes(upserts, deletes)
+    
+    def poll_changes(self) -> Optional[Tuple[Dict, List[str]]]:
+        """الحصول على تغييرات العمليات الأخرى منذ آخر استدعاء بتكلفة stat واحدة عادةً"""
+        with self.lock.thread_lock:
+            try:
+                st = os.stat(self.journal_file)
+                changed = (st.st_ino, st.st_size) != (self.read_inode, self.read_offset)
+            except FileNotFoundError:
+                changed = True
+            
+            if changed:
+                with self.lock.hold(exclusive=False):
+                    self.read_tail()
+            
+            return self.take_pending()
+    
+    def append(self, *lines: str):
+        """إلحاق سطور بالسجل بكتابة واحدة مع طلب fsync عند اكتمال الدفعة (يُستدعى والقفل الحصري محجوز)"""
+        # تطبيق سطور العمليات الأخرى أولاً حتى يبقى موضع القراءة متصلاً
+        self.read_tail()
+        
+        # إعادة فتح السجل إذا دمجته عملية أخرى واستبدلته بملف جديد
+        if os.fstat(self.journal.fileno()).st_ino != self.read_inode:
+            self.journal.close()
+            self.journal = open(self.journal_file, 'ab')
+        
+        data = ''.join(line + '\n' for line in lines).encode('utf-8')
+        self.journal.write(data)
+        self.journal.flush()
+        self.read_offset += len(data)
+        
+        self.pending_syncs += 1
+        self.journal_entries += len(lines)
+        
+        if self.pending_syncs >= self.fsync_batch_size:
+            self.sync_event.set()
+    
+    def save_feed(self, feed_id: str, feed_info: Dict):
+        """إضافة عملية حفظ خلاصة واحدة إلى السجل"""
+        try:
+            encoded = json.dumps(feed_info, ensure_ascii=False)
+            with self.lock.hold():
+                self.append(f'{{"op": "put", "id": {json.dumps(feed_id)}, "data": {encoded}}}')
+                self.records[feed_id] = feed_info
+                self.encoded[feed_id] = encoded
+        except Exception as e:
+            print(f"خطأ في حفظ البيانات الوصفية: {e}")
+    
+    def apply_changes(self, upserts: Dict, deletes: List[str]):
+        """إلحاق عمليات حفظ وحذف عدة خلاصات بالسجل في كتابة واحدة"""
+        try:
+            encoded = {
+                feed_id: json.dumps(feed_info, ensure_ascii=False)
+                for feed_id, feed_info in upserts.items()
+            }
+            lines = [
+                f'{{"op": "put", "id": {json.dumps(feed_id)}, "data": {data}}}'
+                for feed_id, data in encoded.items()
+            ]
+            lines += [json.dumps({'op': 'del', 'id': feed_id}) for feed_id in deletes]
+            
+            if not lines:
+                return
+            
+            with self.lock.hold():
+                self.append(*lines)
+                self.records.update(upserts)
+                self.encoded.update(encoded)
+                for feed_id in deletes:
+                    self.records.pop(feed_id, None)
+                    self.encoded.pop(feed_id, None)
+        except Exception as e:
+            print(f"خطأ في حفظ البيانات الوصفية: {e}")
+    
+    def sync(self):
+        """تنفيذ fsync للتعديلات المعلقة"""
+        with self.lock.thread_lock:
+            if not self.pending_syncs:
+                return
+            self.pending_syncs = 0
+            
+            try:
+                os.fsync(self.journal.fileno())
+            except (OSError, ValueError):
+                # السجل أُغلق أثناء الدمج وقد تمت مزامنته بالفعل
+                pass
+    
+    def compact(self):
+        """
+        دمج السجل في لقطة جديدة
+        
+        يُنفذ تحت القفل الحصري حتى لا تكتب عملية أخرى أثناء الدمج. يُنقل السجل
+        الحالي جانباً ويُفتح سجل جديد فارغ، ثم تُكتب اللقطة وتُستبدل ذرياً.
+        إذا توقف التطبيق في المنتصف يُعاد تطبيق السجل المنقول عند التحميل التالي.
+        """
+        with self.compact_lock, self.lock.hold():
+            # تضمين تغييرات العمليات الأخرى في اللقطة
+            self.read_tail()
+            
+            snapshot = '{' + ', '.join(
+                f'{json.dumps(feed_id)}: {encoded}' for feed_id, encoded in self.encoded.items()
+            ) + '}'
+            
+            if self.journal:
+                self.journal.flush()
+                os.fsync(self.journal.fileno())
+                self.journal.close()
+            os.replace(self.journal_file, self.compacting_file)
+            self.journal = open(self.journal_file, 'ab')
+            
+            # السجل الجديد مفتوح للكتابة فلا حاجة لإبقاء السجل القديم مفتوحاً
+            if self.reader:
+                self.reader.close()
+                self.reader = None
+            self.read_inode = os.fstat(self.journal.fileno()).st_ino
+            self.read_offset = 0
+            self.pending_syncs = 0
+            self.journal_entries = 0
+            
+            temp_file = self.snapshot_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.snapshot_file)
+            
+            os.remove(self.compacting_file)
+    
+    def run_background(self):
+        """خيط المزامنة والدمج الخلفي"""
+        while not self.stop_event.is_set():
+            self.sync_event.wait(self.fsync_interval)
+            self.sync_event.clear()
+            
+            try:
+                self.sync()
+                if self.journal_entries >= self.compact_threshold:
+                    self.compact()
+            except Exception as e:
+                print(f"خطأ في مزامنة البيانات الوصفية: {e}")
+    
+    def close(self):
+        """إيقاف الخيط الخلفي ومزامنة التعديلات المعلقة"""
+        self.stop_event.set()
+        self.sync_event.set()
+        if self.worker:
+            self.worker.join()
+        self.sync()
+
+
+class SQLiteMetadataStore(BaseMetadataStore):
+    """
+    تخزين البيانات الوصفية في SQLite بوضع WAL
+    
+    كل خلاصة في صف مستقل، لذلك يكلف التعديل كتابة صف واحد فقط بدلاً من
+    إعادة كتابة جميع البيانات. الحالة والمنصة وأوقات التحديث في أعمدة مفهرسة
+    للاستعلام المباشر من قاعدة البيانات، أما التطبيق فيصفي عبر FeedListIndex.
+    
+    كل تعديل يُسجل في جدول changes ضمن نفس المعاملة، فتكتشف العمليات الأخرى
+    وجود تغييرات عبر PRAGMA data_version ثم تجلب الصفوف المعدلة فقط.
+    """
+    
+    # عدد سجلات التغيير المحتفظ بها قبل حذف الأقدم
+    CHANGES_RETENTION = 10000
+    
+    def __init__(self, feeds_dir: str):
+        """
+        تهيئة المخزن وترحيل ملف JSON القديم إن وُجد
+        
+        Args:
+            feeds_dir: مجلد حفظ الخلاصات
+        """
+        super().__init__()
+        self.db_path = os.path.join(feeds_dir, "feeds_metadata.db")
+        self.lock = threading.Lock()
+        self.origin = uuid.uuid4().hex
+        self.last_seq = 0
+        self.data_version = None
+        
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA busy_timeout=5000')
+        
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS feeds (
+                id TEXT PRIMARY KEY,
+                status TEXT,
+                platform TEXT,
+                last_updated TEXT,
+                last_checked TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_feeds_status ON feeds(status);
+            CREATE INDEX IF NOT EXISTS idx_feeds_platform ON feeds(platform);
+            CREATE INDEX IF NOT EXISTS idx_feeds_last_updated ON feeds(last_updated);
+            CREATE INDEX IF NOT EXISTS idx_feeds_last_checked ON feeds(last_checked);
+            CREATE TABLE IF NOT EXISTS changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                feed_id TEXT NOT NULL,
+                origin TEXT NOT NULL
+            );
+        """)
+        
+        self.migrate_from_json(os.path.join(feeds_dir, "feeds_metadata.json"))
+    
+    def migrate_from_json(self, json_file: str):
+        """
+        ترحيل البيانات من ملف JSON مرة واحدة
+        
+        يُعاد تسمية الملف بعد الترحيل حتى لا يُرحّل مرة أخرى. إذا كانت القاعدة
+        تحتوي على خلاصات بالفعل لا يُرحّل شيء ويبقى الملف كما هو.
+        """
+        if not os.path.exists(json_file):
+            return
+        
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        except FileNotFoundError:
+            # عملية أخرى رحّلت الملف بعد الفحص
+            return
+        except Exception as e:
+            print(f"خطأ في قراءة {json_file} للترحيل: {e}")
+            return
+        
+        try:
+            with self.lock:
+                count = self.conn.execute('SELECT COUNT(*) FROM feeds').fetchone()[0]
+                if count == 0:
+                    self.write_rows(metadata.items())
+            
+            if count:
+                print(f"تم تخطي ترحيل {json_file}: {self.db_path} يحتوي على {count} خلاصة بالفعل")
+                return
+            
+            try:
+                os.replace(json_file, json_file + '.migrated')
+            except FileNotFoundError:
+                # عملية أخرى رحّلت نفس الملف في نفس الوقت
+                pass
+            print(f"تم ترحيل {len(metadata)} خلاصة من {json_file} إلى {self.db_path}")
+        
+        except Exception as e:
+            print(f"خطأ في ترحيل البيانات الوصفية: {e}")
+    
+    def row_values(self, feed_id: str, feed_info: Dict) -> tuple:
+        """تحويل معلومات الخلاصة إلى قيم صف"""
+        return (
+            feed_id,
+            feed_info.get('status'),
+            feed_info.get('platform'),
+            feed_info.get('last_updated'),
+            feed_info.get('last_checked', feed_info.get('last_updated')),
+            json.dumps(feed_info, ensure_ascii=False)
+        )
+    
+    def write_rows(self, items, deletes: Optional[List[str]] = None):
+        """كتابة عدة صفوف وحذف أخرى في معاملة واحدة مع تسجيلها في جدول التغييرات"""
+        items = list(items)
+        deletes = deletes or []
+        changed_ids = [feed_id for feed_id, _ in items] + deletes
+        
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO feeds (id, status, platform, last_updated, last_checked, data) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [self.row_values(feed_id, feed_info) for feed_id, feed_info in items]
+            )
+            self.conn.executemany('DELETE FROM feeds WHERE id = ?', [(feed_id,) for feed_id in deletes])
+            
+            self.conn.executemany(
+                'INSERT INTO changes (feed_id, origin) VALUES (?, ?)',
+                [(feed_id, self.origin) for feed_id in changed_ids]
+            )
+            self.conn.execute(
+                'DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?',
+                (self.CHANGES_RETENTION,)
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+    
+    def max_seq(self) -> int:
+        """آخر رقم تسلسلي في جدول التغييرات"""
+        return self.conn.execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+    
+    def load_all(self) -> Dict:
+        """تحميل جميع البيانات الوصفية"""
+        try:
+            with self.lock:
+                self.data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+                self.conn.execute('BEGIN')
+                try:
+                    rows = self.conn.execute('SELECT id, data FROM feeds').fetchall()
+                    self.last_seq = self.max_seq()
+                finally:
+                    self.conn.execute('COMMIT')
+            
+            self.records = {feed_id: json.loads(data) for feed_id, data in rows}
+        except Exception as e:
+            print(f"خطأ في تحميل البيانات الوصفية: {e}")
+        
+        return dict(self.records)
+    
+    def fetch_rows(self, feed_ids: List[str]) -> Dict:
+        """جلب صفوف مجموعة من الخلاصات على دفعات"""
+        records = {}
+        for start in range(0, len(feed_ids), 500):
+            chunk = feed_ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT id, data FROM feeds WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            records.update((feed_id, json.loads(data)) for feed_id, data in rows)
+        return records
+    
+    def poll_changes(self) -> Optional[Tuple[Dict, List[str]]]:
+        """
+        الحصول على تغييرات العمليات الأخرى منذ آخر استدعاء
+        
+        PRAGMA data_version لا يتغير إلا إذا كتبت اتصالات أخرى، فلا يُنفذ أي
+        استعلام آخر ما لم توجد تغييرات
+        """
+        try:
+            with self.lock:
+                data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+                if data_version == self.data_version:
+                    return None
+                self.data_version = data_version
+                
+                self.conn.execute('BEGIN')
+                try:
+                    oldest = self.conn.execute('SELECT MIN(seq) FROM changes').fetchone()[0]
+                    
+                    if oldest is not None and oldest > self.last_seq + 1:
+                        # سجلات التغيير المطلوبة حُذفت، فتُقارن الحالة كاملة
+                        rows = self.conn.execute('SELECT id, data FROM feeds').fetchall()
+                        records = {feed_id: json.loads(data) for feed_id, data in rows}
+                        upserts, deletes = diff_records(self.records, records)
+                    else:
+                        feed_ids = list(dict.fromkeys(row[0] for row in self.conn.execute(
+                            'SELECT feed_id FROM changes WHERE seq > ? AND origin != ? ORDER BY seq',
+                            (self.last_seq, self.origin)
+                        )))
+                        upserts = self.fetch_rows(feed_ids)
+                        deletes = [feed_id for feed_id in feed_ids if feed_id not in upserts]
+                    
+                    self.last_seq = self.max_seq()
+                finally:
+                    self.conn.execute('COMMIT')
+                
+                for feed_id, feed_info in upserts.items():
+                    self.records[feed_id] = feed_info
+                for feed_id in deletes:
+                    self.records.pop(feed_id, None)
+                
+                self.queue_changes(upserts, deletes)
+                return self.take_pending()
+        
+        except Exception as e:
+            print(f"خطأ في قراءة تغييرات البيانات الوصفية: {e}")
+            return None
+    
+    def save_feed(self, feed_id: str, feed_info: Dict):
+        """حفظ البيانات الوصفية لخلاصة واحدة"""
+        try:
+            with self.lock:
+                self.records[feed_id] = feed_info
+                self.write_rows([(feed_id, feed_info)])
+        except Exception as e:
+            print(f"خطأ في حفظ البيانات الوصفية: {e}")
+    
+    def apply_changes(self, upserts: Dict, deletes: List[str]):
+        """حفظ عدة خلاصات وحذف أخرى في معاملة واحدة"""
+        try:
+            with self.lock:
+                self.records.update(upserts)
+                for feed_id in deletes:
+                    self.records.pop(feed_id, None)
+                self.write_rows(upserts.items(), deletes)
+        except Exception as e:
+            print(f"خطأ في حفظ البيانات الوصفية: {e}")
+
+
+def create_metadata_store(backend: str, feeds_dir: str):
+    """
+    إنشاء مخزن البيانات الوصفية حسب النوع
+    
+    Args:
+        backend: نوع المخزن (json أو journal أو sqlite)
+        feeds_dir: مجلد حفظ الخلاصات
+    """
+    if backend == 'sqlite':
+        return SQLiteMetadataStore(feeds_dir)
+    if backend == 'journal':
+        return JournalMetadataStore(feeds_dir)
+    if backend == 'json':
+        return JSONMetadataStore(feeds_dir)
+    
+    raise ValueError(f"نوع مخزن غير مدعوم: {backend}")
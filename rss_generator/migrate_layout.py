@@ -0,0 +1,32 @@
+"""
+أداة نقل ملفات الخلاصات من التخطيط المسطح القديم إلى المجلدات المقسمة
+
+الاستخدام:
+    python -m rss_generator.migrate_layout [مجلد الخلاصات] [--storage journal|json|sqlite]
+
+FeedManager ينفذ نفس النقل عند بدء التشغيل، والأداة تسمح بتنفيذه مسبقاً
+قبل تشغيل الخادم (مثلاً عند وجود عدد كبير من الخلاصات).
+"""
+
+import os
+import argparse
+
+from .feed_manager import FeedManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description='نقل ملفات الخلاصات إلى المجلدات المقسمة')
+    parser.add_argument('feeds_dir', nargs='?', default='feeds', help='مجلد حفظ الخلاصات')
+    parser.add_argument('--storage', default=os.environ.get('METADATA_BACKEND', 'journal'),
+                        choices=['journal', 'json', 'sqlite'], help='نوع مخزن البيانات الوصفية')
+    args = parser.parse_args()
+    
+    feed_manager = FeedManager(args.feeds_dir, storage=args.storage)
+    
+    # تشغيل ثانٍ للتحقق من عدم بقاء ملفات في التخطيط المسطح
+    remaining = feed_manager.migrate_flat_layout()
+    print(f"عدد الخلاصات: {len(feed_manager.metadata)}، خلاصات متبقية للنقل: {remaining}")
+
+
+if __name__ == '__main__':
+    main()
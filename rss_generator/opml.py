@@ -0,0 +1,101 @@
+"""
+استيراد وتصدير قوائم الخلاصات بصيغة OPML
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.etree.ElementTree import iterparse, ParseError
+from xml.sax.saxutils import escape, quoteattr
+from typing import BinaryIO, Dict, Iterable, Iterator, List
+
+
+def parse_opml(stream: BinaryIO, max_outlines: int = 10000) -> List[Dict]:
+    """
+    قراءة روابط المصادر من ملف OPML دون بناء شجرة المستند كاملة
+    
+    كل عنصر outline يُحذف من الذاكرة بعد قراءته، فيبقى استهلاك الذاكرة
+    بحجم قائمة الروابط فقط. رابط المصدر هو htmlUrl (صفحة الحساب) إن وُجد
+    وإلا xmlUrl، والعناصر التي لا تحتوي على رابط (مثل التصنيفات) تُتخطى.
+    
+    Args:
+        stream: ملف OPML مفتوح للقراءة الثنائية
+        max_outlines: أقصى عدد روابط مقبول
+    
+    Returns:
+        قائمة عناصر بالشكل {'url': ..., 'title': ...}
+    
+    Raises:
+        ValueError: إذا لم يكن الملف OPML صالحاً أو تجاوز عدد الروابط الحد
+    """
+    entries = []
+    parents = []
+    
+    try:
+        for event, elem in iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if not parents and elem.tag != 'opml':
+                    raise ValueError('الملف ليس بصيغة OPML')
+                parents.append(elem)
+                continue
+            
+            parents.pop()
+            if elem.tag != 'outline':
+                continue
+            
+            url = (elem.get('htmlUrl') or elem.get('xmlUrl') or '').strip()
+            if url:
+                if len(entries) >= max_outlines:
+                    raise ValueError(f'الحد الأقصى {max_outlines} رابط في ملف OPML')
+                entries.append({'url': url, 'title': elem.get('title') or elem.get('text') or ''})
+            
+            # فصل العنصر المقروء عن أصله حتى لا تتراكم العناصر في الذاكرة
+            parents[-1].remove(elem)
+    except ParseError as e:
+        raise ValueError(f'ملف OPML غير صالح: {e}')
+    
+    return entries
+
+
+def iter_opml(feeds: Iterable[Dict], base_url: str, title: str = 'خلاصات RSS للتواصل الاجتماعي') -> Iterator[str]:
+    """
+    إنشاء ملف OPML كأجزاء نصية متتالية دون تجميعه في الذاكرة
+    
+    الخلاصات المجمّعة لا تُصدَّر لأنها لا تملك رابط مصدر، واستيراد رابط
+    خلاصتها كان سينشئ خلاصة جديدة تستخرج ملف XML من هذا الخادم نفسه.
+    
+    Args:
+        feeds: معلومات الخلاصات (تُقرأ واحدة واحدة)
+        base_url: الرابط الأساسي لروابط الخلاصات
+        title: عنوان الملف
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<opml version="2.0">\n'
+    yield '  <head>\n'
+    yield f'    <title>{escape(title)}</title>\n'
+    yield f'    <dateCreated>{format_datetime(datetime.now(timezone.utc))}</dateCreated>\n'
+    yield '  </head>\n'
+    yield '  <body>\n'
+    
+    for feed_info in feeds:
+        if feed_info.get('type') == 'aggregate':
+            continue
+        
+        feed_title = feed_info.get('title') or feed_info['id']
+        rss_url = feed_info.get('rss_url') or f"/feeds/{feed_info['id']}.xml"
+        attributes = [
+            ('type', 'rss'),
+            ('text', feed_title),
+            ('title', feed_title),
+            ('xmlUrl', f"{base_url}{rss_url}")
+        ]
+        if feed_info.get('url'):
+            attributes.append(('htmlUrl', feed_info['url']))
+        if feed_info.get('description'):
+            attributes.append(('description', feed_info['description']))
+        if feed_info.get('platform'):
+            attributes.append(('category', feed_info['platform']))
+        
+        yield '    <outline ' + ' '.join(f'{name}={quoteattr(value)}' for name, value in attributes) + '/>\n'
+    
+    yield '  </body>\n'
+    yield '</opml>\n'
@@ -0,0 +1,284 @@
+"""
+فهرس نصي كامل لمنشورات جميع الخلاصات باستخدام SQLite FTS5
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from .search_index import tokenize, query_terms
+
+
+class PostsIndex:
+    """
+    فهرس FTS5 لعناوين المنشورات ونصوصها وهاشتاغاتها
+    
+    النصوص تُوحَّد بنفس دالة فهرس الخلاصات قبل الفهرسة وقبل البحث، لذلك
+    يتجاهل البحث التشكيل واختلاف أشكال الحروف العربية. بيانات العرض والتصفية
+    (الخلاصة والمنصة وتاريخ النشر) في جدول posts مفهرس، ونصوص البحث في جدول
+    posts_fts بنفس rowid.
+    
+    الفهرسة تزايدية: المنشور الذي لم تتغير بصمته لا يُعاد فهرسته.
+    """
+    
+    # عدد المعرفات في استعلام IN واحد
+    BATCH_SIZE = 500
+    
+    # عدد أحدث المطابقات التي تُرتب حسب الصلة
+    RANK_WINDOW = 2000
+    
+    def __init__(self, feeds_dir: str):
+        """
+        تهيئة الفهرس
+        
+        Args:
+            feeds_dir: مجلد حفظ الخلاصات
+        """
+        self.db_path = os.path.join(feeds_dir, "posts_index.db")
+        self.lock = threading.Lock()
+        
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA busy_timeout=5000')
+        
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS posts (
+                id INTEGER PRIMARY KEY,
+                feed_id TEXT NOT NULL,
+                guid TEXT NOT NULL,
+                platform TEXT,
+                pub_date TEXT,
+                title TEXT,
+                link TEXT,
+                description TEXT,
+                author TEXT,
+                hashtags TEXT,
+                content_hash TEXT NOT NULL,
+                UNIQUE (feed_id, guid)
+            );
+            CREATE INDEX IF NOT EXISTS idx_posts_pub_date ON posts(pub_date);
+            CREATE INDEX IF NOT EXISTS idx_posts_platform_pub_date ON posts(platform, pub_date);
+            CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                title, body, hashtags, tokenize = 'unicode61'
+            );
+        """)
+    
+    def item_hashtags(self, item: Dict) -> List[str]:
+        """الهاشتاغات من فئات العنصر"""
+        return [term for term, label in item.get('categories', []) if label.startswith('#')]
+    
+    def item_hash(self, item: Dict) -> str:
+        """بصمة الحقول المفهرسة والمعروضة من العنصر"""
+        fields = [item.get(field) for field in ('title', 'description', 'link', 'pub_date', 'author')]
+        encoded = json.dumps([fields, item.get('categories', [])], ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    def index_items(self, feed_info: Dict, items: List[Dict]) -> int:
+        """
+        فهرسة عناصر خلاصة جديدة أو معدلة
+        
+        Args:
+            feed_info: معلومات الخلاصة
+            items: العناصر المُنشأة بواسطة RSSGenerator.build_item
+        
+        Returns:
+            عدد العناصر التي أُعيدت فهرستها
+        """
+        feed_id = feed_info['id']
+        items = {item['guid']: item for item in items}
+        hashes = {guid: self.item_hash(item) for guid, item in items.items()}
+        
+        try:
+            with self.lock:
+                self.conn.execute('BEGIN IMMEDIATE')
+                try:
+                    existing = {}
+                    guids = list(items)
+                    for start in range(0, len(guids), self.BATCH_SIZE):
+                        chunk = guids[start:start + self.BATCH_SIZE]
+                        rows = self.conn.execute(
+                            f"SELECT guid, id, content_hash FROM posts WHERE feed_id = ? "
+                            f"AND guid IN ({', '.join('?' * len(chunk))})",
+                            [feed_id] + chunk
+                        )
+                        existing.update((guid, (row_id, content_hash)) for guid, row_id, content_hash in rows)
+                    
+                    indexed = 0
+                    for guid, item in items.items():
+                        row_id, content_hash = existing.get(guid, (None, None))
+                        if content_hash == hashes[guid]:
+                            continue
+                        
+                        hashtags = self.item_hashtags(item)
+                        values = (
+                            feed_id, guid, feed_info.get('platform'), item.get('pub_date'),
+                            item.get('title'), item.get('link'), item.get('description'),
+                            item.get('author'), ' '.join(hashtags), hashes[guid]
+                        )
+                        
+                        if row_id is None:
+                            row_id = self.conn.execute(
+                                'INSERT INTO posts (feed_id, guid, platform, pub_date, title, link, '
+                                'description, author, hashtags, content_hash) '
+                                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                values
+                            ).lastrowid
+                        else:
+                            self.conn.execute(
+                                'UPDATE posts SET feed_id = ?, guid = ?, platform = ?, pub_date = ?, '
+                                'title = ?, link = ?, description = ?, author = ?, hashtags = ?, '
+                                'content_hash = ? WHERE id = ?',
+                                values + (row_id,)
+                            )
+                            self.conn.execute('DELETE FROM posts_fts WHERE rowid = ?', (row_id,))
+                        
+                        self.conn.execute(
+                            'INSERT INTO posts_fts (rowid, title, body, hashtags) VALUES (?, ?, ?, ?)',
+                            (
+                                row_id,
+                                ' '.join(tokenize(item.get('title') or '')),
+                                ' '.join(tokenize(item.get('description') or '')),
+                                ' '.join(tokenize(' '.join(hashtags)))
+                            )
+                        )
+                        indexed += 1
+                    
+                    self.conn.execute('COMMIT')
+                    return indexed
+                except Exception:
+                    self.conn.execute('ROLLBACK')
+                    raise
+        
+        except Exception as e:
+            print(f"خطأ في فهرسة المنشورات: {e}")
+            return 0
+    
+    def delete_feeds(self, feed_ids: List[str]):
+        """حذف جميع منشورات مجموعة من الخلاصات من الفهرس في معاملة واحدة"""
+        try:
+            with self.lock:
+                self.conn.execute('BEGIN IMMEDIATE')
+                try:
+                    for start in range(0, len(feed_ids), self.BATCH_SIZE):
+                        chunk = feed_ids[start:start + self.BATCH_SIZE]
+                        placeholders = ', '.join('?' * len(chunk))
+                        self.conn.execute(
+                            f"DELETE FROM posts_fts WHERE rowid IN "
+                            f"(SELECT id FROM posts WHERE feed_id IN ({placeholders}))",
+                            chunk
+                        )
+                        self.conn.execute(f"DELETE FROM posts WHERE feed_id IN ({placeholders})", chunk)
+                    self.conn.execute('COMMIT')
+                except Exception:
+                    self.conn.execute('ROLLBACK')
+                    raise
+        except Exception as e:
+            print(f"خطأ في حذف منشورات الخلاصة من الفهرس: {e}")
+    
+    def build_match(self, query: str) -> Optional[str]:
+        """
+        تحويل نص البحث إلى تعبير FTS5 آمن
+        
+        كل كلمة بين علامتي تنصيص حتى لا تُفسَّر كعوامل FTS5، والكلمة الأخيرة
+        تطابق بالبادئة
+        """
+        terms = query_terms(query)
+        if not terms:
+            return None
+        
+        phrases = [f'"{term}"' for term in terms]
+        phrases[-1] += '*'
+        return ' '.join(phrases)
+    
+    def search(self, query: str, platform: Optional[str] = None, feed_id: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None,
+               sort: str = 'relevance', limit: int = 20, offset: int = 0) -> Dict:
+        """
+        البحث في المنشورات
+        
+        Args:
+            query: نص البحث
+            platform: تصفية حسب المنصة
+            feed_id: تصفية حسب الخلاصة
+            since: أقدم تاريخ نشر (ISO 8601)
+            until: أحدث تاريخ نشر (ISO 8601)
+            sort: الترتيب حسب الصلة (relevance) أو الأحدث (date)
+            limit: الحد الأقصى لعدد النتائج
+            offset: عدد النتائج المتخطاة
+        
+        Returns:
+            قاموس يحتوي على results و has_more
+        """
+        match = self.build_match(query)
+        if not match:
+            return {'results': [], 'has_more': False}
+        
+        conditions = ['posts_fts MATCH ?']
+        params = [match]
+        
+        if platform:
+            conditions.append('p.platform = ?')
+            params.append(platform)
+        if feed_id:
+            conditions.append('p.feed_id = ?')
+            params.append(feed_id)
+        if since:
+            conditions.append('p.pub_date >= ?')
+            params.append(since)
+        if until:
+            conditions.append('p.pub_date <= ?')
+            params.append(until)
+        
+        source = 'FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid'
+        
+        with self.lock:
+            if sort == 'date':
+                order = 'p.pub_date DESC'
+            else:
+                order = 'posts_fts.rank'
+                
+                # حساب bm25 لكل المطابقات مكلف للكلمات الشائعة، فيقتصر الترتيب
+                # على أحدث المطابقات فهرسةً (rowid تصاعدي مع وقت الفهرسة)
+                window = max(self.RANK_WINDOW, offset + limit + 1)
+                threshold = self.conn.execute(
+                    f"SELECT posts_fts.rowid {source} WHERE {' AND '.join(conditions)} "
+                    f"ORDER BY posts_fts.rowid DESC LIMIT 1 OFFSET ?",
+                    params + [window - 1]
+                ).fetchone()
+                if threshold:
+                    conditions.append('posts_fts.rowid >= ?')
+                    params.append(threshold[0])
+            
+            # طلب نتيجة إضافية لمعرفة وجود صفحة تالية دون عدّ كل النتائج
+            rows = self.conn.execute(
+                'SELECT p.feed_id, p.guid, p.platform, p.pub_date, p.title, p.link, p.description, '
+                f"p.author, p.hashtags {source} WHERE {' AND '.join(conditions)} "
+                f"ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit + 1, offset]
+            ).fetchall()
+        
+        results = [
+            {
+                'feed_id': row[0],
+                'guid': row[1],
+                'platform': row[2],
+                'pub_date': row[3],
+                'title': row[4],
+                'link': row[5],
+                'description': row[6],
+                'author': row[7],
+                'hashtags': row[8].split() if row[8] else []
+            }
+            for row in rows[:limit]
+        ]
+        
+        return {'results': results, 'has_more': len(rows) > limit}
+    
+    def get_stats(self) -> Dict:
+        """الحصول على إحصائيات الفهرس"""
+        with self.lock:
+            return {'posts': self.conn.execute('SELECT COUNT(*) FROM posts').fetchone()[0]}
@@ -0,0 +1,107 @@
+"""
+ضبط فترة تحديث كل خلاصة تلقائياً حسب معدل نشر المنشورات الجديدة فيها
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class AdaptiveRefreshPolicy:
+    """
+    تقدير الفترة بين المنشورات الجديدة بمتوسط متحرك أسي (EWMA)
+    
+    عند كل فحص يظهر فيه k منشور جديد تُحسب الفترة الملاحظة (الوقت منذ آخر
+    منشور جديد ÷ k) وتُدمج في التقدير. فترة التحديث نسبة من التقدير ضمن حد
+    أدنى وأقصى، والفحص الذي لا يجد جديداً يضاعف الفترة تدريجياً حتى الحد
+    الأقصى. بذلك تُفحص الحسابات النشطة كثيراً والصفحات الخاملة نادراً.
+    """
+    
+    def __init__(self, min_interval: int = 15, max_interval: int = 24 * 60,
+                 smoothing: float = 0.3, target_ratio: float = 0.5, backoff: float = 1.5):
+        """
+        تهيئة السياسة
+        
+        Args:
+            min_interval: أقل فترة تحديث بالدقائق
+            max_interval: أكبر فترة تحديث بالدقائق
+            smoothing: وزن الملاحظة الجديدة في المتوسط المتحرك
+            target_ratio: فترة التحديث كنسبة من الفترة المقدرة بين المنشورات
+            backoff: معامل زيادة الفترة بعد كل فحص دون منشورات جديدة
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.target_ratio = target_ratio
+        self.backoff = backoff
+    
+    def clamp(self, minutes: float) -> int:
+        """حصر الفترة بين الحدين"""
+        return int(round(min(self.max_interval, max(self.min_interval, minutes))))
+    
+    def interval_for(self, posting_interval: float) -> int:
+        """فترة التحديث المناسبة لفترة نشر مقدرة"""
+        return self.clamp(posting_interval * self.target_ratio)
+    
+    def estimate_from_items(self, items: List[Dict]) -> Optional[float]:
+        """
+        تقدير أولي للفترة بين المنشورات من تواريخ نشر العناصر
+        
+        Returns:
+            الفترة بالدقائق أو None إذا لم تكفِ التواريخ
+        """
+        dates = []
+        for item in items:
+            try:
+                dates.append(datetime.fromisoformat(item['pub_date']))
+            except (KeyError, TypeError, ValueError):
+                continue
+        
+        if len(dates) < 2:
+            return None
+        
+        span = (max(dates) - min(dates)).total_seconds() / 60
+        if span <= 0:
+            return None
+        
+        return span / (len(dates) - 1)
+    
+    def observe(self, feed_info: Dict, new_posts: int, now: Optional[datetime] = None) -> Dict:
+        """
+        تحديث التقدير وفترة التحديث بعد فحص الخلاصة
+        
+        Args:
+            feed_info: معلومات الخلاصة قبل الفحص
+            new_posts: عدد المنشورات الجديدة التي ظهرت في الفحص
+            now: وقت الفحص
+        
+        Returns:
+            الحقول المحدثة: update_interval و posting_interval و last_new_post_at و empty_refreshes
+        """
+        now = now or datetime.now()
+        interval = feed_info.get('update_interval', 60)
+        estimate = feed_info.get('posting_interval')
+        
+        if not new_posts:
+            empty_refreshes = feed_info.get('empty_refreshes', 0) + 1
+            return {
+                'update_interval': self.clamp(interval * self.backoff),
+                'empty_refreshes': empty_refreshes
+            }
+        
+        since = feed_info.get('last_new_post_at') or feed_info.get('created_at')
+        try:
+            elapsed = (now - datetime.fromisoformat(since)).total_seconds() / 60
+        except (TypeError, ValueError):
+            elapsed = interval
+        
+        observed = max(elapsed, 0) / new_posts
+        estimate = observed if estimate is None else (
+            self.smoothing * observed + (1 - self.smoothing) * estimate
+        )
+        
+        return {
+            'update_interval': self.interval_for(estimate),
+            'posting_interval': round(estimate, 2),
+            'last_new_post_at': now.isoformat(),
+            'empty_refreshes': 0
+        }
@@ -0,0 +1,89 @@
+"""
+ذاكرة مؤقتة لنتائج تحويل المنشورات إلى عناصر RSS
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class RenderCache:
+    """
+    ذاكرة LRU محدودة الحجم للعناوين والأوصاف ومحتوى HTML والفئات المُنشأة
+    
+    المفتاح يتكون من إصدار المولد وبصمة المنشور، لذلك تُهمل النتائج القديمة
+    تلقائياً عند تغيير طريقة التحويل.
+    """
+    
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """
+        تهيئة الذاكرة المؤقتة
+        
+        Args:
+            max_bytes: الحد الأقصى التقريبي لحجم النتائج المخزنة
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def estimate_size(self, rendered: Dict) -> int:
+        """تقدير حجم النتيجة بالبايت"""
+        size = len(rendered.get('title', '')) + len(rendered.get('description', ''))
+        size += len(rendered.get('content', ''))
+        size += sum(len(term) + len(label) for term, label in rendered.get('categories', []))
+        return size * 2
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """الحصول على نتيجة مخزنة"""
+        with self.lock:
+            rendered = self.entries.get(key)
+            if rendered is None:
+                self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return rendered
+    
+    def put(self, key: str, rendered: Dict):
+        """تخزين نتيجة مع إخراج الأقدم استخداماً عند تجاوز الحد"""
+        size = self.estimate_size(rendered)
+        if size > self.max_bytes:
+            return
+        
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self.sizes[key]
+            
+            self.entries[key] = rendered
+            self.entries.move_to_end(key)
+            self.sizes[key] = size
+            self.current_bytes += size
+            
+            while self.current_bytes > self.max_bytes:
+                evicted, _ = self.entries.popitem(last=False)
+                self.current_bytes -= self.sizes.pop(evicted)
+    
+    def load(self, entries: Dict[str, Dict]):
+        """تحميل نتائج محفوظة دون استبدال الموجود"""
+        for key, rendered in entries.items():
+            if key not in self.entries:
+                self.put(key, rendered)
+    
+    def get_stats(self) -> Dict:
+        """الحصول على إحصائيات الذاكرة المؤقتة"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -3,20 +3,49 @@
 """
 
 from feedgen.feed import FeedGenerator
+from .feed_extensions import FeedLinksExtension
+from .url_utils import feed_id_from_url
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 import re
 from urllib.parse import urljoin
-import uuid
+import json
+import hashlib
 
 
 class RSSGenerator:
     """فئة مولد خلاصات RSS"""
     
-    def __init__(self):
-        """تهيئة مولد RSS"""
+    # حقول المنشور التي تؤثر على محتوى الخلاصة المُنشأة
+    CONTENT_FIELDS = (
+        'title', 'summary', 'text', 'caption', 'post_url', 'url',
+        'images', 'video', 'video_url', 'likes', 'likes_count',
+        'comments', 'comments_count', 'shares', 'username', 'author',
+        'platform', 'time', 'taken_at'
+    )
+    
+    # حقول المنشور التي يعتمد عليها العنوان والوصف ومحتوى HTML والفئات
+    RENDER_FIELDS = (
+        'title', 'summary', 'text', 'caption', 'post_url', 'url', 'images',
+        'likes', 'likes_count', 'comments', 'comments_count', 'shares',
+        'username', 'platform'
+    )
+    
+    # يجب زيادته عند تغيير أي من دوال التحويل أو مفتاح التحويل لإهمال النتائج المخزنة
+    RENDERER_VERSION = 2
+    
+    def __init__(self, render_cache=None):
+        """
+        تهيئة مولد RSS
+        
+        Args:
+            render_cache: ذاكرة مؤقتة اختيارية لنتائج تحويل المنشورات
+        """
         self.fg = None
         self.base_url = "https://rss-social-tool.com"  # يمكن تغييره حسب النطاق الفعلي
+        self.render_cache = render_cache
+        self.rendered_posts = {}
+        self.items = []
     
     def create_feed(self, 
                    title: str,
@@ -24,7 +53,8 @@ class RSSGenerator:
                    link: str,
                    language: str = "ar",
                    author_name: str = "RSS Social Tool",
-                   author_email: str = "info@rss-social-tool.com") -> FeedGenerator:
+                   author_email: str = "info@rss-social-tool.com",
+                   self_url: Optional[str] = None) -> FeedGenerator:
         """
         إنشاء خلاصة RSS جديدة
         
@@ -35,7 +65,8 @@ class RSSGenerator:
             language: لغة المحتوى
             author_name: اسم المؤلف
             author_email: بريد المؤلف الإلكتروني
-            
+            self_url: الرابط العام للخلاصة نفسها (يُشتق من رابط المصدر إذا لم يُحدد)
+        
         Returns:
             كائن FeedGenerator
         """
@@ -45,7 +76,7 @@ class RSSGenerator:
         self.fg.title(title)
         self.fg.description(description)
         self.fg.link(href=link, rel='alternate')
-        self.fg.link(href=f"{self.base_url}/rss/{self.generate_feed_id(link)}.xml", rel='self')
+        self.fg.link(href=self_url or f"{self.base_url}/feeds/{self.generate_feed_id(link)}.xml", rel='self')
         self.fg.language(language)
         
         # إعداد معلومات المؤلف
@@ -78,7 +109,66 @@ class RSSGenerator:
         
         Args:
             post_data: بيانات المنشور
+        
+        Returns:
+            True إذا تمت الإضافة بنجاح
+        """
+        if not self.fg:
+            return False
+        
+        try:
+            item = self.build_item(post_data)
             
+            if not self.add_item_to_feed(item):
+                return False
+            
+            self.items.append(item)
+            return True
+        
+        except Exception as e:
+            print(f"خطأ في إضافة المنشور للخلاصة: {e}")
+            return False
+    
+    def build_item(self, post_data: Dict) -> Dict:
+        """
+        تحويل المنشور إلى عنصر خلاصة قابل للحفظ بصيغة JSON
+        
+        العناصر المحفوظة تسمح بإعادة تجميع الخلاصات دون إعادة تحويل المنشورات
+        """
+        # إعداد معلومات المنشور الأساسية
+        rendered = self.render_post(post_data)
+        
+        # إعداد الرابط
+        post_url = post_data.get('post_url', post_data.get('url', ''))
+        
+        # إعداد التاريخ
+        post_time = self.parse_post_time(post_data.get('time', post_data.get('taken_at')))
+        if not post_time:
+            post_time = datetime.now(timezone.utc)
+        elif post_time.tzinfo is None:
+            post_time = post_time.replace(tzinfo=timezone.utc)
+        
+        return {
+            'title': rendered['title'],
+            'link': post_url,
+            # استخدام بصمة المنشور كمعرف ثابت إذا لم يكن هناك رابط
+            'guid': post_url or self.fingerprint_post(post_data),
+            'guid_permalink': bool(post_url),
+            'description': rendered['description'],
+            'content': rendered['content'],
+            'pub_date': post_time.astimezone(timezone.utc).isoformat(),
+            'author': post_data.get('username', post_data.get('author', 'مجهول')),
+            'categories': rendered['categories'],
+            'enclosures': self.generate_enclosures(post_data)
+        }
+    
+    def add_item_to_feed(self, item: Dict) -> bool:
+        """
+        إضافة عنصر جاهز إلى الخلاصة
+        
+        Args:
+            item: عنصر مُنشأ بواسطة build_item
+        
         Returns:
             True إذا تمت الإضافة بنجاح
         """
@@ -87,52 +177,76 @@ class RSSGenerator:
         
         try:
             fe = self.fg.add_entry()
+            fe.title(item['title'])
             
-            # إعداد معلومات المنشور الأساسية
-            title = self.generate_post_title(post_data)
-            fe.title(title)
-            
-            # إعداد الرابط
-            post_url = post_data.get('post_url', post_data.get('url', ''))
-            if post_url:
-                fe.link(href=post_url)
-                fe.guid(post_url, permalink=True)
-            else:
-                # إنشاء GUID فريد إذا لم يكن هناك رابط
-                fe.guid(str(uuid.uuid4()), permalink=False)
+            if item['link']:
+                fe.link(href=item['link'])
+            fe.guid(item['guid'], permalink=item['guid_permalink'])
             
             # إعداد المحتوى
-            content = self.generate_post_content(post_data)
-            fe.description(content)
+            fe.description(item['description'])
             
             # إضافة المحتوى الكامل إذا كان متوفراً
-            full_content = self.generate_full_content(post_data)
-            if full_content:
-                fe.content(content=full_content, type='html')
-            
-            # إعداد التاريخ
-            post_time = self.parse_post_time(post_data.get('time', post_data.get('taken_at')))
-            if post_time:
-                fe.pubDate(post_time)
-            else:
-                fe.pubDate(datetime.now(timezone.utc))
+            if item['content']:
+                fe.content(content=item['content'], type='html')
             
-            # إعداد المؤلف
-            author = post_data.get('username', post_data.get('author', 'مجهول'))
-            fe.author(name=author)
+            fe.pubDate(datetime.fromisoformat(item['pub_date']))
+            fe.author(name=item['author'])
             
             # إضافة الفئات (الهاشتاغات)
-            self.add_categories_to_entry(fe, post_data)
+            for term, label in item['categories']:
+                fe.category(term=term, label=label)
             
-            # إضافة الصور كمرفقات
-            self.add_enclosures_to_entry(fe, post_data)
+            # إضافة الصور والفيديوهات كمرفقات
+            for enclosure in item['enclosures']:
+                try:
+                    fe.enclosure(url=enclosure['url'], type=enclosure['type'], length="0")
+                except:
+                    continue
             
             return True
-            
+        
         except Exception as e:
-            print(f"خطأ في إضافة المنشور للخلاصة: {e}")
+            print(f"خطأ في إضافة العنصر للخلاصة: {e}")
             return False
     
+    def render_post(self, post_data: Dict) -> Dict:
+        """
+        تحويل المنشور إلى عنوان ووصف ومحتوى HTML وفئات
+        
+        تُعاد النتيجة من الذاكرة المؤقتة إذا لم يتغير المنشور منذ آخر تحويل
+        
+        Returns:
+            قاموس يحتوي على title و description و content و categories
+        """
+        key = self.render_key(post_data)
+        
+        rendered = self.render_cache.get(key) if self.render_cache is not None else None
+        
+        if rendered is None:
+            rendered = {
+                'title': self.generate_post_title(post_data),
+                'description': self.generate_post_content(post_data),
+                'content': self.generate_full_content(post_data),
+                'categories': self.generate_categories(post_data)
+            }
+            if self.render_cache is not None:
+                self.render_cache.put(key, rendered)
+        
+        self.rendered_posts[key] = rendered
+        return rendered
+    
+    def render_key(self, post_data: Dict) -> str:
+        """
+        مفتاح نتيجة التحويل في الذاكرة المؤقتة
+        
+        يُبنى من القيم الخام لحقول التحويل لأن دوال التحويل تعامل القيمة
+        الفارغة ('' أو []) بشكل مختلف عن الحقل غير الموجود
+        """
+        values = {field: post_data.get(field) for field in self.RENDER_FIELDS}
+        encoded = json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+        return f"{self.RENDERER_VERSION}:{hashlib.sha256(encoded.encode('utf-8')).hexdigest()}"
+    
     def generate_post_title(self, post_data: Dict) -> str:
         """إنشاء عنوان للمنشور"""
         # محاولة استخدام العنوان إذا كان متوفراً
@@ -225,38 +339,52 @@ class RSSGenerator:
         
         return "".join(html_parts) if html_parts else "<p>محتوى غير متوفر</p>"
     
-    def add_categories_to_entry(self, entry, post_data: Dict):
-        """إضافة الفئات (الهاشتاغات) للمنشور"""
+    def generate_categories(self, post_data: Dict) -> List[List[str]]:
+        """إنشاء قائمة الفئات (الهاشتاغات والمنصة) للمنشور"""
+        categories = []
+        
         text = post_data.get('text', post_data.get('caption', ''))
         if text:
             # استخراج الهاشتاغات
             hashtags = re.findall(r'#(\w+)', text)
             for hashtag in hashtags[:5]:  # أول 5 هاشتاغات فقط
-                entry.category(term=hashtag, label=f"#{hashtag}")
+                categories.append([hashtag, f"#{hashtag}"])
         
         # إضافة فئة المنصة
         platform = post_data.get('platform', '')
         if platform:
-            entry.category(term=platform, label=platform)
+            categories.append([platform, platform])
+        
+        return categories
     
-    def add_enclosures_to_entry(self, entry, post_data: Dict):
-        """إضافة المرفقات (الصور/الفيديوهات) للمنشور"""
-        # إضافة الصور
+    def add_categories_to_entry(self, entry, post_data: Dict):
+        """إضافة الفئات (الهاشتاغات) للمنشور"""
+        for term, label in self.generate_categories(post_data):
+            entry.category(term=term, label=label)
+    
+    def generate_enclosures(self, post_data: Dict) -> List[Dict]:
+        """إنشاء قائمة المرفقات (الصور/الفيديوهات) للمنشور"""
+        enclosures = []
+        
+        # صورة واحدة فقط كمرفق
         images = post_data.get('images', [])
-        for img_url in images[:1]:  # صورة واحدة فقط كمرفق
-            try:
-                entry.enclosure(url=img_url, type="image/jpeg", length="0")
-                break
-            except:
-                continue
+        if images:
+            enclosures.append({'url': images[0], 'type': 'image/jpeg'})
         
         # إضافة الفيديو إذا كان متوفراً
         video_url = post_data.get('video', post_data.get('video_url', ''))
         if video_url:
+            enclosures.append({'url': video_url, 'type': 'video/mp4'})
+        
+        return enclosures
+    
+    def add_enclosures_to_entry(self, entry, post_data: Dict):
+        """إضافة المرفقات (الصور/الفيديوهات) للمنشور"""
+        for enclosure in self.generate_enclosures(post_data):
             try:
-                entry.enclosure(url=video_url, type="video/mp4", length="0")
+                entry.enclosure(url=enclosure['url'], type=enclosure['type'], length="0")
             except:
-                pass
+                continue
     
     def parse_post_time(self, time_str) -> Optional[datetime]:
         """تحويل وقت المنشور إلى datetime"""
@@ -280,14 +408,39 @@ class RSSGenerator:
                     pass
             
             return None
-            
+        
         except Exception as e:
             print(f"خطأ في تحليل الوقت: {e}")
             return None
     
+    def normalize_post(self, post_data: Dict, scraped_at: Optional[str] = None,
+                       fields: Optional[tuple] = None) -> Dict:
+        """
+        استخراج الحقول المؤثرة في المحتوى فقط من المنشور
+        
+        يُتجاهل وقت المنشور إذا كان مجرد وقت الاستخراج (كما في المواقع العامة)
+        """
+        normalized = {
+            field: post_data[field]
+            for field in (fields or self.CONTENT_FIELDS)
+            if post_data.get(field) not in (None, '', [])
+        }
+        
+        if scraped_at and normalized.get('time') == scraped_at:
+            del normalized['time']
+        
+        return normalized
+    
+    def fingerprint_post(self, post_data: Dict, scraped_at: Optional[str] = None,
+                         fields: Optional[tuple] = None) -> str:
+        """إنشاء بصمة ثابتة لمحتوى المنشور"""
+        normalized = self.normalize_post(post_data, scraped_at, fields)
+        encoded = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
     def generate_feed_id(self, url: str) -> str:
-        """إنشاء معرف فريد للخلاصة"""
-        return str(hash(url))[:10].replace('-', '0')
+        """إنشاء معرف ثابت للخلاصة من الرابط الموحد (نفس معرف FeedManager)"""
+        return feed_id_from_url(url)
     
     def generate_rss_xml(self) -> str:
         """إنشاء XML للخلاصة"""
@@ -312,27 +465,76 @@ class RSSGenerator:
             print(f"خطأ في حفظ الملف: {e}")
             return False
     
+    def create_feed_from_items(self, title: str, description: str, link: str, items: List[Dict],
+                               links: Optional[List[tuple]] = None, archive: bool = False,
+                               self_url: Optional[str] = None, hub_url: Optional[str] = None) -> str:
+        """
+        إنشاء خلاصة RSS من عناصر جاهزة دون إعادة تحويل المنشورات
+        
+        Args:
+            title: عنوان الخلاصة
+            description: وصف الخلاصة
+            link: رابط الخلاصة
+            items: العناصر مرتبة من الأحدث إلى الأقدم
+            links: روابط Atom إضافية بصيغة (rel, href)
+            archive: تحديد الخلاصة كصفحة أرشيف (RFC 5005)
+            self_url: الرابط العام للخلاصة نفسها
+            hub_url: رابط موزع WebSub الذي يرسل تحديثات الخلاصة للمشتركين
+        
+        Returns:
+            XML للخلاصة
+        """
+        try:
+            self.create_feed(title, description, link, self_url=self_url)
+            
+            # المشتركون يكتشفون الموزع من رابط hub ويشتركون في رابط self
+            if hub_url:
+                links = list(links or []) + [('hub', hub_url)]
+            
+            if links or archive:
+                self.fg.register_extension('links', FeedLinksExtension)
+                for rel, href in links or []:
+                    self.fg.links.add_link(rel, href)
+                self.fg.links.set_archive(archive)
+            
+            # FeedGenerator يضيف العناصر في بداية القائمة، لذا نبدأ بالأقدم
+            for item in reversed(items):
+                if self.add_item_to_feed(item):
+                    self.items.append(item)
+            
+            return self.generate_rss_xml()
+        
+        except Exception as e:
+            print(f"خطأ في إنشاء الخلاصة: {e}")
+            return ""
+    
+    def get_feed_details(self, scraped_data: Dict) -> Dict:
+        """استخراج عنوان الخلاصة ووصفها ورابطها من البيانات المستخرجة"""
+        platform = scraped_data.get('platform', 'منصة التواصل الاجتماعي')
+        username = scraped_data.get('username', scraped_data.get('page_name', 'مستخدم'))
+        
+        return {
+            'title': f"خلاصة {username} على {platform}",
+            'description': f"آخر المنشورات من {username} على {platform}",
+            'link': scraped_data.get('url', '')
+        }
+    
     def create_feed_from_scraped_data(self, scraped_data: Dict) -> str:
         """
         إنشاء خلاصة RSS من البيانات المستخرجة
         
         Args:
             scraped_data: البيانات المستخرجة من المنصة
-            
+        
         Returns:
             XML للخلاصة
         """
         try:
             # إعداد معلومات الخلاصة
-            platform = scraped_data.get('platform', 'منصة التواصل الاجتماعي')
-            username = scraped_data.get('username', scraped_data.get('page_name', 'مستخدم'))
-            
-            title = f"خلاصة {username} على {platform}"
-            description = f"آخر المنشورات من {username} على {platform}"
-            link = scraped_data.get('url', '')
+            details = self.get_feed_details(scraped_data)
             
             # إنشاء الخلاصة
-            self.create_feed(title, description, link)
+            self.create_feed(details['title'], details['description'], details['link'])
             
             # إضافة المنشورات
             posts = scraped_data.get('posts', [])
@@ -341,7 +543,7 @@ class RSSGenerator:
             
             # إنشاء XML
             return self.generate_rss_xml()
-            
+        
         except Exception as e:
             print(f"خطأ في إنشاء الخلاصة: {e}")
             return ""
@@ -0,0 +1,226 @@
+"""
+فهرس بحث معكوس للخلاصات مع توحيد النصوص العربية واللاتينية
+"""
+
+import re
+import heapq
+import bisect
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Tuple
+
+
+# توحيد أشكال الحروف العربية التي لا يفككها NFKD
+ARABIC_FOLDING = str.maketrans({
+    'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي',
+    'ـ': None,  # التطويل
+})
+
+STOP_WORDS = frozenset({
+    'من', 'في', 'علي', 'الي', 'عن', 'مع', 'و',
+    'the', 'of', 'on', 'in', 'and', 'a', 'an', 'to', 'from',
+})
+
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+
+def normalize_text(text: str) -> str:
+    """
+    توحيد النص للبحث
+    
+    يزيل التشكيل وعلامات النبر اللاتينية، ويوحد أشكال الألف والتاء المربوطة
+    والألف المقصورة والهمزات، ويحذف التطويل، ويحول الأحرف اللاتينية إلى الصغيرة.
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(ch for ch in decomposed if unicodedata.category(ch) != 'Mn')
+    return stripped.translate(ARABIC_FOLDING).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """تقسيم النص الموحد إلى كلمات مع حذف كلمات الربط"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(normalize_text(text)):
+        if token in STOP_WORDS:
+            continue
+        tokens.append(token)
+        
+        # أداة التعريف لا تؤثر على المطابقة: "المنشورات" تطابق "منشورات"
+        if token.startswith('ال') and len(token) > 4:
+            tokens.append(token[2:])
+    
+    return tokens
+
+
+def query_terms(text: str) -> List[str]:
+    """
+    كلمات الاستعلام الموحدة دون تكرار
+    
+    الكلمة التي تبدأ بأداة التعريف تُبحث بدونها فقط، لأن المستندات تُفهرس
+    دائماً بالشكل المجرد أيضاً، فتطابق "المدرسة" المستند "مدرسة" وتطابق
+    البادئة "الجدي" الكلمة "الجديدة"
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(normalize_text(text)):
+        if token in STOP_WORDS:
+            continue
+        if token.startswith('ال') and len(token) > 4:
+            token = token[2:]
+        if token not in terms:
+            terms.append(token)
+    return terms
+
+
+class SearchIndex:
+    """
+    فهرس معكوس من الكلمات الموحدة إلى معرفات الخلاصات
+    
+    كل حقل له وزن في ترتيب النتائج، والكلمة الأخيرة في الاستعلام تطابق
+    بالبادئة أيضاً. البحث يبدأ بأندر كلمة في الاستعلام ثم يتحقق من باقي
+    الكلمات في مستند كل مرشح، لذا لا يمر على كل الخلاصات.
+    """
+    
+    FIELD_WEIGHTS = {'title': 3.0, 'platform': 2.0, 'description': 1.0}
+    
+    # وزن المطابقة بالبادئة مقارنة بالمطابقة الكاملة
+    PREFIX_WEIGHT = 0.5
+    
+    # الحد الأدنى لطول البادئة والحد الأقصى لعدد الكلمات التي تتوسع إليها
+    MIN_PREFIX_LENGTH = 2
+    MAX_PREFIX_EXPANSIONS = 64
+    
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.documents: Dict[str, Dict[str, float]] = {}
+        self.terms: List[str] = []
+        self.lock = threading.Lock()
+    
+    def document_terms(self, feed_info: Dict) -> Dict[str, float]:
+        """حساب أوزان كلمات الخلاصة من حقولها"""
+        weights = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            for token in tokenize(str(feed_info.get(field) or '')):
+                weights[token] = max(weights.get(token, 0.0), weight)
+        return weights
+    
+    def add(self, feed_info: Dict):
+        """إضافة خلاصة أو تحديث كلماتها"""
+        feed_id = feed_info['id']
+        weights = self.document_terms(feed_info)
+        
+        with self.lock:
+            previous = self.documents.get(feed_id)
+            if previous == weights:
+                return
+            if previous:
+                self.unlink(feed_id, previous)
+            
+            self.documents[feed_id] = weights
+            for term, weight in weights.items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = {}
+                    bisect.insort(self.terms, term)
+                posting[feed_id] = weight
+    
+    def remove(self, feed_id: str):
+        """حذف خلاصة من الفهرس"""
+        with self.lock:
+            previous = self.documents.pop(feed_id, None)
+            if previous:
+                self.unlink(feed_id, previous)
+    
+    def unlink(self, feed_id: str, weights: Dict[str, float]):
+        """حذف مراجع الخلاصة من قوائم الكلمات (يُستدعى والقفل محجوز)"""
+        for term in weights:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            
+            posting.pop(feed_id, None)
+            if not posting:
+                del self.postings[term]
+                index = bisect.bisect_left(self.terms, term)
+                if index < len(self.terms) and self.terms[index] == term:
+                    del self.terms[index]
+    
+    def expand_prefix(self, prefix: str) -> List[str]:
+        """الكلمات المفهرسة التي تبدأ بالبادئة (يُستدعى والقفل محجوز)"""
+        if len(prefix) < self.MIN_PREFIX_LENGTH:
+            return [prefix] if prefix in self.postings else []
+        
+        start = bisect.bisect_left(self.terms, prefix)
+        expansions = []
+        for term in self.terms[start:start + self.MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            expansions.append(term)
+        return expansions
+    
+    def term_score(self, weights: Dict[str, float], term: str, expansions: Iterable[str]) -> float:
+        """درجة تطابق كلمة الاستعلام مع مستند"""
+        if term in weights:
+            return weights[term]
+        
+        return max(
+            (weights[expansion] * self.PREFIX_WEIGHT for expansion in expansions if expansion in weights),
+            default=0.0
+        )
+    
+    def search(self, query: str, limit: int = 50, offset: int = 0) -> Tuple[int, List[str]]:
+        """
+        البحث عن الخلاصات المطابقة لكل كلمات الاستعلام
+        
+        Args:
+            query: نص البحث
+            limit: الحد الأقصى لعدد النتائج
+            offset: عدد النتائج المتخطاة
+        
+        Returns:
+            العدد الكلي للنتائج ومعرفات الصفحة المطلوبة مرتبة حسب الصلة
+        """
+        terms = query_terms(query)
+        if not terms:
+            return 0, []
+        
+        with self.lock:
+            # البادئة تُطبق على الكلمة الأخيرة فقط لأنها قد تكون غير مكتملة أثناء الكتابة
+            expansions = {term: () for term in terms}
+            expansions[terms[-1]] = self.expand_prefix(terms[-1])
+            
+            def candidates(term):
+                ids = set(self.postings.get(term, ()))
+                for expansion in expansions[term]:
+                    ids.update(self.postings[expansion])
+                return ids
+            
+            sizes = {
+                term: len(self.postings.get(term, ())) +
+                sum(len(self.postings[expansion]) for expansion in expansions[term])
+                for term in terms
+            }
+            rarest = min(terms, key=sizes.get)
+            
+            scored = []
+            for feed_id in candidates(rarest):
+                weights = self.documents[feed_id]
+                score = 0.0
+                for term in terms:
+                    term_score = self.term_score(weights, term, expansions[term])
+                    if not term_score:
+                        break
+                    score += term_score
+                else:
+                    scored.append((score, feed_id))
+        
+        top = heapq.nsmallest(offset + limit, scored, key=lambda entry: (-entry[0], entry[1]))
+        return len(scored), [feed_id for _, feed_id in top[offset:]]
+    
+    def get_stats(self) -> Dict:
+        """الحصول على إحصائيات الفهرس"""
+        with self.lock:
+            return {
+                'documents': len(self.documents),
+                'terms': len(self.terms)
+            }
@@ -0,0 +1,123 @@
+"""
+توحيد روابط المصادر وإنشاء معرفات ثابتة للخلاصات منها
+"""
+
+import re
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# النطاقات البديلة لنفس المنصة
+HOST_ALIASES = {
+    'twitter.com': 'x.com',
+    'fb.com': 'facebook.com',
+    'fb.me': 'facebook.com',
+    'instagr.am': 'instagram.com',
+}
+
+# البادئات التي لا تغير الصفحة المطلوبة (نسخ الجوال والويب)
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'web.', 'touch.', 'mbasic.')
+
+# منصات التواصل: معاملات الاستعلام فيها للتتبع فقط عدا المعاملات المحددة
+SOCIAL_HOSTS = {
+    'x.com': frozenset(),
+    'facebook.com': frozenset({'id', 'sk'}),
+    'instagram.com': frozenset(),
+    'tiktok.com': frozenset(),
+    'linkedin.com': frozenset(),
+    'youtube.com': frozenset({'v', 'list'}),
+}
+
+# المقطع الأول من المسار في منصات التواصل اسم مستخدم (@handle) أو كلمة مسار
+# ثابتة، وكلاهما لا يتأثر بحالة الأحرف. بعد كلمات المسار المحددة يأتي مقطع
+# ثانٍ هو أيضاً اسم لا يتأثر بحالة الأحرف. باقي المقاطع (مثل معرفات قنوات
+# YouTube ورموز منشورات Instagram) تبقى كما هي لأن حالة أحرفها جزء منها.
+HANDLE_ROUTES = {
+    'x.com': frozenset(),
+    'facebook.com': frozenset({'groups'}),
+    'instagram.com': frozenset({'stories'}),
+    'tiktok.com': frozenset(),
+    'linkedin.com': frozenset({'in', 'company', 'school', 'showcase'}),
+    'youtube.com': frozenset({'c', 'user'}),
+}
+
+# معاملات تتبع تُحذف من روابط المواقع الأخرى
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'igshid', 'igsh', 'mibextid', 'ref', 'ref_src', 'ref_url', 'si', '__tn__',
+})
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# طول المعرف بالأحرف الست عشرية (64 بت)
+FEED_ID_LENGTH = 16
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    توحيد رابط المصدر بحيث تعطي الأشكال المختلفة لنفس الصفحة نفس الرابط
+    
+    يوحد البروتوكول إلى https، ويحذف بادئات www والجوال، ويستبدل النطاقات
+    البديلة (twitter.com ← x.com)، ويحذف المنفذ الافتراضي والشرطة المائلة
+    الأخيرة والجزء (#) ومعاملات التتبع، ويرتب باقي معاملات الاستعلام.
+    """
+    url = url.strip()
+    if '://' not in url:
+        url = f"https://{url}"
+    
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme == 'http':
+        scheme = 'https'
+    
+    host = (parts.hostname or '').rstrip('.')
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    host = HOST_ALIASES.get(host, host)
+    
+    netloc = host
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        netloc = f"{host}:{port}"
+    
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/')
+    
+    params = parse_qsl(parts.query, keep_blank_values=False)
+    if host in SOCIAL_HOSTS:
+        path = lowercase_handles(host, path)
+        allowed = SOCIAL_HOSTS[host]
+        params = [(key, value) for key, value in params if key in allowed]
+    else:
+        params = [
+            (key, value) for key, value in params
+            if key not in TRACKING_PARAMS and not key.startswith('utm_')
+        ]
+    
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(params)), ''))
+
+
+def lowercase_handles(host: str, path: str) -> str:
+    """تحويل مقاطع المسار التي لا تتأثر بحالة الأحرف إلى أحرف صغيرة فقط"""
+    segments = path.split('/')
+    
+    # المسار يبدأ بـ / فالمقطع الأول بعد الفارغ
+    if len(segments) > 1:
+        segments[1] = segments[1].lower()
+        if len(segments) > 2 and segments[1] in HANDLE_ROUTES.get(host, ()):
+            segments[2] = segments[2].lower()
+    
+    return '/'.join(segments)
+
+
+def feed_id_from_url(url: str) -> str:
+    """
+    معرف ثابت للخلاصة من الرابط الموحد
+    
+    المعرف مشتق من SHA-256 فلا يتغير بين العمليات أو بعد إعادة التشغيل
+    """
+    digest = hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
+    return digest[:FEED_ID_LENGTH]
@@ -0,0 +1,328 @@
+"""
+موزع WebSub مدمج يرسل محتوى الخلاصات للمشتركين فور تغيره بدلاً من فحصها دورياً
+"""
+
+import hmac
+import time
+import heapq
+import atexit
+import socket
+import secrets
+import sqlite3
+import hashlib
+import ipaddress
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+
+class WebSubHub:
+    """
+    موزع WebSub (W3C) للخلاصات المنشورة من هذا الخادم
+    
+    الاشتراكات محفوظة في قاعدة SQLite في مجلد الخلاصات فتشترك فيها كل
+    العمليات. طلب الاشتراك أو إلغائه يُرد عليه فوراً بـ 202 ويُتحقق من نية
+    المشترك في الخلفية بطلب GET يحمل hub.challenge. لكل اشتراك مدة
+    (lease) ينتهي بعدها ما لم يجدده المشترك.
+    
+    عند تغير خلاصة يُرسل محتواها كاملاً لكل مشتركيها على مجموعة عمال
+    محدودة، مع توقيع HMAC إذا حدد المشترك سراً. الإرسال الفاشل يُعاد بتأخير
+    يتضاعف حتى عدد محاولات محدد، والمشترك الذي يرد بـ 410 يُحذف اشتراكه.
+    
+    روابط المشتركين يحددها أي عميل، لذا تُرفض الروابط التي تشير إلى عناوين
+    خاصة أو محلية (مثل 127.0.0.1 أو 10.0.0.0/8 أو 169.254.169.254) ما لم
+    يُسمح بها صراحة، ويُعاد الفحص قبل كل طلب ولا تُتبع التحويلات.
+    """
+    
+    def __init__(self, db_path: str, hub_url: str, workers: int = 4,
+                 default_lease: int = 10 * 24 * 3600, min_lease: int = 3600,
+                 max_lease: int = 30 * 24 * 3600, max_attempts: int = 5,
+                 retry_delay: float = 30.0, timeout: float = 10.0,
+                 max_pending_verifications: int = 100, allow_private_callbacks: bool = False):
+        """
+        تهيئة الموزع
+        
+        Args:
+            db_path: مسار قاعدة الاشتراكات
+            hub_url: الرابط العام لنقطة الموزع
+            workers: عدد عمال التحقق والإرسال
+            default_lease: مدة الاشتراك بالثواني إذا لم يحددها المشترك
+            min_lease: أقل مدة اشتراك بالثواني
+            max_lease: أكبر مدة اشتراك بالثواني
+            max_attempts: أقصى عدد محاولات إرسال لكل تحديث
+            retry_delay: التأخير بالثواني قبل المحاولة الثانية (ويتضاعف بعدها)
+            timeout: مهلة طلبات HTTP بالثواني
+            max_pending_verifications: أقصى عدد طلبات اشتراك تنتظر التحقق
+            allow_private_callbacks: السماح بروابط مشتركين على عناوين خاصة أو محلية
+        """
+        self.hub_url = hub_url
+        self.workers = workers
+        self.default_lease = default_lease
+        self.min_lease = min_lease
+        self.max_lease = max_lease
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.max_pending_verifications = max_pending_verifications
+        self.allow_private_callbacks = allow_private_callbacks
+        self.pending_verifications = 0
+        
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA busy_timeout=5000')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                topic TEXT NOT NULL,
+                callback TEXT NOT NULL,
+                secret TEXT,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (topic, callback)
+            )
+        """)
+        
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='websub')
+        
+        # المحاولات المؤجلة: كومة (وقت الاستحقاق، تسلسل، الإرسال)
+        self.retries: List[tuple] = []
+        self.sequence = 0
+        self.condition = threading.Condition()
+        self.retry_thread = None
+        self.stop_event = threading.Event()
+        
+        self.stats = {
+            'verified': 0,
+            'verification_failures': 0,
+            'rejected_verifications': 0,
+            'published': 0,
+            'delivered': 0,
+            'retried': 0,
+            'dropped': 0
+        }
+        atexit.register(self.close)
+    
+    def request_subscription(self, mode: str, topic: str, callback: str,
+                             lease_seconds: Optional[int] = None, secret: Optional[str] = None):
+        """
+        قبول طلب اشتراك أو إلغاء اشتراك والتحقق منه في الخلفية
+        
+        Returns:
+            False إذا امتلأت قائمة انتظار التحقق
+        
+        Raises:
+            ValueError: إذا كان الطلب غير صالح
+        """
+        if mode not in ('subscribe', 'unsubscribe'):
+            raise ValueError('قيمة hub.mode غير صالحة')
+        
+        parsed = urlparse(callback or '')
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise ValueError('قيمة hub.callback غير صالحة')
+        if not self.is_allowed_callback(callback):
+            raise ValueError('قيمة hub.callback تشير إلى عنوان غير مسموح')
+        
+        secret = secret or None
+        if secret is not None and len(secret.encode('utf-8')) >= 200:
+            raise ValueError('يجب أن يكون hub.secret أقل من 200 بايت')
+        
+        lease = self.default_lease if lease_seconds is None else lease_seconds
+        lease = min(self.max_lease, max(self.min_lease, lease))
+        
+        with self.lock:
+            if self.pending_verifications >= self.max_pending_verifications:
+                self.stats['rejected_verifications'] += 1
+                return False
+            self.pending_verifications += 1
+        
+        self.executor.submit(self.run_verification, mode, topic, callback, lease, secret)
+        return True
+    
+    def is_allowed_callback(self, callback: str) -> bool:
+        """هل يشير رابط المشترك إلى عناوين عامة فقط (أو السماح بالعناوين الخاصة مفعل)"""
+        if self.allow_private_callbacks:
+            return True
+        
+        parsed = urlparse(callback)
+        try:
+            port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+            addresses = socket.getaddrinfo(parsed.hostname, port, proto=socket.IPPROTO_TCP)
+        except (ValueError, OSError):
+            return False
+        
+        # كل العناوين التي يحلها الاسم يجب أن تكون عامة، وإلا أمكن الوصول للشبكة الداخلية
+        for _, _, _, _, sockaddr in addresses:
+            address = ipaddress.ip_address(sockaddr[0].split('%', 1)[0])
+            if address.version == 6 and address.ipv4_mapped:
+                address = address.ipv4_mapped
+            if not address.is_global:
+                return False
+        return True
+    
+    def run_verification(self, mode: str, topic: str, callback: str, lease: int, secret: Optional[str]):
+        """تنفيذ التحقق في أحد العمال مع تحرير مكانه في قائمة الانتظار"""
+        try:
+            self.verify(mode, topic, callback, lease, secret)
+        finally:
+            with self.lock:
+                self.pending_verifications -= 1
+    
+    def verify(self, mode: str, topic: str, callback: str, lease: int, secret: Optional[str]) -> bool:
+        """التحقق من نية المشترك ثم حفظ الاشتراك أو حذفه (يُنفذ في أحد العمال)"""
+        challenge = secrets.token_urlsafe(24)
+        params = {'hub.mode': mode, 'hub.topic': topic, 'hub.challenge': challenge}
+        if mode == 'subscribe':
+            params['hub.lease_seconds'] = lease
+        
+        try:
+            # قد يتغير ما يحله الاسم بعد قبول الطلب، فيُعاد الفحص قبل الاتصال
+            if not self.is_allowed_callback(callback):
+                raise requests.RequestException('عنوان غير مسموح')
+            response = self.session.get(callback, params=params, timeout=self.timeout, allow_redirects=False)
+            confirmed = response.ok and response.text.strip() == challenge
+        except requests.RequestException as e:
+            print(f"خطأ في التحقق من اشتراك {callback}: {e}")
+            confirmed = False
+        
+        with self.lock:
+            if not confirmed:
+                self.stats['verification_failures'] += 1
+                return False
+            
+            if mode == 'subscribe':
+                self.conn.execute(
+                    'INSERT INTO subscriptions (topic, callback, secret, expires_at) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (topic, callback) DO UPDATE SET secret = excluded.secret, expires_at = excluded.expires_at',
+                    (topic, callback, secret, time.time() + lease)
+                )
+            else:
+                self.conn.execute('DELETE FROM subscriptions WHERE topic = ? AND callback = ?', (topic, callback))
+            
+            self.stats['verified'] += 1
+        return True
+    
+    def publish(self, topic: str, content: bytes, content_type: str = 'application/rss+xml; charset=utf-8') -> int:
+        """
+        إرسال محتوى خلاصة متغيرة لكل مشتركيها في الخلفية
+        
+        Returns:
+            عدد المشتركين
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute('DELETE FROM subscriptions WHERE expires_at <= ?', (now,))
+            subscribers = self.conn.execute(
+                'SELECT callback, secret FROM subscriptions WHERE topic = ?', (topic,)
+            ).fetchall()
+            self.stats['published'] += 1
+        
+        for callback, secret in subscribers:
+            delivery = {
+                'topic': topic,
+                'callback': callback,
+                'secret': secret,
+                'content': content,
+                'content_type': content_type,
+                'attempt': 1
+            }
+            self.executor.submit(self.deliver, delivery)
+        
+        return len(subscribers)
+    
+    def deliver(self, delivery: Dict):
+        """إرسال المحتوى لمشترك واحد (يُنفذ في أحد العمال)"""
+        headers = {
+            'Content-Type': delivery['content_type'],
+            'Link': f'<{self.hub_url}>; rel="hub", <{delivery["topic"]}>; rel="self"'
+        }
+        if delivery['secret']:
+            signature = hmac.new(delivery['secret'].encode('utf-8'), delivery['content'], hashlib.sha256).hexdigest()
+            headers['X-Hub-Signature'] = f'sha256={signature}'
+        
+        try:
+            if not self.is_allowed_callback(delivery['callback']):
+                raise requests.RequestException('عنوان غير مسموح')
+            response = self.session.post(delivery['callback'], data=delivery['content'],
+                                         headers=headers, timeout=self.timeout, allow_redirects=False)
+            status = response.status_code
+        except requests.RequestException as e:
+            print(f"خطأ في إرسال تحديث {delivery['topic']} إلى {delivery['callback']}: {e}")
+            status = None
+        
+        if status is not None and 200 <= status < 300:
+            with self.lock:
+                self.stats['delivered'] += 1
+            return
+        
+        # المشترك الذي يرد بـ 410 لم يعد يريد الاشتراك
+        if status == 410:
+            with self.lock:
+                self.conn.execute('DELETE FROM subscriptions WHERE topic = ? AND callback = ?',
+                                  (delivery['topic'], delivery['callback']))
+                self.stats['dropped'] += 1
+            return
+        
+        self.schedule_retry(delivery)
+    
+    def schedule_retry(self, delivery: Dict):
+        """تأجيل إعادة الإرسال بتأخير يتضاعف مع كل محاولة"""
+        if delivery['attempt'] >= self.max_attempts:
+            with self.lock:
+                self.stats['dropped'] += 1
+            return
+        
+        due = time.time() + self.retry_delay * 2 ** (delivery['attempt'] - 1)
+        delivery = dict(delivery, attempt=delivery['attempt'] + 1)
+        
+        with self.condition:
+            self.sequence += 1
+            heapq.heappush(self.retries, (due, self.sequence, delivery))
+            if not self.retry_thread:
+                self.retry_thread = threading.Thread(target=self.run_retries, daemon=True)
+                self.retry_thread.start()
+            self.condition.notify()
+        
+        with self.lock:
+            self.stats['retried'] += 1
+    
+    def run_retries(self):
+        """إرسال المحاولات المؤجلة عند استحقاقها"""
+        with self.condition:
+            while not self.stop_event.is_set():
+                if not self.retries:
+                    self.condition.wait()
+                    continue
+                
+                due = self.retries[0][0]
+                now = time.time()
+                if due > now:
+                    self.condition.wait(due - now)
+                    continue
+                
+                _, _, delivery = heapq.heappop(self.retries)
+                self.executor.submit(self.deliver, delivery)
+    
+    def close(self):
+        """إيقاف المحاولات المؤجلة وانتظار الإرسال الجاري"""
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        self.executor.shutdown(wait=True)
+    
+    def get_stats(self) -> Dict:
+        """الحصول على إحصائيات الموزع"""
+        with self.lock:
+            subscriptions = self.conn.execute(
+                'SELECT COUNT(*) FROM subscriptions WHERE expires_at > ?', (time.time(),)
+            ).fetchone()[0]
+            stats = dict(self.stats, subscriptions=subscriptions)
+        
+        with self.condition:
+            stats['pending_retries'] = len(self.retries)
+        stats['pending_verifications'] = self.pending_verifications
+        
+        return stats
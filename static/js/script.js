@@ -13,6 +13,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeApp();
     loadExistingFeeds();
     setupEventListeners();
+    subscribeToEvents();
 });
 
 // Initialize application
@@ -59,6 +60,12 @@ function setupEventListeners() {
     // RSS form submission
     rssForm.addEventListener('submit', handleFormSubmission);
     
+    // OPML import
+    const opmlInput = document.getElementById('opml-file');
+    if (opmlInput) {
+        opmlInput.addEventListener('change', importOPML);
+    }
+    
     // Mobile navigation toggle
     const navToggle = document.querySelector('.nav-toggle');
     const navMenu = document.querySelector('.nav-menu');
@@ -95,8 +102,12 @@ async function handleFormSubmission(e) {
         } else {
             currentFeedData = feedData;
             showResults(feedData);
-            loadExistingFeeds(); // Refresh feeds list
-            showNotification('تم إنشاء خلاصة RSS بنجاح!', 'success');
+            refreshFeedsIfDisconnected();
+            if (feedData.existing) {
+                showNotification('توجد خلاصة لهذا المصدر بالفعل', 'info');
+            } else {
+                showNotification('تم إنشاء خلاصة RSS بنجاح!', 'success');
+            }
         }
     } catch (error) {
         hideLoadingModal();
@@ -105,9 +116,9 @@ async function handleFormSubmission(e) {
     }
 }
 
-// Create RSS feed via API
+// Create RSS feed via API as a background job
 async function createRSSFeed(url) {
-    const response = await fetch('/api/create-feed', {
+    const response = await fetch('/api/create-feed?async=1', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
@@ -122,22 +133,192 @@ async function createRSSFeed(url) {
         throw new Error(`HTTP error! status: ${response.status}`);
     }
     
-    return await response.json();
+    const data = await response.json();
+    
+    // Existing feeds are returned directly, new ones as a job to poll
+    return response.status === 202 ? await waitForJob(data.status_url) : data;
+}
+
+// Wait for a background job to finish and return its result.
+// Job events resolve it immediately; polling is the fallback (less frequent while events are connected).
+const JOB_POLL_INTERVAL = 1000;
+const JOB_POLL_INTERVAL_WITH_EVENTS = 5000;
+const jobWaiters = new Map();
+
+async function waitForJob(statusUrl) {
+    const jobId = statusUrl.split('/').pop();
+    const finished = new Promise(resolve => jobWaiters.set(jobId, resolve));
+    
+    try {
+        while (true) {
+            const interval = eventsConnected() ? JOB_POLL_INTERVAL_WITH_EVENTS : JOB_POLL_INTERVAL;
+            const job = await Promise.race([
+                finished,
+                new Promise(resolve => setTimeout(resolve, interval))
+            ]);
+            
+            if (job) {
+                return job.result;
+            }
+            
+            const response = await fetch(statusUrl);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            
+            const polled = await response.json();
+            if (polled.status === 'succeeded' || polled.status === 'failed') {
+                return polled.result;
+            }
+        }
+    } finally {
+        jobWaiters.delete(jobId);
+    }
+}
+
+// Live updates from the server (Server-Sent Events)
+let eventSource = null;
+
+function eventsConnected() {
+    return eventSource !== null && eventSource.readyState === EventSource.OPEN;
+}
+
+// Only subscribe when the server streams events (it needs async workers);
+// otherwise the feed list reloads after changes and jobs are polled
+function subscribeToEvents() {
+    if (!window.EventSource || document.body.dataset.events !== 'on') {
+        return;
+    }
+    
+    eventSource = new EventSource('/api/events');
+    
+    eventSource.addEventListener('feed.created', e => {
+        const feed = JSON.parse(e.data);
+        if (!loadedFeeds.some(existing => existing.id === feed.id)) {
+            loadedFeeds.unshift(feed);
+            displayFeeds(loadedFeeds);
+        }
+    });
+    
+    eventSource.addEventListener('feed.updated', e => {
+        const feed = JSON.parse(e.data);
+        const index = loadedFeeds.findIndex(existing => existing.id === feed.id);
+        if (index !== -1) {
+            loadedFeeds[index] = Object.assign({}, loadedFeeds[index], feed);
+            displayFeeds(loadedFeeds);
+        }
+    });
+    
+    eventSource.addEventListener('feed.deleted', e => {
+        const { id } = JSON.parse(e.data);
+        const remaining = loadedFeeds.filter(feed => feed.id !== id);
+        if (remaining.length !== loadedFeeds.length) {
+            loadedFeeds = remaining;
+            displayFeeds(loadedFeeds);
+        }
+    });
+    
+    eventSource.addEventListener('job', e => {
+        const job = JSON.parse(e.data);
+        const resolve = jobWaiters.get(job.id);
+        if (resolve && (job.status === 'succeeded' || job.status === 'failed')) {
+            resolve(job);
+        }
+    });
+    
+    // Events were missed while disconnected: reload the list once
+    eventSource.addEventListener('reset', () => loadExistingFeeds());
+}
+
+// Reload the feeds list only when live events are not keeping it current
+function refreshFeedsIfDisconnected() {
+    if (!eventsConnected()) {
+        loadExistingFeeds();
+    }
 }
 
 // Load existing feeds
-async function loadExistingFeeds() {
+const FEEDS_PAGE_SIZE = 50;
+const FEED_LIST_FIELDS = 'title,description,platform,post_count,last_updated,status,rss_url';
+let loadedFeeds = [];
+let nextFeedsCursor = null;
+
+async function loadExistingFeeds(loadMore = false) {
     try {
-        const response = await fetch('/api/feeds');
+        const params = new URLSearchParams({ limit: FEEDS_PAGE_SIZE, fields: FEED_LIST_FIELDS });
+        if (loadMore && nextFeedsCursor) {
+            params.set('cursor', nextFeedsCursor);
+        }
+        
+        const response = await fetch(`/api/feeds?${params}`);
         if (response.ok) {
-            const feeds = await response.json();
-            displayFeeds(feeds);
+            const page = await response.json();
+            loadedFeeds = loadMore ? loadedFeeds.concat(page.feeds) : page.feeds;
+            nextFeedsCursor = page.next_cursor;
+            displayFeeds(loadedFeeds);
         }
     } catch (error) {
         console.error('Error loading feeds:', error);
     }
 }
 
+// Import feeds from an OPML file, reading the NDJSON progress stream
+async function importOPML(e) {
+    const file = e.target.files[0];
+    e.target.value = '';
+    if (!file) {
+        return;
+    }
+    
+    const formData = new FormData();
+    formData.append('file', file);
+    showNotification('جاري استيراد الخلاصات...', 'info');
+    
+    try {
+        const response = await fetch('/api/opml/import', { method: 'POST', body: formData });
+        if (!response.ok) {
+            const result = await response.json();
+            showNotification(result.error || 'فشل في استيراد الملف', 'error');
+            return;
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let done = 0;
+        let summary = null;
+        
+        while (true) {
+            const chunk = await reader.read();
+            if (chunk.done) {
+                break;
+            }
+            
+            buffer += decoder.decode(chunk.value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            
+            for (const line of lines.filter(Boolean)) {
+                const result = JSON.parse(line);
+                if (result.summary) {
+                    summary = result.summary;
+                } else {
+                    done++;
+                    showNotification(`جاري استيراد الخلاصات... (${done})`, 'info');
+                }
+            }
+        }
+        
+        if (summary) {
+            showNotification(`تم الاستيراد: ${summary.created} جديدة، ${summary.existing} موجودة مسبقاً، ${summary.error} أخطاء`, 'success');
+        }
+        refreshFeedsIfDisconnected();
+    } catch (error) {
+        console.error('Error importing OPML:', error);
+        showNotification('حدث خطأ أثناء استيراد الملف', 'error');
+    }
+}
+
 // Display feeds in the grid
 function displayFeeds(feeds) {
     if (!feeds || feeds.length === 0) {
@@ -178,7 +359,13 @@ function displayFeeds(feeds) {
                 </button>
             </div>
         </div>
-    `).join('');
+    `).join('') + (nextFeedsCursor ? `
+        <div class="load-more">
+            <button class="btn-secondary" onclick="loadExistingFeeds(true)">
+                <i class="fas fa-chevron-down"></i> عرض المزيد
+            </button>
+        </div>
+    ` : '');
 }
 
 // Show results section
@@ -268,7 +455,7 @@ async function deleteFeed(feedId) {
         
         if (response.ok) {
             showNotification('تم حذف الخلاصة بنجاح', 'success');
-            loadExistingFeeds(); // Refresh feeds list
+            refreshFeedsIfDisconnected();
         } else {
             showNotification('فشل في حذف الخلاصة', 'error');
         }
@@ -0,0 +1,55 @@
+"""
+إعداد مشترك للاختبارات: مجلد خلاصات مؤقت وبيانات استخراج نموذجية
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# التطبيق يُهيأ عند استيراده، فتُضبط البيئة قبل أي استيراد له
+os.environ.setdefault('FEEDS_DIR', tempfile.mkdtemp(prefix='rss-tests-'))
+os.environ.setdefault('SCHEDULER_WORKERS', '0')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sample_scraped(url: str = 'https://www.instagram.com/meta/', count: int = 3,
+                   platform: str = 'Instagram', offset: int = 0) -> dict:
+    """بيانات استخراج نموذجية بنفس شكل نتائج MultiPlatformScraper"""
+    username = url.rstrip('/').rsplit('/', 1)[-1]
+    posts = [
+        {
+            'text': f'منشور {i + offset} من {username}',
+            'post_url': f'{url.rstrip("/")}/p/{i + offset}',
+            'time': f'2025-07-{10 + i + offset:02d}T10:00:00Z',
+            'likes_count': 5,
+            'images': [],
+            'platform': platform,
+            'username': username
+        }
+        for i in range(count)
+    ]
+    return {'platform': platform, 'username': username, 'url': url, 'posts': posts}
+
+
+@pytest.fixture
+def feed_manager(tmp_path):
+    """مدير خلاصات في مجلد مؤقت"""
+    from rss_generator.feed_manager import FeedManager
+    return FeedManager(str(tmp_path))
+
+
+@pytest.fixture
+def app_module(feed_manager, monkeypatch):
+    """وحدة التطبيق بمدير خلاصات مؤقت خاص بالاختبار"""
+    import app
+    monkeypatch.setattr(app, 'feed_manager', feed_manager)
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    """عميل اختبار Flask"""
+    return app_module.app.test_client()
@@ -0,0 +1,37 @@
+"""
+اختبارات إنشاء الخلاصات المجمّعة
+"""
+
+import pytest
+
+from conftest import sample_scraped
+
+
+@pytest.fixture
+def member_ids(feed_manager):
+    return [
+        feed_manager.create_feed(url, sample_scraped(url))['id']
+        for url in ('https://www.instagram.com/first/', 'https://www.instagram.com/second/')
+    ]
+
+
+@pytest.mark.parametrize('max_items', ['abc', '20', 0, -1, 501, True, None])
+def test_invalid_max_items_is_rejected(client, feed_manager, member_ids, max_items):
+    response = client.post('/api/aggregates', json={'feed_ids': member_ids, 'max_items': max_items})
+    
+    assert response.status_code == 400
+    assert 'max_items' in response.get_json()['error']
+    assert not [feed_id for feed_id in feed_manager.metadata if feed_id.startswith('agg')]
+
+
+def test_rejected_request_does_not_block_valid_one(client, member_ids):
+    client.post('/api/aggregates', json={'feed_ids': member_ids, 'max_items': 0})
+    
+    response = client.post('/api/aggregates', json={'feed_ids': member_ids, 'max_items': 4})
+    
+    assert response.status_code == 200
+    assert response.get_json()['post_count'] == 4
+
+
+def test_feed_manager_rejects_empty_aggregates(feed_manager, member_ids):
+    assert 'error' in feed_manager.create_aggregate_feed(member_ids, max_items=0)
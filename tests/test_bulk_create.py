@@ -0,0 +1,84 @@
+"""
+اختبارات حدود الاستخراج المشتركة بين طلبات الإنشاء الجماعي المتزامنة
+"""
+
+import time
+import threading
+
+from conftest import sample_scraped
+from rss_generator.bulk_create import BulkFeedCreator
+
+WORKERS = 3
+PER_HOST = 2
+
+
+class CountingScraper:
+    """دالة استخراج تسجل أكبر عدد استخراجات متزامنة كلياً ولكل مضيف"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.active_hosts = {}
+        self.max_active = 0
+        self.max_per_host = 0
+    
+    def __call__(self, url, max_posts):
+        host = url.split('/')[2]
+        with self.lock:
+            self.active += 1
+            self.active_hosts[host] = self.active_hosts.get(host, 0) + 1
+            self.max_active = max(self.max_active, self.active)
+            self.max_per_host = max(self.max_per_host, self.active_hosts[host])
+        
+        time.sleep(0.02)
+        
+        with self.lock:
+            self.active -= 1
+            self.active_hosts[host] -= 1
+        return sample_scraped(url, count=1)
+
+
+def test_overlapping_runs_share_limits(feed_manager):
+    scraper = CountingScraper()
+    creator = BulkFeedCreator(feed_manager, scraper, workers=WORKERS, per_host=PER_HOST)
+    
+    hosts = ['www.instagram.com', 'x.com']
+    requests = [
+        [f'https://{host}/user{run}_{number}' for host in hosts for number in range(6)]
+        for run in range(3)
+    ]
+    results = [None] * len(requests)
+    
+    def run(index):
+        results[index] = list(creator.run(requests[index]))
+    
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    
+    assert scraper.max_active <= WORKERS
+    assert scraper.max_per_host <= PER_HOST
+    for items, result in zip(requests, results):
+        assert result[-1]['summary']['created'] == len(items)
+    assert creator.active == 0 and creator.active_hosts == {}
+
+
+def test_stopped_run_does_not_wait_for_a_slot(feed_manager):
+    creator = BulkFeedCreator(feed_manager, CountingScraper(), workers=1, per_host=1)
+    busy, stopped = threading.Event(), threading.Event()
+    assert creator.acquire('x.com', busy)
+    
+    # الطلب المغلق لا يبدأ استخراجاً جديداً حتى بعد تحرير المكان
+    waiter = threading.Thread(target=lambda: results.append(creator.acquire('instagram.com', stopped)))
+    results = []
+    waiter.start()
+    with creator.condition:
+        stopped.set()
+        creator.condition.notify_all()
+    waiter.join(5)
+    
+    assert results == [False]
+    creator.release('x.com')
+    assert creator.active == 0 and creator.active_hosts == {}
@@ -0,0 +1,16 @@
+"""
+اختبارات بث الأحداث عند تعطيله (الإعداد الافتراضي مع عمال gunicorn المتزامنين)
+"""
+
+
+def test_event_stream_is_off_by_default(client):
+    response = client.get('/api/events')
+    
+    assert response.status_code == 404
+    assert 'events' not in client.get('/api/stats').get_json()
+
+
+def test_front_end_is_told_to_poll(client):
+    page = client.get('/').get_data(as_text=True)
+    
+    assert 'data-events="off"' in page
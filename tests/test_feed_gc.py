@@ -0,0 +1,66 @@
+"""
+اختبارات تنظيف الخلاصات القديمة
+"""
+
+from datetime import datetime, timedelta
+
+from conftest import sample_scraped
+
+
+def age_feed(feed_manager, feed_id: str, days: int):
+    """جعل آخر فحص للخلاصة قبل عدد من الأيام"""
+    checked = (datetime.now() - timedelta(days=days)).isoformat()
+    feed_manager.publish_feed(dict(feed_manager.metadata[feed_id], last_checked=checked, last_updated=checked))
+
+
+def test_deletes_sources_not_checked_within_max_age(feed_manager):
+    stale = feed_manager.create_feed('https://www.instagram.com/stale/', sample_scraped('https://www.instagram.com/stale/'))
+    fresh = feed_manager.create_feed('https://www.instagram.com/fresh/', sample_scraped('https://www.instagram.com/fresh/'))
+    age_feed(feed_manager, stale['id'], 40)
+    
+    assert feed_manager.cleanup_old_feeds(30) == 1
+    assert stale['id'] not in feed_manager.metadata
+    assert fresh['id'] in feed_manager.metadata
+
+
+def create_members(feed_manager, *names):
+    return [
+        feed_manager.create_feed(f'https://www.instagram.com/{name}/', sample_scraped(f'https://www.instagram.com/{name}/'))['id']
+        for name in names
+    ]
+
+
+def test_keeps_quiet_aggregates_with_members(feed_manager):
+    members = create_members(feed_manager, 'first', 'second')
+    aggregate = feed_manager.create_aggregate_feed(members, title='مجمّعة')
+    age_feed(feed_manager, aggregate['id'], 40)
+    
+    assert feed_manager.cleanup_old_feeds(30) == 0
+    assert aggregate['id'] in feed_manager.metadata
+
+
+def test_deletes_stale_empty_aggregates(feed_manager):
+    members = create_members(feed_manager, 'first', 'second')
+    aggregate = feed_manager.create_aggregate_feed(members, title='مجمّعة')
+    feed_manager.delete_feeds(members)
+    age_feed(feed_manager, aggregate['id'], 40)
+    
+    assert feed_manager.cleanup_old_feeds(30) == 1
+    assert aggregate['id'] not in feed_manager.metadata
+
+
+def test_pages_past_kept_aggregates(feed_manager):
+    first, second, third = create_members(feed_manager, 'first', 'second', 'third')
+    aggregates = [
+        feed_manager.create_aggregate_feed(pair, title='مجمّعة')
+        for pair in ([first, second], [first, third], [second, third])
+    ]
+    stale = create_members(feed_manager, 'old')[0]
+    
+    # الخلاصات المجمّعة الباقية أقدم فحصاً وتملأ الدفعة الأولى
+    for number, aggregate in enumerate(aggregates):
+        age_feed(feed_manager, aggregate['id'], 60 + number)
+    age_feed(feed_manager, stale, 40)
+    
+    assert feed_manager.cleanup_old_feeds(30, batch_size=2) == 1
+    assert stale not in feed_manager.metadata
@@ -0,0 +1,69 @@
+"""
+اختبارات فهارس عرض الخلاصات على صفحات
+"""
+
+from rss_generator.feed_index import FeedListIndex
+
+
+def make_feed(number: int, platform: str = 'Instagram', status: str = 'active') -> dict:
+    return {
+        'id': f'feed{number:05d}',
+        'platform': platform,
+        'status': status,
+        'created_at': f'2025-07-01T00:00:{number % 60:02d}.{number:06d}',
+        'last_updated': f'2025-07-02T00:00:00.{number:06d}',
+        'post_count': number % 7
+    }
+
+
+def all_ids(index: FeedListIndex, **filters) -> list:
+    ids = []
+    cursor = None
+    while True:
+        page = index.query(cursor=cursor, limit=7, **filters)
+        ids.extend(page['ids'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return ids
+
+
+def test_bulk_load_matches_incremental_adds():
+    feeds = [make_feed(n, 'Instagram' if n % 3 else 'YouTube', 'active' if n % 2 else 'error') for n in range(200)]
+    
+    bulk = FeedListIndex()
+    bulk.add_many(feeds)
+    
+    incremental = FeedListIndex()
+    for feed_info in feeds:
+        incremental.add(feed_info)
+    
+    assert bulk.lists == incremental.lists
+    assert bulk.entries == incremental.entries
+
+
+def test_pages_follow_sort_order_after_updates():
+    index = FeedListIndex()
+    index.add_many([make_feed(n) for n in range(100)])
+    
+    # تحديث تزايدي صغير يمر بالإدراج الثنائي
+    index.add(dict(make_feed(5), post_count=100))
+    index.remove('feed00006')
+    
+    ids = all_ids(index, sort='post_count')
+    assert ids[0] == 'feed00005'
+    assert 'feed00006' not in ids
+    assert len(ids) == 99
+    
+    ids = all_ids(index, sort='created_at', descending=False, platform='Instagram', status='active')
+    expected = sorted((make_feed(n)['created_at'], make_feed(n)['id']) for n in range(100) if n != 6)
+    assert ids == [feed_id for _, feed_id in expected]
+
+
+def test_large_update_rebuilds_lists():
+    index = FeedListIndex()
+    index.add_many([make_feed(n) for n in range(50)])
+    
+    index.add_many([make_feed(n, status='paused') for n in range(50)])
+    
+    assert index.query(status='active')['total'] == 0
+    assert index.query(status='paused')['total'] == 50
@@ -0,0 +1,197 @@
+"""
+اختبارات مجدول تحديث الخلاصات بوقت محقون
+
+الوقت ثابت ما لم يقدمه الاختبار، فالاستحقاق والتأخر محددان تماماً، ويعمل
+خيط التوزيع والعمال فعلياً.
+"""
+
+import random
+import threading
+from datetime import datetime
+
+import pytest
+
+from rss_generator.feed_scheduler import FeedScheduler
+
+NOW = datetime(2025, 7, 1, 12, 0, 0).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now: float = NOW):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def feed(feed_id: str, checked_ago: float, interval_minutes: float = 1, **fields) -> dict:
+    """خلاصة نشطة فُحصت قبل checked_ago ثانية"""
+    return dict({
+        'id': feed_id,
+        'status': 'active',
+        'update_interval': interval_minutes,
+        'last_checked': datetime.fromtimestamp(NOW - checked_ago).isoformat()
+    }, **fields)
+
+
+def wait_until(condition, timeout=5):
+    for _ in range(int(timeout / 0.005)):
+        if condition():
+            return
+        threading.Event().wait(0.005)
+    raise AssertionError('condition not reached')
+
+
+class RecordingRefresh:
+    """دالة تحديث تسجل ترتيب الاستدعاء وتنتظر إذن الاختبار"""
+    
+    def __init__(self, block: bool = False):
+        self.calls = []
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+    
+    def __call__(self, feed_id: str) -> bool:
+        with self.lock:
+            self.calls.append(feed_id)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.release.wait(5)
+        with self.lock:
+            self.active -= 1
+        return not feed_id.startswith('fail')
+
+
+@pytest.fixture
+def make_scheduler():
+    schedulers = []
+    
+    def make(refresh, **options):
+        options.setdefault('jitter', 0)
+        scheduler = FeedScheduler(refresh, clock=options.pop('clock', FakeClock()), **options)
+        schedulers.append(scheduler)
+        return scheduler
+    
+    yield make
+    for scheduler in schedulers:
+        if hasattr(scheduler.refresh, 'release'):
+            scheduler.refresh.release.set()
+        scheduler.close()
+
+
+def test_due_feeds_are_dispatched_in_due_order(make_scheduler):
+    refresh = RecordingRefresh()
+    scheduler = make_scheduler(refresh, workers=1)
+    
+    # الاستحقاق = آخر فحص + دقيقة: c ثم a ثم b، و later لم يستحق بعد
+    scheduler.on_changes({
+        'a': feed('a', 300),
+        'b': feed('b', 120),
+        'c': feed('c', 900),
+        'later': feed('later', 10),
+    }, [])
+    scheduler.start()
+    
+    wait_until(lambda: len(refresh.calls) == 3)
+    assert refresh.calls == ['c', 'a', 'b']
+    assert scheduler.get_stats()['dispatched'] == 3
+
+
+def test_inactive_and_aggregate_feeds_are_not_scheduled(make_scheduler):
+    scheduler = make_scheduler(RecordingRefresh())
+    
+    scheduler.on_changes({
+        'paused': feed('paused', 300, status='paused'),
+        'agg': feed('agg', 300, type='aggregate'),
+        'a': feed('a', 300),
+    }, [])
+    assert set(scheduler.due) == {'a'}
+    
+    scheduler.on_changes({'a': feed('a', 300, status='error')}, [])
+    assert scheduler.due == {}
+
+
+def test_rescheduled_and_deleted_feeds_skip_stale_heap_entries(make_scheduler):
+    refresh = RecordingRefresh()
+    scheduler = make_scheduler(refresh, workers=1)
+    
+    scheduler.on_changes({'a': feed('a', 300), 'b': feed('b', 200), 'c': feed('c', 100)}, [])
+    # فحص a للتو ينقل استحقاقه للمستقبل، وحذف b يلغي استحقاقه
+    scheduler.on_changes({'a': feed('a', 0)}, ['b'])
+    assert len(scheduler.heap) == 4
+    
+    scheduler.start()
+    wait_until(lambda: refresh.calls == ['c'])
+    assert scheduler.get_stats()['scheduled'] == 2  # a ثم c بعد إعادة جدولتها
+
+
+def test_unchanged_schedule_is_not_pushed_again(make_scheduler):
+    scheduler = make_scheduler(RecordingRefresh())
+    
+    scheduler.on_changes({'a': feed('a', 300)}, [])
+    scheduler.on_changes({'a': feed('a', 300, title='عنوان جديد')}, [])
+    
+    assert len(scheduler.heap) == 1
+
+
+def test_worker_pool_is_bounded_and_lag_is_reported(make_scheduler):
+    refresh = RecordingRefresh(block=True)
+    scheduler = make_scheduler(refresh, workers=2)
+    
+    scheduler.on_changes({
+        'a': feed('a', 90),   # متأخر 30 ثانية
+        'b': feed('b', 80),   # متأخر 20 ثانية
+        'c': feed('c', 70),   # متأخر 10 ثوان وينتظر عاملاً
+    }, [])
+    scheduler.start()
+    
+    wait_until(lambda: len(refresh.calls) == 2)
+    threading.Event().wait(0.05)
+    
+    stats = scheduler.get_stats()
+    assert refresh.calls == ['a', 'b']
+    assert stats['running'] == 2 and stats['scheduled'] == 1
+    assert stats['lag_seconds'] == 10.0
+    assert stats['last_lag_seconds'] == 20.0
+    assert stats['max_lag_seconds'] == 30.0
+    
+    refresh.release.set()
+    wait_until(lambda: len(refresh.calls) == 3)
+    assert refresh.max_active == 2
+
+
+def test_finished_refresh_is_rescheduled_one_interval_later(make_scheduler):
+    clock = FakeClock()
+    refresh = RecordingRefresh()
+    scheduler = make_scheduler(refresh, workers=1, clock=clock)
+    
+    scheduler.on_changes({'fail-a': feed('fail-a', 300, interval_minutes=5)}, [])
+    scheduler.start()
+    
+    wait_until(lambda: scheduler.get_stats()['failures'] == 1)
+    wait_until(lambda: 'fail-a' in scheduler.due)
+    assert scheduler.due['fail-a'] == NOW + 300
+    
+    # لا يُعاد التحديث قبل مرور الفترة
+    threading.Event().wait(0.05)
+    assert refresh.calls == ['fail-a']
+    
+    clock.now += 300
+    with scheduler.condition:
+        scheduler.condition.notify()
+    wait_until(lambda: refresh.calls == ['fail-a', 'fail-a'])
+
+
+def test_jitter_stays_within_bounds(make_scheduler, monkeypatch):
+    scheduler = make_scheduler(RecordingRefresh(), jitter=0.1)
+    
+    samples = [scheduler.jittered(600) for _ in range(1000)]
+    assert all(540 <= sample <= 660 for sample in samples)
+    assert len(set(samples)) > 1
+    
+    monkeypatch.setattr(random, 'uniform', lambda low, high: high)
+    scheduler.on_changes({'a': feed('a', 0, interval_minutes=10)}, [])
+    assert scheduler.due['a'] == NOW + 660
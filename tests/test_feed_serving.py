@@ -0,0 +1,158 @@
+"""
+اختبارات تقديم الخلاصات بمحددات التحقق واستجابات 304 وصفحات الأرشيف
+"""
+
+import pytest
+
+from conftest import sample_scraped
+
+
+def create_feed(feed_manager):
+    return feed_manager.create_feed('https://www.instagram.com/meta/', sample_scraped())
+
+
+def test_serves_feed_with_validators(client, feed_manager):
+    feed_info = create_feed(feed_manager)
+    
+    response = client.get(f"/feeds/{feed_info['id']}.xml")
+    
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{feed_info["content_hash"]}"'
+    assert 'Last-Modified' in response.headers
+    assert b'<rss' in response.data
+
+
+def test_strong_etag_returns_304(client, feed_manager):
+    feed_info = create_feed(feed_manager)
+    etag = client.get(f"/feeds/{feed_info['id']}.xml").headers['ETag']
+    
+    response = client.get(f"/feeds/{feed_info['id']}.xml", headers={'If-None-Match': etag})
+    
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_weak_etag_returns_304(client, feed_manager):
+    feed_info = create_feed(feed_manager)
+    etag = client.get(f"/feeds/{feed_info['id']}.xml", headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    
+    response = client.get(f"/feeds/{feed_info['id']}.xml",
+                          headers={'If-None-Match': f'W/{etag}', 'Accept-Encoding': 'gzip'})
+    
+    assert response.status_code == 304
+
+
+def test_stale_etag_returns_feed(client, feed_manager):
+    feed_info = create_feed(feed_manager)
+    
+    response = client.get(f"/feeds/{feed_info['id']}.xml", headers={'If-None-Match': '"stale"'})
+    
+    assert response.status_code == 200
+
+
+def test_if_modified_since_returns_304(client, feed_manager):
+    feed_info = create_feed(feed_manager)
+    last_modified = client.get(f"/feeds/{feed_info['id']}.xml").headers['Last-Modified']
+    
+    response = client.get(f"/feeds/{feed_info['id']}.xml", headers={'If-Modified-Since': last_modified})
+    
+    assert response.status_code == 304
+
+
+def test_missing_feed_returns_404(client):
+    assert client.get('/feeds/missing.xml').status_code == 404
+
+
+def test_conditional_request_on_cold_feed_skips_file(client, feed_manager, monkeypatch):
+    feed_info = create_feed(feed_manager)
+    etag = client.get(f"/feeds/{feed_info['id']}.xml", headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    feed_manager.feed_cache.clear()
+    
+    def fail_open(*args, **kwargs):
+        raise AssertionError('الطلب الشرطي قرأ ملف الخلاصة')
+    monkeypatch.setattr('builtins.open', fail_open)
+    
+    response = client.get(f"/feeds/{feed_info['id']}.xml",
+                          headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    
+    assert response.status_code == 304
+
+
+def test_cold_feed_body_is_cached_after_read(client, feed_manager):
+    feed_info = create_feed(feed_manager)
+    feed_manager.feed_cache.clear()
+    
+    first = client.get(f"/feeds/{feed_info['id']}.xml")
+    second = client.get(f"/feeds/{feed_info['id']}.xml")
+    
+    assert first.data == second.data
+    assert feed_manager.feed_cache.get_stats()['hits'] == 1
+
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+FEED_HISTORY = '{http://purl.org/syndication/history/1.0}'
+
+
+def channel_links(xml: bytes) -> dict:
+    from lxml import etree
+    channel = etree.fromstring(xml).find('channel')
+    links = {link.get('rel'): link.get('href') for link in channel.findall(f'{ATOM}link')}
+    links['fh:archive'] = channel.find(f'{FEED_HISTORY}archive') is not None
+    return links
+
+
+def read_bytes(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def archiving_manager(tmp_path, app_module, monkeypatch):
+    from rss_generator.feed_manager import FeedManager
+    manager = FeedManager(str(tmp_path / 'archived'), archive_window=5, archive_page_size=2)
+    monkeypatch.setattr(app_module, 'feed_manager', manager)
+    return manager
+
+
+def test_archive_pages_roll_into_linked_immutable_chain(client, archiving_manager):
+    url = 'https://www.instagram.com/meta/'
+    feed_info = archiving_manager.create_feed(url, sample_scraped(url, count=3))
+    feed_id = feed_info['id']
+    
+    written = {}
+    for update in range(1, 6):
+        feed_info = archiving_manager.update_feed(feed_id, sample_scraped(url, count=3, offset=update * 3))
+        pages = feed_info['archive_pages']
+        
+        # الصفحات المكتوبة سابقاً لا تتغير بعد كتابتها
+        for page, content in written.items():
+            assert read_bytes(archiving_manager.get_archive_path(feed_id, page)) == content
+        for page in range(1, pages + 1):
+            written.setdefault(page, read_bytes(archiving_manager.get_archive_path(feed_id, page)))
+    
+    assert pages >= 3
+    
+    current = client.get(f'/feeds/{feed_id}.xml')
+    current_links = channel_links(current.data)
+    assert current_links['prev-archive'] == archiving_manager.get_archive_url(feed_id, pages)
+    assert not current_links['fh:archive']
+    assert current.data.count(b'<item>') <= archiving_manager.archive_window
+    
+    for page in range(1, pages + 1):
+        response = client.get(f'/feeds/{feed_id}/archive/{page}.xml')
+        assert response.status_code == 200
+        assert response.data == written[page]
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == 365 * 24 * 3600
+        
+        links = channel_links(response.data)
+        assert links['fh:archive']
+        assert links['self'] == archiving_manager.get_archive_url(feed_id, page)
+        assert links['current'].endswith(f'/feeds/{feed_id}.xml')
+        if page > 1:
+            assert links['prev-archive'] == archiving_manager.get_archive_url(feed_id, page - 1)
+        else:
+            assert 'prev-archive' not in links
+    
+    assert client.get(f'/feeds/{feed_id}/archive/{pages + 1}.xml').status_code == 404
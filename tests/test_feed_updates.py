@@ -0,0 +1,48 @@
+"""
+اختبارات تخطي إعادة إنشاء الخلاصة عند عدم تغير المحتوى
+"""
+
+import os
+
+from conftest import sample_scraped
+
+URL = 'https://www.instagram.com/meta/'
+
+
+def feed_state(client, feed_manager, feed_id):
+    feed_info = feed_manager.get_feed_info(feed_id)
+    response = client.get(f'/feeds/{feed_id}.xml')
+    return (
+        os.stat(feed_manager.get_xml_path(feed_info)).st_mtime_ns,
+        response.headers['ETag'],
+        response.headers['Last-Modified'],
+        response.data
+    )
+
+
+def test_identical_scrape_is_skipped(client, feed_manager):
+    feed_id = feed_manager.create_feed(URL, sample_scraped(URL))['id']
+    before = feed_state(client, feed_manager, feed_id)
+    
+    # نفس المنشورات بترتيب مختلف
+    scraped_data = sample_scraped(URL)
+    scraped_data['posts'].reverse()
+    updated = feed_manager.update_feed(feed_id, scraped_data)
+    
+    assert updated['changed'] is False
+    assert feed_state(client, feed_manager, feed_id) == before
+    assert feed_manager.get_feed_info(feed_id)['last_checked'] == updated['last_checked']
+
+
+def test_changed_post_is_not_skipped(client, feed_manager):
+    feed_id = feed_manager.create_feed(URL, sample_scraped(URL))['id']
+    before = feed_state(client, feed_manager, feed_id)
+    
+    scraped_data = sample_scraped(URL)
+    scraped_data['posts'][0]['text'] = 'نص معدل'
+    updated = feed_manager.update_feed(feed_id, scraped_data)
+    
+    assert updated['changed'] is True
+    after = feed_state(client, feed_manager, feed_id)
+    assert after[1] != before[1]
+    assert 'نص معدل'.encode('utf-8') in after[3]
@@ -0,0 +1,85 @@
+"""
+اختبارات مهام الخلفية المشتركة بين العمليات
+
+كل مدير مهام يفتح اتصاله الخاص بنفس القاعدة كما يفعل كل عامل gunicorn.
+"""
+
+import threading
+
+from rss_generator.job_manager import JobManager
+
+
+def open_managers(tmp_path, count=2, **options):
+    db_path = str(tmp_path / 'jobs.db')
+    return [JobManager(db_path, workers=1, **options) for _ in range(count)]
+
+
+def wait_for(manager, job_id, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        job = manager.get_job(job_id)
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_job_status_is_visible_from_other_workers(tmp_path):
+    creator, other = open_managers(tmp_path)
+    
+    job, deduplicated = creator.submit('create', 'create:a', lambda: ({'id': 'feed'}, 201))
+    assert not deduplicated
+    
+    finished = wait_for(other, job['id'])
+    assert finished['status'] == 'succeeded'
+    assert finished['status_code'] == 201
+    assert finished['result'] == {'id': 'feed'}
+    assert finished['status_url'] == f"/api/jobs/{job['id']}"
+    assert 'key' not in finished
+
+
+def test_running_job_is_shared_across_workers(tmp_path):
+    first, second = open_managers(tmp_path)
+    release = threading.Event()
+    
+    job, _ = first.submit('update', 'update:x', lambda: (release.wait(5), 200))
+    again, deduplicated = second.submit('update', 'update:x', lambda: ({}, 200))
+    
+    assert deduplicated
+    assert again['id'] == job['id']
+    assert second.get_stats()['queued'] + second.get_stats()['running'] == 1
+    
+    release.set()
+    assert wait_for(second, job['id'])['status'] == 'succeeded'
+    
+    # بعد الانتهاء يُنشئ نفس المفتاح مهمة جديدة
+    newer, deduplicated = second.submit('update', 'update:x', lambda: ({}, 200))
+    assert not deduplicated
+    assert newer['id'] != job['id']
+
+
+def test_pending_limit_counts_all_workers(tmp_path):
+    first, second = open_managers(tmp_path, max_pending=1)
+    release = threading.Event()
+    
+    first.submit('create', 'create:a', lambda: (release.wait(5), 200))
+    job, deduplicated = second.submit('create', 'create:b', lambda: ({}, 200))
+    
+    assert job is None and not deduplicated
+    assert second.get_stats()['rejected'] == 1
+    release.set()
+
+
+def test_abandoned_jobs_fail_after_timeout(tmp_path):
+    creator, other = open_managers(tmp_path, job_timeout=0)
+    # مهمة أنشأتها عملية توقفت قبل تنفيذها
+    creator.conn.execute(
+        "INSERT INTO jobs (id, type, key, status, created, created_at) "
+        "VALUES ('lost', 'create', 'create:a', 'running', 0, '1970-01-01T00:00:00')"
+    )
+    
+    job, deduplicated = other.submit('create', 'create:a', lambda: ({}, 200))
+    
+    assert not deduplicated
+    lost = other.get_job('lost')
+    assert lost['status'] == 'failed' and lost['status_code'] == 500
+    assert wait_for(other, job['id'])['status'] == 'succeeded'
@@ -0,0 +1,61 @@
+"""
+اختبارات ترحيل ملف البيانات الوصفية القديم إلى SQLite
+"""
+
+import os
+import json
+
+from rss_generator.metadata_store import SQLiteMetadataStore
+
+
+def write_json(feeds_dir, feeds):
+    path = os.path.join(feeds_dir, 'feeds_metadata.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(feeds, f)
+    return path
+
+
+def test_migrates_into_empty_database(tmp_path, capsys):
+    path = write_json(str(tmp_path), {'a': {'id': 'a', 'status': 'active'}})
+    
+    store = SQLiteMetadataStore(str(tmp_path))
+    
+    assert store.load_all() == {'a': {'id': 'a', 'status': 'active'}}
+    assert not os.path.exists(path) and os.path.exists(path + '.migrated')
+    assert 'تم ترحيل 1 خلاصة' in capsys.readouterr().out
+
+
+def test_skipped_migration_keeps_json_file(tmp_path, capsys):
+    SQLiteMetadataStore(str(tmp_path)).apply_changes({'old': {'id': 'old', 'status': 'active'}}, [])
+    path = write_json(str(tmp_path), {'a': {'id': 'a', 'status': 'active'}})
+    
+    store = SQLiteMetadataStore(str(tmp_path))
+    
+    assert list(store.load_all()) == ['old']
+    assert os.path.exists(path) and not os.path.exists(path + '.migrated')
+    output = capsys.readouterr().out
+    assert 'تم تخطي ترحيل' in output and 'تم ترحيل' not in output
+
+
+def test_file_moved_by_another_worker_is_not_an_error(tmp_path, capsys, monkeypatch):
+    write_json(str(tmp_path), {'a': {'id': 'a', 'status': 'active'}})
+    
+    def moved(src, dst):
+        raise FileNotFoundError(src)
+    monkeypatch.setattr(os, 'replace', moved)
+    
+    store = SQLiteMetadataStore(str(tmp_path))
+    
+    assert list(store.load_all()) == ['a']
+    assert 'خطأ' not in capsys.readouterr().out
+
+
+def test_invalid_json_is_reported_and_left_in_place(tmp_path, capsys):
+    path = os.path.join(str(tmp_path), 'feeds_metadata.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{')
+    
+    SQLiteMetadataStore(str(tmp_path))
+    
+    assert os.path.exists(path)
+    assert 'خطأ في قراءة' in capsys.readouterr().out
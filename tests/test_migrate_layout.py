@@ -0,0 +1,121 @@
+"""
+اختبارات نقل ملفات الخلاصات من التخطيط المسطح القديم إلى المجلدات المقسمة
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+from rss_generator import migrate_layout
+from rss_generator.feed_manager import FeedManager
+from rss_generator.feed_storage import FeedStorage
+
+FEED_IDS = ('5203465433', '1111111111')
+
+
+def baseline_record(feeds_dir: str, feed_id: str) -> dict:
+    """سجل بنفس شكل البيانات الوصفية قبل التخطيط المقسم"""
+    return {
+        'id': feed_id,
+        'url': f'https://www.instagram.com/user{feed_id}/',
+        'platform': 'Instagram',
+        'title': f'خلاصة {feed_id}',
+        'description': 'آخر المنشورات',
+        'xml_file': f'{feed_id}.xml',
+        'xml_path': os.path.join(feeds_dir, f'{feed_id}.xml'),
+        'created_at': '2025-07-22T17:09:05.318615',
+        'last_updated': '2025-07-22T17:09:05.318622',
+        'update_interval': 60,
+        'post_count': 1,
+        'rss_url': f'/feeds/{feed_id}.xml',
+        'status': 'active'
+    }
+
+
+def flat_xml(feed_id: str) -> bytes:
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{feed_id}</title></channel></rss>'.encode('utf-8')
+
+
+@pytest.fixture
+def flat_dir(tmp_path):
+    """مجلد خلاصات بالتخطيط المسطح كما في النسخة الأصلية"""
+    feeds_dir = str(tmp_path / 'feeds')
+    os.makedirs(feeds_dir)
+    
+    metadata = {}
+    for feed_id in FEED_IDS:
+        metadata[feed_id] = baseline_record(feeds_dir, feed_id)
+        with open(os.path.join(feeds_dir, f'{feed_id}.xml'), 'wb') as f:
+            f.write(flat_xml(feed_id))
+        with open(os.path.join(feeds_dir, f'{feed_id}.items.json'), 'w', encoding='utf-8') as f:
+            json.dump([], f)
+    
+    with open(os.path.join(feeds_dir, 'feeds_metadata.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False)
+    return feeds_dir
+
+
+def flat_files(feeds_dir: str) -> list:
+    return sorted(name for name in os.listdir(feeds_dir) if name.startswith(FEED_IDS))
+
+
+def read_bytes(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def assert_migrated(feeds_dir: str, metadata):
+    storage = FeedStorage(feeds_dir)
+    assert flat_files(feeds_dir) == []
+    for feed_id in FEED_IDS:
+        assert metadata[feed_id]['xml_file'] == storage.relative_path(feed_id, '.xml')
+        assert 'xml_path' not in metadata[feed_id]
+        assert os.path.exists(storage.path(feed_id, '.items.json'))
+
+
+def test_moves_flat_files_and_rewrites_metadata(flat_dir):
+    manager = FeedManager(flat_dir, storage='json')
+    
+    assert_migrated(flat_dir, manager.metadata)
+    for feed_id in FEED_IDS:
+        assert read_bytes(manager.get_xml_path(manager.metadata[feed_id])) == flat_xml(feed_id)
+    
+    # المسارات الجديدة محفوظة فلا تحتاج عملية جديدة إلى نقل
+    assert_migrated(flat_dir, FeedManager(flat_dir, storage='json').store.load_all())
+
+
+def test_second_run_is_a_no_op(flat_dir):
+    manager = FeedManager(flat_dir, storage='json')
+    xml_path = manager.get_xml_path(manager.metadata[FEED_IDS[0]])
+    mtime = os.stat(xml_path).st_mtime_ns
+    
+    assert manager.migrate_flat_layout() == 0
+    assert os.stat(xml_path).st_mtime_ns == mtime
+    assert_migrated(flat_dir, manager.metadata)
+
+
+def test_resumes_interrupted_migration(flat_dir):
+    # نقل متوقف: ملف نُقل وبقيت نسخة مسطحة قديمة منه والبيانات الوصفية لم تتحدث
+    storage = FeedStorage(flat_dir)
+    moved = storage.path(FEED_IDS[0], '.xml')
+    os.makedirs(os.path.dirname(moved))
+    with open(moved, 'wb') as f:
+        f.write(b'<rss>newer</rss>')
+    
+    manager = FeedManager(flat_dir, storage='json')
+    
+    assert_migrated(flat_dir, manager.metadata)
+    assert read_bytes(moved) == b'<rss>newer</rss>'
+    assert read_bytes(storage.path(FEED_IDS[1], '.xml')) == flat_xml(FEED_IDS[1])
+
+
+def test_command_line_tool(flat_dir, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['migrate_layout', flat_dir, '--storage', 'json'])
+    
+    migrate_layout.main()
+    migrate_layout.main()
+    
+    assert capsys.readouterr().out.strip().endswith('عدد الخلاصات: 2، خلاصات متبقية للنقل: 0')
+    assert_migrated(flat_dir, FeedManager(flat_dir, storage='json').metadata)
@@ -0,0 +1,143 @@
+"""
+اختبارات تشغيل عدة عمليات على نفس مجلد الخلاصات
+
+كل عملية تفتح مخزنها الخاص كما يفعل عمال gunicorn أو نسخ التطبيق المتعددة،
+والعملية المراقبة يجب أن تصل عبر poll_changes إلى نفس الحالة المحفوظة.
+"""
+
+import time
+import multiprocessing
+
+import pytest
+
+from rss_generator.metadata_store import JournalMetadataStore, create_metadata_store
+from rss_generator.lease_store import SQLiteLeaseStore
+
+WRITERS = 4
+FEEDS_PER_WRITER = 120
+BATCH_SIZE = 5
+
+
+def open_store(backend: str, feeds_dir: str):
+    # حد دمج صغير حتى يتكرر دمج السجل أثناء كتابة العمليات الأخرى
+    if backend == 'journal':
+        return JournalMetadataStore(feeds_dir, fsync_interval=0.05, compact_threshold=50)
+    return create_metadata_store(backend, feeds_dir)
+
+
+def feed_record(writer: int, number: int, version: int) -> dict:
+    return {
+        'id': f'w{writer}-{number}',
+        'status': 'active',
+        'platform': 'Instagram',
+        'last_updated': f'2025-07-01T00:00:{version:02d}',
+        'version': version
+    }
+
+
+def expected_records() -> dict:
+    """الحالة النهائية: كل عملية تحدّث خلاصاتها الزوجية وتحذف كل ثالثة"""
+    records = {}
+    for writer in range(WRITERS):
+        for number in range(FEEDS_PER_WRITER):
+            if number % 3 == 0:
+                continue
+            record = feed_record(writer, number, 2 if number % 2 == 0 else 1)
+            records[record['id']] = record
+    return records
+
+
+def write_feeds(backend: str, feeds_dir: str, writer: int):
+    """عملية كاتبة: إضافة ثم تحديث ثم حذف على دفعات صغيرة"""
+    store = open_store(backend, feeds_dir)
+    store.load_all()
+    
+    numbers = list(range(FEEDS_PER_WRITER))
+    for start in range(0, FEEDS_PER_WRITER, BATCH_SIZE):
+        batch = numbers[start:start + BATCH_SIZE]
+        store.apply_changes({f'w{writer}-{n}': feed_record(writer, n, 1) for n in batch}, [])
+    
+    for start in range(0, FEEDS_PER_WRITER, BATCH_SIZE):
+        batch = numbers[start:start + BATCH_SIZE]
+        store.apply_changes(
+            {f'w{writer}-{n}': feed_record(writer, n, 2) for n in batch if n % 2 == 0 and n % 3},
+            [f'w{writer}-{n}' for n in batch if n % 3 == 0]
+        )
+    
+    if hasattr(store, 'close'):
+        store.close()
+
+
+@pytest.mark.parametrize('backend', ['journal', 'json', 'sqlite'])
+def test_concurrent_writers_converge(backend, tmp_path):
+    feeds_dir = str(tmp_path)
+    observer = open_store(backend, feeds_dir)
+    view = dict(observer.load_all())
+    
+    def apply_polled():
+        changes = observer.poll_changes()
+        if changes:
+            upserts, deletes = changes
+            view.update(upserts)
+            for feed_id in deletes:
+                view.pop(feed_id, None)
+    
+    context = multiprocessing.get_context('spawn')
+    writers = [
+        context.Process(target=write_feeds, args=(backend, feeds_dir, writer))
+        for writer in range(WRITERS)
+    ]
+    for process in writers:
+        process.start()
+    
+    # المراقبة أثناء الكتابة حتى تُختبر القراءة من سجل يُدمج ويُستبدل
+    while any(process.is_alive() for process in writers):
+        apply_polled()
+        time.sleep(0.01)
+    
+    for process in writers:
+        process.join()
+        assert process.exitcode == 0
+    apply_polled()
+    
+    expected = expected_records()
+    assert view == expected
+    assert open_store(backend, feeds_dir).load_all() == expected
+
+
+def acquire_leases(db_path: str, feed_ids: list, queue):
+    """عملية تحاول حجز كل الخلاصات وتعيد ما حجزته"""
+    leases = SQLiteLeaseStore(db_path)
+    queue.put([feed_id for feed_id in feed_ids if leases.acquire(feed_id, ttl=60)])
+
+
+def test_each_feed_is_leased_by_one_process(tmp_path):
+    db_path = str(tmp_path / 'leases.db')
+    feed_ids = [f'feed{n}' for n in range(200)]
+    
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    processes = [context.Process(target=acquire_leases, args=(db_path, feed_ids, queue)) for _ in range(WRITERS)]
+    for process in processes:
+        process.start()
+    
+    acquired = [queue.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+    
+    claimed = [feed_id for owned in acquired for feed_id in owned]
+    assert sorted(claimed) == sorted(feed_ids)
+
+
+def test_expired_lease_moves_to_another_owner(tmp_path):
+    db_path = str(tmp_path / 'leases.db')
+    first = SQLiteLeaseStore(db_path)
+    second = SQLiteLeaseStore(db_path)
+    
+    assert first.acquire('feed', ttl=0.2)
+    assert not second.acquire('feed', ttl=0.2)
+    
+    time.sleep(0.3)
+    
+    assert second.acquire('feed', ttl=60)
+    assert first.renew(['feed'], ttl=60) == ['feed']
@@ -0,0 +1,59 @@
+"""
+اختبارات استيراد وتصدير OPML
+"""
+
+import io
+
+import pytest
+
+from rss_generator.opml import iter_opml, parse_opml
+
+
+def test_export_round_trips_through_import():
+    feeds = [
+        {'id': 'a1', 'title': 'حساب & أخبار', 'url': 'https://www.instagram.com/meta/',
+         'rss_url': '/feeds/a1.xml', 'platform': 'Instagram'},
+        {'id': 'b2', 'title': 'قناة', 'url': 'https://www.youtube.com/@Google',
+         'rss_url': '/feeds/b2.xml', 'platform': 'YouTube'}
+    ]
+    
+    document = ''.join(iter_opml(feeds, 'https://example.com')).encode('utf-8')
+    
+    assert parse_opml(io.BytesIO(document)) == [
+        {'url': 'https://www.instagram.com/meta/', 'title': 'حساب & أخبار'},
+        {'url': 'https://www.youtube.com/@Google', 'title': 'قناة'}
+    ]
+
+
+def test_export_skips_aggregates():
+    feeds = [
+        {'id': 'a1', 'title': 'مصدر', 'url': 'https://www.instagram.com/meta/', 'rss_url': '/feeds/a1.xml'},
+        {'id': 'agg1', 'title': 'مجمّعة', 'type': 'aggregate', 'members': ['a1'], 'rss_url': '/feeds/agg1.xml'}
+    ]
+    
+    document = ''.join(iter_opml(feeds, 'https://example.com'))
+    
+    assert 'agg1' not in document
+    assert [entry['url'] for entry in parse_opml(io.BytesIO(document.encode('utf-8')))] == [
+        'https://www.instagram.com/meta/'
+    ]
+
+
+def test_import_falls_back_to_xml_url_and_skips_categories():
+    document = b"""<?xml version="1.0"?>
+    <opml version="2.0"><body>
+      <outline text="Tech">
+        <outline text="Blog" xmlUrl="https://blog.example.com/rss"/>
+      </outline>
+    </body></opml>"""
+    
+    assert parse_opml(io.BytesIO(document)) == [{'url': 'https://blog.example.com/rss', 'title': 'Blog'}]
+
+
+def test_import_rejects_other_documents_and_limits():
+    with pytest.raises(ValueError):
+        parse_opml(io.BytesIO(b'<rss><channel/></rss>'))
+    
+    document = b'<opml><body>' + b'<outline xmlUrl="https://x.com/a"/>' * 3 + b'</body></opml>'
+    with pytest.raises(ValueError):
+        parse_opml(io.BytesIO(document), max_outlines=2)
@@ -0,0 +1,118 @@
+"""
+اختبارات البحث في نصوص المنشورات عبر /api/posts/search
+"""
+
+from rss_generator.posts_index import PostsIndex
+
+URL = 'https://www.instagram.com/cafe/'
+
+
+def scraped(texts, url=URL, platform='Instagram'):
+    username = url.rstrip('/').rsplit('/', 1)[-1]
+    posts = [
+        {
+            'text': text,
+            'post_url': f'{url}p/{number}',
+            'time': f'2025-07-{10 + number:02d}T10:00:00Z',
+            'platform': platform,
+            'username': username
+        }
+        for number, text in enumerate(texts)
+    ]
+    return {'platform': platform, 'username': username, 'url': url, 'posts': posts}
+
+
+def search(client, query, **params):
+    response = client.get('/api/posts/search', query_string=dict(params, q=query))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def links(result):
+    return [post['link'] for post in result['results']]
+
+
+def test_created_posts_are_searchable(client, feed_manager):
+    feed_info = feed_manager.create_feed(URL, scraped(['قهوة عربية طازجة', 'شاي أخضر']))
+    
+    result = search(client, 'قهوة')
+    
+    assert links(result) == [f'{URL}p/0']
+    assert result['results'][0]['feed_id'] == feed_info['id']
+    assert result['results'][0]['feed_title'] == feed_info['title']
+    assert result['has_more'] is False
+
+
+def test_updated_posts_are_reindexed(client, feed_manager):
+    feed_id = feed_manager.create_feed(URL, scraped(['قهوة عربية', 'شاي أخضر']))['id']
+    
+    feed_manager.update_feed(feed_id, scraped(['كعك بالتمر', 'شاي أخضر']))
+    
+    assert search(client, 'قهوة')['results'] == []
+    assert links(search(client, 'كعك')) == [f'{URL}p/0']
+
+
+def test_deleted_feeds_are_removed(client, feed_manager):
+    feed_id = feed_manager.create_feed(URL, scraped(['قهوة عربية']))['id']
+    
+    feed_manager.delete_feed(feed_id)
+    
+    assert search(client, 'قهوة')['results'] == []
+
+
+def test_arabic_queries_ignore_diacritics_and_letter_forms(client, feed_manager):
+    feed_manager.create_feed(URL, scraped(['افتتاح المدرسة الإبتدائية الجديدة']))
+    
+    for query in ('مَدْرَسَة', 'المدرسه', 'ابتدائيه', 'الجدي'):
+        assert links(search(client, query)) == [f'{URL}p/0'], query
+
+
+def test_definite_article_is_optional_in_queries(client, feed_manager):
+    feed_manager.create_feed(URL, scraped(['مدرسة صغيرة']))
+    
+    assert links(search(client, 'المدرسة')) == [f'{URL}p/0']
+
+
+def test_relevance_orders_by_bm25(client, feed_manager):
+    feed_manager.create_feed(URL, scraped([
+        'اليوم جربنا وصفة جديدة للكعك مع القهوة في المقهى القريب من البيت مساء',
+        'قهوة قهوة قهوة',
+    ]))
+    
+    assert links(search(client, 'قهوة')) == [f'{URL}p/1', f'{URL}p/0']
+    assert links(search(client, 'قهوة', sort='date')) == [f'{URL}p/1', f'{URL}p/0']
+
+
+def test_relevance_is_limited_to_newest_matches(client, feed_manager, monkeypatch):
+    monkeypatch.setattr(PostsIndex, 'RANK_WINDOW', 2)
+    # أكثر المنشورات صلة فُهرس أولاً فيقع خارج نافذة الترتيب
+    feed_manager.create_feed(URL, scraped(['قهوة قهوة قهوة']))
+    other = 'https://www.instagram.com/other/'
+    feed_manager.create_feed(other, scraped([
+        'قهوة مع الكعك في الصباح الباكر',
+        'فنجان قهوة بعد الغداء مع الأصدقاء',
+    ], url=other))
+    
+    result = search(client, 'قهوة', limit=1)
+    
+    assert f'{URL}p/0' not in links(result)
+    assert result['has_more'] is True
+    
+    # الصفحات التي تتجاوز النافذة توسعها حتى لا تُفقد نتائج
+    assert len(search(client, 'قهوة', limit=3)['results']) == 3
+
+
+def test_pagination_and_validation(client, feed_manager):
+    feed_manager.create_feed(URL, scraped([f'قهوة رقم {number}' for number in range(5)]))
+    
+    first = search(client, 'قهوة', limit=2, sort='date')
+    second = search(client, 'قهوة', limit=2, offset=2, sort='date')
+    last = search(client, 'قهوة', limit=2, offset=4, sort='date')
+    
+    assert first['has_more'] and second['has_more'] and not last['has_more']
+    assert len(set(links(first) + links(second) + links(last))) == 5
+    
+    assert client.get('/api/posts/search').status_code == 400
+    assert client.get('/api/posts/search?q=x&limit=0').status_code == 400
+    assert client.get('/api/posts/search?q=x&sort=random').status_code == 400
+    assert client.get('/api/posts/search?q=x&since=yesterday').status_code == 400
@@ -0,0 +1,96 @@
+"""
+اختبارات ضبط فترة التحديث حسب معدل النشر
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import sample_scraped
+from rss_generator.refresh_policy import AdaptiveRefreshPolicy
+
+NOW = datetime(2025, 7, 1, 12, 0, 0)
+
+
+def ago(minutes: float) -> str:
+    return (NOW - timedelta(minutes=minutes)).isoformat()
+
+
+@pytest.fixture
+def policy():
+    return AdaptiveRefreshPolicy(min_interval=15, max_interval=1440, smoothing=0.3,
+                                 target_ratio=0.5, backoff=1.5)
+
+
+def test_first_observation_sets_the_estimate(policy):
+    # 240 دقيقة منذ الإنشاء و 2 منشوران جديدان: منشور كل 120 دقيقة
+    fields = policy.observe({'created_at': ago(240), 'update_interval': 60}, 2, now=NOW)
+    
+    assert fields == {
+        'update_interval': 60,
+        'posting_interval': 120.0,
+        'last_new_post_at': NOW.isoformat(),
+        'empty_refreshes': 0
+    }
+
+
+def test_later_observations_are_smoothed(policy):
+    feed_info = {'last_new_post_at': ago(200), 'posting_interval': 100.0, 'empty_refreshes': 3}
+    
+    fields = policy.observe(feed_info, 1, now=NOW)
+    
+    # 0.3 × 200 + 0.7 × 100
+    assert fields['posting_interval'] == 130.0
+    assert fields['update_interval'] == 65
+    assert fields['empty_refreshes'] == 0
+
+
+@pytest.mark.parametrize('elapsed, new_posts, expected', [
+    (10, 5, 15),          # منشور كل دقيقتين: الحد الأدنى
+    (100 * 24 * 60, 1, 1440),  # منشور كل 100 يوم: الحد الأقصى
+])
+def test_interval_is_clamped(policy, elapsed, new_posts, expected):
+    fields = policy.observe({'last_new_post_at': ago(elapsed)}, new_posts, now=NOW)
+    
+    assert fields['update_interval'] == expected
+
+
+def test_empty_refreshes_back_off_up_to_the_maximum(policy):
+    feed_info = {'update_interval': 60, 'posting_interval': 120.0}
+    intervals = []
+    for _ in range(12):
+        fields = policy.observe(feed_info, 0, now=NOW)
+        feed_info.update(fields)
+        intervals.append(feed_info['update_interval'])
+    
+    assert intervals[:3] == [90, 135, 202]
+    assert intervals[-1] == 1440
+    assert feed_info['empty_refreshes'] == 12
+    assert feed_info['posting_interval'] == 120.0
+
+
+def test_missing_timestamps_fall_back_to_current_interval(policy):
+    fields = policy.observe({'update_interval': 40}, 2, now=NOW)
+    
+    assert fields['posting_interval'] == 20.0
+    assert fields['update_interval'] == 15
+
+
+def test_estimate_from_item_dates(policy):
+    items = [{'pub_date': ago(minutes).replace('T', ' ')} for minutes in (0, 60, 180)]
+    
+    assert policy.estimate_from_items(items) == 90.0
+    assert policy.estimate_from_items(items[:1]) is None
+    assert policy.estimate_from_items([{'pub_date': 'x'}, {}]) is None
+
+
+def test_unchanged_scrape_backs_off_feed_interval(feed_manager):
+    url = 'https://www.instagram.com/meta/'
+    feed_id = feed_manager.create_feed(url, sample_scraped(url))['id']
+    interval = feed_manager.get_feed_info(feed_id)['update_interval']
+    
+    updated = feed_manager.update_feed(feed_id, sample_scraped(url))
+    
+    assert updated['changed'] is False
+    assert updated['update_interval'] == feed_manager.refresh_policy.clamp(interval * 1.5)
+    assert updated['empty_refreshes'] == 1
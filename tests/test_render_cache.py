@@ -0,0 +1,32 @@
+"""
+اختبارات مفتاح ذاكرة تحويل المنشورات
+"""
+
+from rss_generator.render_cache import RenderCache
+from rss_generator.rss_generator import RSSGenerator
+
+EMPTY_TEXT = {'text': '', 'caption': 'X', 'username': 'u', 'platform': 'Instagram'}
+NO_TEXT = {'caption': 'X', 'username': 'u', 'platform': 'Instagram'}
+
+
+def test_empty_and_missing_fields_get_different_keys():
+    generator = RSSGenerator()
+    
+    assert generator.render_key(EMPTY_TEXT) != generator.render_key(NO_TEXT)
+
+
+def test_cached_render_is_not_shared_between_empty_and_missing_fields():
+    expected = [RSSGenerator().render_post(post) for post in (EMPTY_TEXT, NO_TEXT)]
+    assert expected[0]['title'] != expected[1]['title']
+    
+    # نفس الذاكرة لكلا الترتيبين، ومن نسخة محفوظة كما تُقرأ من .render.json
+    for order in ((EMPTY_TEXT, NO_TEXT), (NO_TEXT, EMPTY_TEXT)):
+        cache = RenderCache()
+        generator = RSSGenerator(cache)
+        for post in order:
+            generator.render_post(post)
+        
+        restored = RenderCache()
+        restored.load(generator.rendered_posts)
+        for cached in (RSSGenerator(cache), RSSGenerator(restored)):
+            assert [cached.render_post(post) for post in (EMPTY_TEXT, NO_TEXT)] == expected
@@ -0,0 +1,91 @@
+"""
+اختبارات فهرس البحث في الخلاصات وتوحيد النصوص العربية
+"""
+
+import pytest
+
+from conftest import sample_scraped
+from rss_generator.search_index import SearchIndex, normalize_text, tokenize, query_terms
+
+
+def feed(feed_id, title, description='', platform='Instagram'):
+    return {'id': feed_id, 'title': title, 'description': description, 'platform': platform}
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.add(feed('school', 'أخبار المدرسة الابتدائية'))
+    index.add(feed('quran', 'تلاوات القرآن الكريم'))
+    index.add(feed('news', 'أخبار الرياضة', 'آخر أخبار الكرة'))
+    index.add(feed('tech', 'Technology News', 'أخبار التقنية', platform='YouTube'))
+    return index
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('مَدْرَسَةٌ', 'مدرسه'),
+    ('أحمد إبراهيم آمال ٱلله', 'احمد ابراهيم امال الله'),
+    ('مستشفى', 'مستشفي'),
+    ('جمـــيل', 'جميل'),
+    ('Café NEWS', 'cafe news'),
+])
+def test_normalize_text_folds_arabic_and_latin(text, expected):
+    assert normalize_text(text) == expected
+
+
+def test_tokenize_drops_stop_words_and_adds_article_free_form():
+    assert tokenize('أخبار من المدرسة في الصباح') == ['اخبار', 'المدرسه', 'مدرسه', 'الصباح', 'صباح']
+    assert query_terms('أخبار من المدرسة في المدرسة') == ['اخبار', 'مدرسه']
+
+
+@pytest.mark.parametrize('query', ['المَدرسة', 'مدرسه', 'الإبتدائية', 'ابتدائيه', 'القران'])
+def test_arabic_variants_match(index, query):
+    total, ids = index.search(query)
+    assert total == 1 and ids[0] in ('school', 'quran')
+
+
+def test_last_word_matches_by_prefix(index):
+    assert index.search('أخبار الريا') == (1, ['news'])
+    assert index.search('tech') == (1, ['tech'])
+    # البادئة تُطبق على الكلمة الأخيرة فقط
+    assert index.search('ريا أخبار') == (0, [])
+
+
+def test_title_matches_rank_above_description(index):
+    total, ids = index.search('أخبار')
+    
+    assert total == 3
+    assert ids[-1] == 'tech'
+
+
+def test_limit_and_offset(index):
+    total, first = index.search('أخبار', limit=2)
+    _, rest = index.search('أخبار', limit=2, offset=2)
+    
+    assert total == 3
+    assert len(first) == 2 and len(rest) == 1
+    assert set(first + rest) == {'school', 'news', 'tech'}
+
+
+def test_updates_and_removals(index):
+    index.add(feed('news', 'نتائج المباريات'))
+    assert index.search('الرياضة') == (0, [])
+    assert index.search('مباريات') == (1, ['news'])
+    
+    index.remove('news')
+    assert index.search('مباريات') == (0, [])
+    assert 'مباريات' not in index.terms
+
+
+def test_search_endpoint_reports_total(client, feed_manager):
+    for name in ('first', 'second', 'third'):
+        url = f'https://www.instagram.com/{name}/'
+        feed_manager.create_feed(url, sample_scraped(url))
+    
+    response = client.get('/api/search', query_string={'q': 'خلاصة', 'limit': 2, 'offset': 1})
+    
+    assert response.status_code == 200
+    assert response.headers['X-Total-Count'] == '3'
+    assert len(response.get_json()) == 2
+    assert client.get('/api/search?q=x&limit=0').status_code == 400
+    assert client.get('/api/search').status_code == 400
@@ -0,0 +1,27 @@
+"""
+اختبارات إحصائيات الخلاصات وعدادات الاستخراج
+"""
+
+from conftest import sample_scraped
+
+
+def test_scrapes_and_feeds_share_platform_keys(client, app_module, feed_manager, monkeypatch):
+    url = 'https://www.instagram.com/meta/'
+    monkeypatch.setattr(app_module.scraper, 'scrape_url', lambda url, max_posts: sample_scraped(url))
+    
+    scraped_data = app_module.scrape_url(url)
+    feed_manager.create_feed(url, scraped_data)
+    
+    stats = client.get('/api/stats').get_json()
+    
+    assert stats['platforms'] == {'Instagram': 1}
+    assert stats['recent_activity']['scrapes'] == {'Instagram': 1}
+
+
+def test_failed_scrapes_are_counted(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module.scraper, 'scrape_url', lambda url, max_posts: {'error': 'فشل'})
+    
+    app_module.scrape_url('https://www.youtube.com/@channel')
+    
+    stats = client.get('/api/stats').get_json()
+    assert stats['recent_activity']['failures'] == {'YouTube': 1}
@@ -0,0 +1,52 @@
+"""
+اختبارات توحيد روابط المصادر ومعرفات الخلاصات
+"""
+
+import pytest
+
+from rss_generator.url_utils import canonicalize_url, feed_id_from_url
+
+
+@pytest.mark.parametrize('variant', [
+    'http://www.instagram.com/Meta/',
+    'https://m.instagram.com/meta?igshid=abc',
+    'instagram.com/META#top',
+])
+def test_instagram_profile_variants(variant):
+    assert canonicalize_url(variant) == 'https://instagram.com/meta'
+
+
+def test_twitter_alias_and_handle_case():
+    assert canonicalize_url('https://mobile.twitter.com/NASA/') == 'https://x.com/nasa'
+
+
+def test_youtube_handles_ignore_case():
+    assert canonicalize_url('https://www.youtube.com/@GoogleDevelopers') == 'https://youtube.com/@googledevelopers'
+    assert canonicalize_url('https://youtube.com/user/GoogleDevelopers') == 'https://youtube.com/user/googledevelopers'
+
+
+def test_youtube_channel_ids_keep_case():
+    first = 'https://www.youtube.com/channel/UC_x5XG1OV2P6uZZ5FSM9Ttw'
+    second = 'https://www.youtube.com/channel/UC_X5xg1ov2p6Uzz5fsm9tTW'
+    
+    assert canonicalize_url(first) == 'https://youtube.com/channel/UC_x5XG1OV2P6uZZ5FSM9Ttw'
+    assert feed_id_from_url(first) != feed_id_from_url(second)
+
+
+def test_instagram_shortcodes_keep_case():
+    assert canonicalize_url('https://www.instagram.com/P/CxYzAb/') == 'https://instagram.com/p/CxYzAb'
+    assert feed_id_from_url('https://instagram.com/p/CxYzAb') != feed_id_from_url('https://instagram.com/p/cxyzab')
+
+
+def test_linkedin_company_slug_ignores_case():
+    assert canonicalize_url('https://www.linkedin.com/Company/Microsoft/') == 'https://linkedin.com/company/microsoft'
+
+
+def test_other_sites_keep_path_and_drop_tracking():
+    assert (canonicalize_url('http://Example.com:80/Blog/Post/?utm_source=x&b=2&a=1&fbclid=z')
+            == 'https://example.com/Blog/Post?a=1&b=2')
+
+
+def test_youtube_video_param_is_kept():
+    assert canonicalize_url('https://youtu.be/x?si=abc') == 'https://youtu.be/x'
+    assert canonicalize_url('https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=abc') == 'https://youtube.com/watch?v=dQw4w9WgXcQ'
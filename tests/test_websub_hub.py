@@ -0,0 +1,152 @@
+"""
+اختبارات موزع WebSub مع مشترك تجريبي على خادم HTTP محلي
+
+المشترك يعيد hub.challenge عند التحقق ويحفظ الرسائل المستلمة، ويمكن ضبط
+رمز الحالة الذي يرد به على الإرسال.
+"""
+
+import hmac
+import queue
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from rss_generator.websub_hub import WebSubHub
+
+TOPIC = 'https://rss-social-tool.com/feeds/abc.xml'
+SECRET = 'subscriber-secret'
+
+
+class StubSubscriber:
+    """مشترك WebSub تجريبي"""
+    
+    def __init__(self):
+        self.verifications = queue.Queue()
+        self.deliveries = queue.Queue()
+        self.delivery_status = 204
+        
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                stub.verifications.put(params)
+                body = params.get('hub.challenge', '').encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                stub.deliveries.put((dict(self.headers), body))
+                self.send_response(stub.delivery_status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.callback = f'http://127.0.0.1:{self.server.server_port}/push'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def subscriber():
+    stub = StubSubscriber()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def hub(tmp_path):
+    hub = WebSubHub(str(tmp_path / 'websub.db'), 'https://rss-social-tool.com/websub',
+                    workers=2, max_attempts=1, timeout=5, allow_private_callbacks=True)
+    yield hub
+    hub.close()
+
+
+def wait_until(condition, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError('condition not reached')
+
+
+def test_verify_publish_sign_and_drop_on_gone(hub, subscriber):
+    assert hub.request_subscription('subscribe', TOPIC, subscriber.callback, 3600, SECRET)
+    
+    verification = subscriber.verifications.get(timeout=5)
+    assert verification['hub.mode'] == 'subscribe'
+    assert verification['hub.topic'] == TOPIC
+    wait_until(lambda: hub.get_stats()['subscriptions'] == 1)
+    
+    content = '<rss version="2.0"></rss>'.encode('utf-8')
+    assert hub.publish(TOPIC, content) == 1
+    
+    headers, body = subscriber.deliveries.get(timeout=5)
+    assert body == content
+    expected = hmac.new(SECRET.encode('utf-8'), content, hashlib.sha256).hexdigest()
+    assert headers['X-Hub-Signature'] == f'sha256={expected}'
+    assert f'<{TOPIC}>; rel="self"' in headers['Link']
+    
+    # المشترك الذي يرد بـ 410 يُحذف اشتراكه ولا يستلم التحديثات التالية
+    subscriber.delivery_status = 410
+    assert hub.publish(TOPIC, content) == 1
+    subscriber.deliveries.get(timeout=5)
+    wait_until(lambda: hub.get_stats()['subscriptions'] == 0)
+    assert hub.publish(TOPIC, content) == 0
+
+
+@pytest.mark.parametrize('callback', [
+    'http://127.0.0.1:8080/push',
+    'http://localhost/push',
+    'http://10.0.0.5/push',
+    'http://169.254.169.254/latest/meta-data/',
+    'http://[::1]/push',
+    'http://[::ffff:192.168.1.1]/push',
+])
+def test_private_callbacks_are_rejected(tmp_path, callback):
+    hub = WebSubHub(str(tmp_path / 'websub.db'), 'https://rss-social-tool.com/websub', workers=1)
+    try:
+        with pytest.raises(ValueError):
+            hub.request_subscription('subscribe', TOPIC, callback)
+    finally:
+        hub.close()
+
+
+def test_pending_verifications_are_bounded(tmp_path):
+    release = threading.Event()
+    hub = WebSubHub(str(tmp_path / 'websub.db'), 'https://rss-social-tool.com/websub',
+                    workers=1, max_pending_verifications=2, allow_private_callbacks=True)
+    hub.verify = lambda *args: release.wait(5)
+    try:
+        assert hub.request_subscription('subscribe', TOPIC, 'http://127.0.0.1/a')
+        assert hub.request_subscription('subscribe', TOPIC, 'http://127.0.0.1/b')
+        assert not hub.request_subscription('subscribe', TOPIC, 'http://127.0.0.1/c')
+        assert hub.get_stats()['rejected_verifications'] == 1
+        
+        release.set()
+        wait_until(lambda: hub.get_stats()['pending_verifications'] == 0)
+        assert hub.request_subscription('subscribe', TOPIC, 'http://127.0.0.1/c')
+    finally:
+        release.set()
+        hub.close()
+
+
+def test_public_callbacks_are_accepted(tmp_path):
+    hub = WebSubHub(str(tmp_path / 'websub.db'), 'https://rss-social-tool.com/websub', workers=1)
+    try:
+        assert hub.is_allowed_callback('https://93.184.216.34/push')
+        assert hub.is_allowed_callback('http://[2606:4700::1111]:8080/push')
+    finally:
+        hub.close()